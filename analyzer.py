@@ -0,0 +1,259 @@
+"""
+Exact (non-random) detection analysis for the CRC polynomials in utils.CRC_POLY.
+
+For an n-bit codeword an error pattern e(x) goes undetected iff e(x) mod G == 0.
+Everything below is derived from the per-position syndrome table
+syn[p] = x^(n-1-p) mod G (built with one shift per position) and plain GF(2)
+polynomial algebra:
+
+  * single-bit errors   -- all detected iff no syn[p] is 0
+  * two isolated errors -- x^i + x^j is missed iff x^(j-i) == 1, so every
+                           spacing below the period (order of x mod G) is caught
+  * odd-weight errors   -- all detected iff (x+1) divides G
+  * bursts              -- a burst of length L is x^s * B(x) with B of degree
+                           L-1 and constant term 1; G is coprime to x, so the
+                           verdict does not depend on s. All L <= w are caught,
+                           L = w+1 misses 2^-(w-1), longer bursts miss 2^-w.
+                           Solid bursts (every bit flipped, as inject_error
+                           does) are checked at every start with a prefix-XOR
+                           table, O(1) per position.
+  * minimum distance    -- smallest weight of an undetected pattern, found by
+                           meet-in-the-middle on syndrome sums.
+"""
+
+import math
+
+import numpy as np
+
+from crc_engine import gf2_mulmod
+from simulator import prefix_xor, syndrome_table
+from utils import CRC_POLY
+
+# work limit (number of subset sums) for the exhaustive weight searches
+MAX_SEARCH = 60_000_000
+
+
+# ---------------------------------------------------------------------------
+# GF(2) polynomial helpers (ints, bit i = coefficient of x^i)
+# ---------------------------------------------------------------------------
+
+def period(polynomial):
+    """
+    Order of x modulo G: the smallest e > 0 with x^e == 1 (mod G).
+    Baby-step giant-step, so CRC-32 needs ~2^16 steps instead of ~2^32.
+    """
+    poly = int(polynomial, 2)
+    width = len(polynomial) - 1
+    if not poly & 1:
+        raise ValueError("period is undefined when x divides G")
+    top = 1 << width
+
+    m = math.isqrt((1 << width) - 1) + 1
+    baby = {}
+    reg = 1
+    for j in range(m):
+        if j and reg == 1:
+            return j
+        baby.setdefault(reg, j)
+        reg <<= 1
+        if reg & top:
+            reg ^= poly
+    giant = reg  # x^m
+    cur = giant
+    for i in range(1, m + 2):
+        j = baby.get(cur)
+        if j is not None:
+            return i * m - j
+        cur = gf2_mulmod(cur, giant, poly, width)
+    raise ArithmeticError("no period found (G is not a valid CRC generator)")
+
+
+def divisible_by_x_plus_1(polynomial):
+    # G(1) == 0 iff G has an even number of terms
+    return polynomial.count("1") % 2 == 0
+
+
+# ---------------------------------------------------------------------------
+# Minimum distance (smallest undetected weight)
+# ---------------------------------------------------------------------------
+
+class _Lookup:
+    """Sorted syndrome sums with the subsets that produced them."""
+
+    def __init__(self, values, members):
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        self.members = members[order]
+
+    def find(self, queries):
+        # index into `queries` of the first hit and the matching members, or None
+        idx = np.searchsorted(self.values, queries)
+        idx[idx == len(self.values)] = 0
+        hit = np.nonzero(self.values[idx] == queries)[0]
+        if len(hit) == 0:
+            return None
+        return int(hit[0]), self.members[idx[hit[0]]]
+
+
+def _pairs(syn):
+    n = len(syn)
+    i, j = np.triu_indices(n, 1)
+    return syn[i] ^ syn[j], np.stack((i, j), axis=1)
+
+
+def _search_weight(syn, weight, singles, pairs):
+    """
+    Positions of an undetected pattern of exactly `weight` bits, or None.
+    Assumes no lighter pattern exists: then any collision between two subset
+    sums comes from disjoint subsets (an overlap would leave a lighter one).
+    """
+    n = len(syn)
+    if weight == 2:
+        if len(np.unique(syn)) == n:
+            return None
+        seen = {}
+        for p, s in enumerate(syn.tolist()):
+            if s in seen:
+                return [seen[s], p]
+            seen[s] = p
+    if weight == 3:
+        values, members = pairs
+        hit = singles.find(values)
+        return None if hit is None else sorted(members[hit[0]].tolist() + hit[1].tolist())
+    if weight == 4:
+        values, members = pairs
+        order = np.argsort(values, kind="stable")
+        sv = values[order]
+        dup = np.nonzero(sv[1:] == sv[:-1])[0]
+        if len(dup) == 0:
+            return None
+        a, b = members[order[dup[0]]], members[order[dup[0] + 1]]
+        return sorted(a.tolist() + b.tolist())
+    if weight == 5:
+        values, members = pairs
+        table = _Lookup(values, members)
+        for i in range(n - 2):
+            j, k = np.triu_indices(n - i - 1, 1)
+            j += i + 1
+            k += i + 1
+            hit = table.find(syn[i] ^ syn[j] ^ syn[k])
+            if hit is not None:
+                q, pair = hit
+                return sorted([i, int(j[q]), int(k[q])] + pair.tolist())
+        return None
+    raise ValueError("unsupported weight {}".format(weight))
+
+
+def min_distance(syn, odd_detected, max_weight=5):
+    """
+    (distance, exact, witness) for codewords with syndrome table `syn`.
+    When nothing is found up to max_weight (or the search would exceed
+    MAX_SEARCH) distance is a lower bound and exact is False.
+    """
+    n = len(syn)
+    if np.any(syn == 0):
+        return 1, True, [int(np.nonzero(syn == 0)[0][0])]
+    singles = _Lookup(syn, np.arange(n).reshape(-1, 1))
+    pairs = None
+    for weight in range(2, max_weight + 1):
+        if odd_detected and weight % 2:
+            continue
+        if math.comb(n, (weight + 1) // 2) > MAX_SEARCH:
+            return weight, False, None
+        if weight >= 3 and pairs is None:
+            pairs = _pairs(syn)
+        witness = _search_weight(syn, weight, singles, pairs)
+        if witness is not None:
+            return weight, True, witness
+    return max_weight + 1, False, None
+
+
+# ---------------------------------------------------------------------------
+# Bursts
+# ---------------------------------------------------------------------------
+
+def burst_coverage(width, max_length):
+    """
+    Fraction of all bursts of each length L (first and last bit flipped, any
+    middle) that the CRC detects. Independent of position and frame length.
+    """
+    coverage = {}
+    for L in range(1, max_length + 1):
+        if L <= width:
+            coverage[L] = 1.0
+        elif L == width + 1:
+            coverage[L] = 1.0 - 2.0 ** -(width - 1)
+        else:
+            coverage[L] = 1.0 - 2.0 ** -width
+    return coverage
+
+
+def solid_burst_coverage(pre, n, max_length):
+    """
+    Fraction of start positions at which a solid burst (all L bits flipped)
+    is detected, for every L. Uses the prefix-XOR table: run [s, s+L) has
+    syndrome pre[s+L] ^ pre[s].
+    """
+    coverage = {}
+    for L in range(1, min(max_length, n) + 1):
+        syndromes = pre[L:] ^ pre[: n - L + 1]
+        coverage[L] = float(np.count_nonzero(syndromes)) / len(syndromes)
+    return coverage
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def analyze(polynomial, frame_size=64, max_burst=None, max_weight=5):
+    """
+    Exact detection report for one polynomial on frames of frame_size BYTES
+    (header + payload + CRC, as produced by DataFrame.createFrames).
+    """
+    n = frame_size * 8
+    width = len(polynomial) - 1
+    max_burst = width + 8 if max_burst is None else max_burst
+    syn = syndrome_table(polynomial, n)
+    pre = prefix_xor(syn)
+
+    e = period(polynomial)
+    odd = divisible_by_x_plus_1(polynomial)
+    dmin, exact, witness = min_distance(syn, odd, max_weight)
+
+    return {
+        "polynomial": polynomial,
+        "width": width,
+        "frame_bits": n,
+        "single_bit_all_detected": bool(np.all(syn != 0)),
+        "period": e,
+        # x^i + x^j is missed iff (j - i) is a multiple of the period
+        "double_error_max_spacing_detected": min(e - 1, n - 1),
+        "double_error_all_detected": e > n - 1,
+        "divisible_by_x_plus_1": odd,
+        "odd_weight_all_detected": odd,
+        "min_distance": dmin,
+        "min_distance_exact": exact,
+        "min_distance_witness": witness,
+        "burst_coverage": burst_coverage(width, max_burst),
+        "solid_burst_coverage": solid_burst_coverage(pre, n, max_burst),
+    }
+
+
+def analyze_all(frame_size=64, max_burst=None, max_weight=5):
+    """analyze() for every entry of utils.CRC_POLY, keyed by name."""
+    return {name: analyze(poly, frame_size, max_burst, max_weight) for name, poly in CRC_POLY.items()}
+
+
+if __name__ == "__main__":
+    for name, report in analyze_all().items():
+        dmin = report["min_distance"]
+        print(f"== {name} ({report['frame_bits']}-bit frames)")
+        print("  single-bit errors all detected:", report["single_bit_all_detected"])
+        print("  period of x mod G:", report["period"])
+        print("  two isolated errors all detected:", report["double_error_all_detected"],
+              f"(spacing <= {report['double_error_max_spacing_detected']})")
+        print("  odd-weight errors all detected ((x+1) | G):", report["odd_weight_all_detected"])
+        print("  minimum distance:", dmin if report["min_distance_exact"] else f">= {dmin}",
+              report["min_distance_witness"] or "")
+        missed = {L: c for L, c in report["burst_coverage"].items() if c < 1.0}
+        print("  bursts all detected up to length", report["width"], "- partial:", missed)
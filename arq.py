@@ -0,0 +1,538 @@
+"""
+Sliding-window ARQ (Stop-and-Wait, Go-Back-N, Selective Repeat) over DataFrames.
+
+ARQ frames are ordinary DataFrames (same header, same CRC / checksum) whose
+payload starts with a small ARQ header:
+
+    kind  ARQ_KIND_LEN bits   DATA, ACK or NAK
+    seq   ARQ_SEQ_LEN bits    sequence number mod 2^ARQ_SEQ_LEN
+
+so the sequence number is protected by the frame's redundancy bits and the
+DataFrame layout (OFF_* in utils) does not change. Data frames carry the file
+payload after the ARQ header; ACK/NAK frames carry nothing else.
+
+    Stop-and-Wait     window 1, each frame waits for its ACK
+    Go-Back-N         ACK n = "every frame before n arrived" (cumulative);
+                      out-of-order frames are dropped and one timer covers the
+                      oldest outstanding frame; a timeout or NAK resends all
+                      outstanding frames
+    Selective Repeat  ACK n = "frame n arrived"; the receiver buffers out of
+                      order frames and the sender keeps one timer per frame,
+                      resending only what timed out or was NAKed
+
+The endpoints only need a send session (send / flush / close) and a receive
+session with receive(timeout) - e.g. two SimulatedChannels, one per direction.
+transfer() wires that up in one process and returns goodput and
+retransmission statistics; `python arq.py` sweeps window sizes per mode.
+
+With adaptive=True the sender picks the size of each new data frame from
+the rejection rate it observes (NAKs and timeouts vs ACKs), see
+AdaptiveFrameSize. Frames already sent keep their size on retransmission.
+"""
+
+import math
+import threading
+import time
+
+from simulated_channel import SimulatedChannel
+from utils import DATA_LEN_LEN, OFF_DATA, REDUNDANT_BIT_CODE, DataFrame, PackedDataFrame, redundancy_len
+
+ARQ_KIND_LEN = 2
+ARQ_SEQ_LEN = 16
+ARQ_HEADER_LEN = ARQ_KIND_LEN + ARQ_SEQ_LEN
+SEQ_MOD = 1 << ARQ_SEQ_LEN
+
+DATA = 0
+ACK = 1
+NAK = 2
+
+STOP_AND_WAIT = "stop-and-wait"
+GO_BACK_N = "go-back-n"
+SELECTIVE_REPEAT = "selective-repeat"
+MODES = (STOP_AND_WAIT, GO_BACK_N, SELECTIVE_REPEAT)
+
+DEFAULT_TIMEOUT = 0.02  # seconds
+MAX_RETRIES = 100
+
+# adaptive frame sizing
+ADAPT_DECAY = 0.98  # weight of older outcomes, ~50 frames of memory
+ADAPT_INTERVAL = 8  # outcomes between resizes
+ADAPT_STEP = 1.05  # spacing of the candidate sizes
+
+
+def check_window(mode, window):
+    """Window actually used for `mode` (1 for Stop-and-Wait); raises if too large."""
+    if mode not in MODES:
+        raise ValueError("Unknown ARQ mode: {}".format(mode))
+    if mode == STOP_AND_WAIT:
+        return 1
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    # sequence numbers must stay unambiguous across one window
+    limit = SEQ_MOD // 2 if mode == SELECTIVE_REPEAT else SEQ_MOD - 1
+    if window > limit:
+        raise ValueError("window too large for {}-bit sequence numbers ({} max)".format(ARQ_SEQ_LEN, limit))
+    return window
+
+
+def chunk_bits(frame_size, redundant_bit_type):
+    """Payload bits per data frame of frame_size BYTES (after header, ARQ header and redundancy)."""
+    bits = frame_size * 8 - OFF_DATA - ARQ_HEADER_LEN - redundancy_len(redundant_bit_type, frame_size * 8)
+    if bits <= 0:
+        raise ValueError("Frame size too small for header + ARQ header + CRC")
+    return bits
+
+
+def frame_size_limits(redundant_bit_type):
+    """
+    (smallest, largest) data frame size in BYTES: at least one payload bit,
+    and the payload plus ARQ header must fit the DATA_LEN_LEN length field.
+    """
+
+    def payload(size):
+        try:
+            return max(chunk_bits(size, redundant_bit_type), 0)
+        except ValueError:
+            return 0
+
+    smallest = (OFF_DATA + ARQ_HEADER_LEN) // 8 + 1
+    while not payload(smallest):
+        smallest += 1
+    limit = (1 << DATA_LEN_LEN) - 1 - ARQ_HEADER_LEN
+    # payload grows with the frame size: binary search the largest that fits
+    low, high = smallest, smallest
+    while payload(high) <= limit:
+        low, high = high, high * 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if payload(mid) <= limit:
+            low = mid
+        else:
+            high = mid
+    return smallest, low
+
+
+class AdaptiveFrameSize:
+    """
+    Frame size that maximizes the expected goodput of a data frame,
+
+        payload(n) / n * (1 - p)^n     (n = frame bits)
+
+    for the bit error rate p implied by the observed rejection rate. Outcomes
+    are exponentially weighted, and a half failure is assumed up front, so a
+    clean link grows the frames step by step instead of jumping to the
+    largest size. A resize moves at most a factor of two.
+    """
+
+    def __init__(self, redundant_bit_type, frame_size=64, min_size=None, max_size=None, decay=ADAPT_DECAY):
+        smallest, largest = frame_size_limits(redundant_bit_type)
+        self.min_size = max(smallest, min_size or smallest)
+        self.max_size = min(largest, max_size or largest)
+        if self.min_size > self.max_size:
+            raise ValueError("empty frame size range")
+        self.size = min(max(frame_size, self.min_size), self.max_size)
+        self.decay = decay
+        self.failures = self.outcomes = self.bits = 0.0
+        self.pending = 0
+        # candidate sizes and their payload bits
+        sizes = {self.min_size, self.max_size}
+        size = float(self.min_size)
+        while size < self.max_size:
+            sizes.add(int(size))
+            size *= ADAPT_STEP
+        self.candidates = [(n, chunk_bits(n, redundant_bit_type)) for n in sorted(sizes)]
+
+    def observe(self, nbits, ok):
+        """Record one frame of nbits bits as acknowledged (ok) or rejected."""
+        d = self.decay
+        self.failures = self.failures * d + (not ok)
+        self.outcomes = self.outcomes * d + 1
+        self.bits = self.bits * d + nbits
+        self.pending += 1
+        if self.pending >= ADAPT_INTERVAL:
+            self.pending = 0
+            self.resize()
+
+    def ber(self):
+        """Bit error rate that explains the weighted rejection rate."""
+        if not self.outcomes:
+            return 0.0
+        rejected = (self.failures + 0.5) / (self.outcomes + 1)
+        return -math.expm1(math.log1p(-rejected) * self.outcomes / self.bits)
+
+    def resize(self):
+        p = self.ber()
+        log_ok = math.log1p(-p)
+        best = max(self.candidates, key=lambda c: c[1] / c[0] * math.exp(c[0] * 8 * log_ok))[0]
+        self.size = min(max(best, self.size // 2, self.min_size), self.size * 2)
+        return self.size
+
+
+def build_frame(kind, seq, payload, src, dst, redundant_bit_type, isLast=False):
+    """Serialized ARQ frame (bit-string); src / dst are (ip, port) bit-string pairs."""
+    arq_header = format(kind, "0{}b".format(ARQ_KIND_LEN)) + format(seq % SEQ_MOD, "0{}b".format(ARQ_SEQ_LEN))
+    frame = DataFrame(arq_header + payload, src[0], src[1], dst[0], dst[1], redundant_bit_type, isLast=isLast)
+    return frame.serialize()
+
+
+def parse_frame(res):
+    """(kind, seq, payload, isLast) of a received frame, or None if it fails validation."""
+    # packed validation: same verdict as DataFrame.validate, without its prints
+    frame = PackedDataFrame.fromBitString(res)
+    if not frame.validate() or frame.getDatawordLen() < ARQ_HEADER_LEN:
+        return None
+    kind = frame.getField(OFF_DATA, ARQ_KIND_LEN)
+    seq = frame.getField(OFF_DATA + ARQ_KIND_LEN, ARQ_SEQ_LEN)
+    return kind, seq, frame.getDataBits()[ARQ_HEADER_LEN:], frame.isLast()
+
+
+def _ahead(seq, base):
+    # absolute distance of `seq` past `base` within the sequence space
+    return (seq - base) % SEQ_MOD
+
+
+class ARQSender:
+    """
+    Sends data_bits over `session` and reads ACK/NAK frames from `acks`.
+    run() returns the sender statistics once every frame is acknowledged.
+    """
+
+    def __init__(
+        self,
+        session,
+        acks,
+        sender_addr,
+        receiver_addr,
+        mode=GO_BACK_N,
+        window=8,
+        timeout=DEFAULT_TIMEOUT,
+        redundant_bit_type="crc-16",
+        frame_size=64,
+        max_retries=MAX_RETRIES,
+        adaptive=False,
+    ):
+        """adaptive: size new data frames from the observed rejection rate (AdaptiveFrameSize)"""
+        self.session = session
+        self.acks = acks
+        self.src = sender_addr
+        self.dst = receiver_addr
+        self.mode = mode
+        self.window = check_window(mode, window)
+        self.timeout = timeout
+        self.redundant_bit_type = redundant_bit_type
+        self.frame_size = frame_size
+        self.max_retries = max_retries
+        self.sizer = AdaptiveFrameSize(redundant_bit_type, frame_size) if adaptive else None
+        self.stats = dict.fromkeys(
+            ("frames", "transmissions", "retransmissions", "timeouts", "acks", "naks", "corrupt_acks"), 0
+        )
+
+    def _more(self, i):
+        """
+        True if data frame i exists, building it from the unsent data when
+        needed: frames are cut as the window reaches them, so an adaptive
+        sender sizes each one from the latest estimate.
+        """
+        if i < len(self.frames):
+            return True
+        if self.frames and self.offset >= len(self.data):
+            return False
+        frame_size = self.sizer.size if self.sizer else self.frame_size
+        size = chunk_bits(frame_size, self.redundant_bit_type)
+        chunk = self.data[self.offset : self.offset + size]
+        self.offset += size
+        isLast = self.offset >= len(self.data)
+        self.frames.append(build_frame(DATA, i, chunk, self.src, self.dst, self.redundant_bit_type, isLast))
+        return True
+
+    def _observe(self, i, ok):
+        # outcome of frame i for the adaptive sizer
+        if self.sizer is not None:
+            self.sizer.observe(len(self.frames[i]), ok)
+
+    def _transmit(self, i):
+        self.session.send(self.frames[i])
+        if i == len(self.tries):
+            self.tries.append(0)
+        self.stats["transmissions"] += 1
+        self.tries[i] += 1
+        if self.tries[i] > 1:
+            self.stats["retransmissions"] += 1
+            if self.tries[i] > self.max_retries:
+                raise ConnectionError("frame {} not acknowledged after {} tries".format(i, self.max_retries))
+
+    def run(self, data_bits):
+        self.data = data_bits
+        self.offset = 0
+        self.frames = []
+        self.tries = []
+        self.stats["payload_bits"] = len(data_bits)
+        selective = self.mode == SELECTIVE_REPEAT
+        base = next_seq = 0
+        acked = set()
+        naked = set()  # frames already resent for a NAK, until their timer fires
+        deadlines = {}  # frame -> resend time (Go-Back-N keeps only the base)
+        started = time.perf_counter()
+
+        while base < len(self.frames) or self._more(base):
+            while next_seq < base + self.window and self._more(next_seq):
+                self._transmit(next_seq)
+                if selective or not deadlines:
+                    deadlines[next_seq] = time.perf_counter() + self.timeout
+                next_seq += 1
+            self.session.flush()
+
+            wait = min(deadlines.values()) - time.perf_counter()
+            try:
+                res = self.acks.receive(timeout=max(wait, 0.0))
+            except TimeoutError:
+                res = False
+            if res is None:
+                raise ConnectionError("acknowledgement channel closed")
+
+            if res is False:
+                # timer expired
+                now = time.perf_counter()
+                self.stats["timeouts"] += 1
+                if selective:
+                    for i in [i for i, t in deadlines.items() if t <= now]:
+                        self._observe(i, False)
+                        self._transmit(i)
+                        deadlines[i] = now + self.timeout
+                        naked.discard(i)
+                else:
+                    self._observe(base, False)
+                    for i in range(base, next_seq):
+                        self._transmit(i)
+                    deadlines = {base: now + self.timeout}
+                    naked.clear()
+                continue
+
+            parsed = parse_frame(res)
+            if parsed is None or parsed[0] == DATA:
+                self.stats["corrupt_acks"] += 1
+                continue
+            kind, seq = parsed[0], parsed[1]
+            now = time.perf_counter()
+            if kind == ACK:
+                self.stats["acks"] += 1
+                if selective:
+                    i = base + _ahead(seq, base)
+                    if i < next_seq and i not in acked:
+                        self._observe(i, True)
+                        acked.add(i)
+                        deadlines.pop(i, None)
+                        while base in acked:
+                            acked.discard(base)
+                            base += 1
+                else:
+                    # cumulative: seq is the next frame the receiver expects
+                    i = base + _ahead(seq, base)
+                    if base < i <= next_seq:
+                        for j in range(base, i):
+                            self._observe(j, True)
+                        base = i
+                        deadlines = {base: now + self.timeout} if base < next_seq else {}
+            else:
+                self.stats["naks"] += 1
+                i = base + _ahead(seq, base)
+                if i >= next_seq:
+                    continue
+                if not selective and i > base:
+                    # every frame before i arrived
+                    for j in range(base, i):
+                        self._observe(j, True)
+                    base = i
+                    deadlines = {base: now + self.timeout}
+                # frames still in flight trigger more NAKs for the same gap;
+                # answer the first one, the timer covers the rest
+                if i in naked or i in acked:
+                    continue
+                naked.add(i)
+                self._observe(i, False)
+                if selective:
+                    self._transmit(i)
+                    deadlines[i] = now + self.timeout
+                else:
+                    # go back to i
+                    for j in range(base, next_seq):
+                        self._transmit(j)
+                    deadlines = {base: now + self.timeout}
+
+        self.session.flush()
+        total = len(self.frames)
+        self.stats["frames"] = total
+        self.stats["frame_bits"] = sum(map(len, self.frames)) / total
+        elapsed = time.perf_counter() - started
+        self.stats["elapsed"] = elapsed
+        self.stats["goodput_bps"] = len(data_bits) / elapsed if elapsed else 0.0
+        self.stats["efficiency"] = total / self.stats["transmissions"] if self.stats["transmissions"] else 0.0
+        return self.stats
+
+
+class ARQReceiver:
+    """
+    Receives data frames from `session`, answers on `acks` and passes the
+    in-order payload to on_data(bits, isLast). run() returns once the sender
+    closes its session (it keeps answering retransmissions until then).
+    """
+
+    def __init__(
+        self, session, acks, sender_addr, receiver_addr, mode=GO_BACK_N, window=8, redundant_bit_type="crc-16", on_data=None
+    ):
+        self.session = session
+        self.acks = acks
+        # ACK/NAK frames go the other way
+        self.src = receiver_addr
+        self.dst = sender_addr
+        self.mode = mode
+        self.window = check_window(mode, window)
+        self.redundant_bit_type = redundant_bit_type
+        self.on_data = on_data
+        self.stats = dict.fromkeys(
+            ("delivered", "duplicates", "buffered", "dropped", "corrupted", "acks_sent", "naks_sent"), 0
+        )
+        self.complete = False
+
+    def _reply(self, kind, seq):
+        self.acks.send(build_frame(kind, seq, "", self.src, self.dst, self.redundant_bit_type))
+        self.acks.flush()
+        self.stats["acks_sent" if kind == ACK else "naks_sent"] += 1
+
+    def _deliver(self, payload, isLast):
+        self.stats["delivered"] += 1
+        if self.on_data is not None:
+            self.on_data(payload, isLast)
+        self.complete = self.complete or isLast
+
+    def run(self):
+        selective = self.mode == SELECTIVE_REPEAT
+        expected = 0
+        buffered = {}
+        nak_sent = False  # one NAK per gap
+
+        for res in self.session:
+            parsed = parse_frame(res)
+            if parsed is None or parsed[0] != DATA:
+                self.stats["corrupted"] += 1
+                if not nak_sent:
+                    self._reply(NAK, expected)
+                    nak_sent = True
+                continue
+            _, seq, payload, isLast = parsed
+            # signed offset from the next expected frame
+            offset = (seq - expected + SEQ_MOD // 2) % SEQ_MOD - SEQ_MOD // 2
+
+            if offset < 0:
+                # already delivered, our ACK was lost or late
+                self.stats["duplicates"] += 1
+                self._reply(ACK, seq if selective else expected)
+                continue
+            if offset == 0:
+                self._deliver(payload, isLast)
+                expected += 1
+                while expected in buffered:
+                    self._deliver(*buffered.pop(expected))
+                    expected += 1
+                nak_sent = False
+                self._reply(ACK, seq if selective else expected)
+                continue
+            # ahead of the expected frame: something before it is missing
+            if selective and offset < self.window:
+                i = expected + offset
+                if i in buffered:
+                    self.stats["duplicates"] += 1
+                else:
+                    buffered[i] = (payload, isLast)
+                    self.stats["buffered"] += 1
+                self._reply(ACK, seq)
+            else:
+                self.stats["dropped"] += 1
+            if not nak_sent:
+                self._reply(NAK, expected)
+                nak_sent = True
+
+        self.acks.close()
+        return self.stats
+
+
+def transfer(
+    data_bits,
+    mode=GO_BACK_N,
+    window=8,
+    timeout=DEFAULT_TIMEOUT,
+    forward=None,
+    reverse=None,
+    sender_addr=("0" * 32, "0" * 16),
+    receiver_addr=("0" * 32, "0" * 16),
+    redundant_bit_type="crc-16",
+    frame_size=64,
+    on_data=None,
+    adaptive=False,
+):
+    """
+    Reliable in-process transfer of data_bits: data over `forward`, ACK/NAK
+    over `reverse` (SimulatedChannels, error free by default), receiver in a
+    thread. Returns {"sender": ..., "receiver": ..., "complete": bool}.
+    """
+    if redundant_bit_type not in REDUNDANT_BIT_CODE:
+        raise ValueError("Unknown redundancy type: {}".format(redundant_bit_type))
+    forward = forward or SimulatedChannel()
+    reverse = reverse or SimulatedChannel(capacity=0)
+    receiver = ARQReceiver(
+        forward.accept(), reverse.connect(), sender_addr, receiver_addr, mode, window, redundant_bit_type, on_data
+    )
+    receiving = threading.Thread(target=receiver.run)
+    receiving.start()
+    sender = ARQSender(
+        forward.connect(),
+        reverse.accept(),
+        sender_addr,
+        receiver_addr,
+        mode,
+        window,
+        timeout,
+        redundant_bit_type,
+        frame_size,
+        adaptive=adaptive,
+    )
+    try:
+        sender_stats = sender.run(data_bits)
+    finally:
+        sender.session.close()
+        receiving.join()
+    return {"sender": sender_stats, "receiver": receiver.stats, "complete": receiver.complete}
+
+
+def sweep(data_bits, windows=(1, 2, 4, 8, 16, 32), modes=MODES, ber=1e-4, loss=0.0, latency=0.001, seed=0, **kwargs):
+    """
+    transfer() for every mode / window over channels with the given bit error
+    rate, loss and one-way latency. Returns one row of stats per run.
+    """
+    from custom_error_injector import BSC
+
+    rows = []
+    for mode in modes:
+        for window in (1,) if mode == STOP_AND_WAIT else windows:
+            forward = SimulatedChannel(latency=latency, loss=loss, error_model=BSC(ber) if ber else None, seed=seed)
+            reverse = SimulatedChannel(
+                capacity=0, latency=latency, loss=loss, error_model=BSC(ber) if ber else None, seed=seed + 1
+            )
+            kwargs.setdefault("timeout", max(DEFAULT_TIMEOUT, 4 * latency))
+            result = transfer(data_bits, mode, window, forward=forward, reverse=reverse, **kwargs)
+            row = {"mode": mode, "window": window, "complete": result["complete"]}
+            row.update(result["sender"])
+            rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    import random
+
+    bits = format(random.Random(0).getrandbits(64 * 1024) | 1 << 64 * 1024, "b")[1:]
+    print(f"{'mode':>17} {'window':>6} {'goodput kb/s':>13} {'tx':>6} {'retx':>6} {'timeouts':>8} {'efficiency':>10}")
+    for row in sweep(bits):
+        print(
+            f"{row['mode']:>17} {row['window']:>6} {row['goodput_bps'] / 1000:>13.1f} {row['transmissions']:>6} "
+            f"{row['retransmissions']:>6} {row['timeouts']:>8} {row['efficiency']:>10.3f}"
+        )
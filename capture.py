@@ -0,0 +1,261 @@
+"""
+Binary capture files for frames (a small pcap-like format).
+
+Layout (all integers big-endian):
+
+    file header   magic b"ECAP", version u16, reserved u16, created f64
+    record        timestamp f64, direction u8, error type u8,
+                  error count u32, frame length in bits u32
+                  error positions  u32 * error count
+                  frame bytes      ceil(bits / 8), packed as PackedDataFrame
+
+Frames are stored packed (8 bits per byte), so a capture is ~8x smaller than
+the bit-strings sent by sender.py. Next to every capture an index file
+(<capture>.idx) holds the byte offset of each record as little-endian u64, so
+CaptureReader can mmap both files and jump to record i in O(1). A missing or
+stale index is rebuilt with one scan of the capture.
+
+Version 1 files (error count u16) are still read, and appended to as long as
+every record has at most 65535 error positions.
+"""
+
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+from utils import DataFrame, PackedDataFrame
+
+MAGIC = b"ECAP"
+VERSION = 2
+FILE_HEADER = struct.Struct("!4sHHd")
+RECORD_HEADER = struct.Struct("!dBBII")
+# record header of each readable version
+RECORD_HEADERS = {1: struct.Struct("!dBBHI"), VERSION: RECORD_HEADER}
+POSITION = struct.Struct("!I")
+INDEX_ENTRY = struct.Struct("<Q")
+INDEX_SUFFIX = ".idx"
+
+# direction field
+SENT = 0
+RECEIVED = 1
+
+# error type field, names as in error_handler.inject_error
+ERROR_TYPE_CODES = {None: 0, "single": 1, "two_isolated": 2, "odd": 3, "burst": 4, "custom": 5}
+ERROR_CODE_TO_TYPE = {v: k for k, v in ERROR_TYPE_CODES.items()}
+
+CaptureRecord = namedtuple("CaptureRecord", "timestamp direction error_type error_positions frame")
+
+
+def _packed(frame):
+    # accept a PackedDataFrame, DataFrame or serialized bit-string
+    if isinstance(frame, PackedDataFrame):
+        return frame
+    if isinstance(frame, DataFrame):
+        return PackedDataFrame.fromDataFrame(frame)
+    return PackedDataFrame.fromBitString(frame)
+
+
+def error_positions(original, corrupted):
+    """Bit positions where two equal-length bit-strings differ (the injected flips)."""
+    if len(original) != len(corrupted):
+        raise ValueError("frames differ in length")
+    diff = int(original, 2) ^ int(corrupted, 2) if original else 0
+    n = len(original)
+    positions = []
+    while diff:
+        low = diff & -diff
+        positions.append(n - low.bit_length())
+        diff ^= low
+    return sorted(positions)
+
+
+class CaptureWriter:
+    """
+    Appends frames to a capture file and its index.
+    Use as a context manager or call close().
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        # records are written in the format of the file they go into
+        self.record_header = RECORD_HEADER
+        if exists:
+            # make sure the index covers what is already there and drop a
+            # truncated last record before appending
+            with CaptureReader(path) as reader:
+                end = reader.end()
+                self.record_header = reader.record_header
+            os.truncate(path, end)
+        self.file = open(path, "ab" if exists else "wb")
+        self.index = open(path + INDEX_SUFFIX, "ab" if exists else "wb")
+        if not exists:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, 0, time.time()))
+        self.offset = self.file.tell()
+        self.frames_written = 0
+
+    def write(self, frame, direction=SENT, error_type=None, positions=(), timestamp=None):
+        """
+        Record one frame. error_type/positions describe errors injected into
+        it (see error_positions); timestamp defaults to now.
+        """
+        frame = _packed(frame)
+        if error_type not in ERROR_TYPE_CODES:
+            raise ValueError("Unknown error type: {}".format(error_type))
+        if self.record_header is not RECORD_HEADER and len(positions) > 0xFFFF:
+            raise ValueError(
+                "{} error positions do not fit a version 1 capture record (65535 max)".format(len(positions))
+            )
+        data = frame.serialize()
+        header = self.record_header.pack(
+            time.time() if timestamp is None else timestamp,
+            direction,
+            ERROR_TYPE_CODES[error_type],
+            len(positions),
+            frame.nbits,
+        )
+        self.file.write(header)
+        if positions:
+            self.file.write(struct.pack("!{}I".format(len(positions)), *positions))
+        self.file.write(data)
+        self.index.write(INDEX_ENTRY.pack(self.offset))
+        self.offset += len(header) + POSITION.size * len(positions) + len(data)
+        self.frames_written += 1
+
+    def flush(self):
+        self.file.flush()
+        self.index.flush()
+
+    def close(self):
+        try:
+            self.file.close()
+        finally:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _read_file_header(path):
+    with open(path, "rb") as f:
+        raw = f.read(FILE_HEADER.size)
+    if len(raw) < FILE_HEADER.size:
+        raise ValueError("{}: not a capture file".format(path))
+    magic, version, _, created = FILE_HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("{}: not a capture file".format(path))
+    if version not in RECORD_HEADERS:
+        raise ValueError("{}: unsupported capture version {}".format(path, version))
+    return version, created
+
+
+def _record_end(buf, offset, record_header=RECORD_HEADER):
+    # byte offset just past the record starting at `offset`
+    _, _, _, count, nbits = record_header.unpack_from(buf, offset)
+    return offset + record_header.size + POSITION.size * count + ((nbits + 7) >> 3)
+
+
+def build_index(path):
+    """Scan a capture and (re)write its index. Returns the number of records."""
+    version, _ = _read_file_header(path)
+    record_header = RECORD_HEADERS[version]
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        offsets = []
+        if size > FILE_HEADER.size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = FILE_HEADER.size
+                while offset + record_header.size <= size:
+                    end = _record_end(mm, offset, record_header)
+                    if end > size:
+                        break  # truncated last record (writer killed mid-frame)
+                    offsets.append(offset)
+                    offset = end
+    with open(path + INDEX_SUFFIX, "wb") as f:
+        f.write(b"".join(INDEX_ENTRY.pack(o) for o in offsets))
+    return len(offsets)
+
+
+class CaptureReader:
+    """
+    Random access to a capture through mmap. reader[i] decodes record i,
+    iteration yields records in file order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version, self.created = _read_file_header(path)
+        self.record_header = RECORD_HEADERS[self.version]
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._index_valid():
+            build_index(path)
+        self.index_file = open(path + INDEX_SUFFIX, "rb")
+        index_size = os.fstat(self.index_file.fileno()).st_size
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ) if index_size else b""
+        self.count = index_size // INDEX_ENTRY.size
+
+    def _index_valid(self):
+        # the index is current when its last entry ends exactly at end of file
+        index_path = self.path + INDEX_SUFFIX
+        if not os.path.exists(index_path):
+            return False
+        index_size = os.path.getsize(index_path)
+        if index_size % INDEX_ENTRY.size:
+            return False
+        if index_size == 0:
+            return self.size <= FILE_HEADER.size
+        with open(index_path, "rb") as f:
+            f.seek(index_size - INDEX_ENTRY.size)
+            (last,) = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+        if last + self.record_header.size > self.size:
+            return False
+        return _record_end(self.mm, last, self.record_header) == self.size
+
+    def offset(self, i):
+        return INDEX_ENTRY.unpack_from(self.index, i * INDEX_ENTRY.size)[0]
+
+    def end(self):
+        # byte offset just past the last complete record
+        return _record_end(self.mm, self.offset(self.count - 1), self.record_header) if self.count else FILE_HEADER.size
+
+    def _decode(self, offset):
+        timestamp, direction, code, count, nbits = self.record_header.unpack_from(self.mm, offset)
+        offset += self.record_header.size
+        positions = list(struct.unpack_from("!{}I".format(count), self.mm, offset)) if count else []
+        offset += POSITION.size * count
+        frame = PackedDataFrame(self.mm[offset : offset + ((nbits + 7) >> 3)], nbits)
+        return CaptureRecord(timestamp, direction, ERROR_CODE_TO_TYPE.get(code, "custom"), positions, frame)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("capture record index out of range")
+        return self._decode(self.offset(i))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._decode(self.offset(i))
+
+    def close(self):
+        if isinstance(self.index, mmap.mmap):
+            self.index.close()
+        self.mm.close()
+        self.index_file.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
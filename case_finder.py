@@ -0,0 +1,225 @@
+"""
+Constructs error patterns that one scheme misses and the other catches.
+
+Random injection almost never produces an undetected CRC error, so the cases
+are built algebraically on the message part of a frame (header + payload,
+everything before the redundancy bits), which is the same for every scheme:
+
+  * CRC misses      -- E(x) = sum of x^s * G(x) for a few random shifts s.
+                       Every multiple of G leaves the remainder unchanged
+                       (CRC(M + E) = CRC(M) + CRC(E) and CRC(E) = 0).
+  * checksum misses -- pairs of flips at the same bit of two 16-bit words,
+                       one 0 -> 1 and one 1 -> 0. Every word has weight
+                       2^16k == 1 mod 0xFFFF, so the sum gains and loses the
+                       same 2^b and the one's complement sum does not move.
+
+Each candidate is then checked against the other scheme (CRC via the
+per-position syndrome table, the checksum on the flipped message value) and
+kept only if that scheme detects it. Positions are 0-based from the first
+bit of the frame, so a case can be fed straight to frame_cases.flip_bits.
+
+By default errors stay inside the payload (OFF_DATA onwards): a flipped
+header would change how the receiver reads the frame, not just its check.
+
+    finder = CaseFinder(DataFrame.createFrames(bits, src, dst, "crc-16")[0], seed=1)
+    finder.crc_misses("crc-16", 100)        # CRC misses, checksum detects
+    finder.checksum_misses("crc-16", 100)   # checksum misses, CRC detects
+"""
+
+import random
+import time
+from collections import namedtuple
+
+from error_handler import calculate_checksum, calculate_crc, ones_complement_sum, verify_checksum
+from custom_error_injector import flip_bitstring
+from simulator import syndrome_table
+from utils import CRC_POLY, OFF_DATA, OFF_RED_CODE, REDUNDANT_BIT_CODE, DataFrame, redundancy_len
+
+# positions: flipped bits of the frame; crc: name in utils.CRC_POLY
+Case = namedtuple("Case", "positions crc crc_detects checksum_detects")
+
+WORD_BITS = 16
+
+# candidates tried per requested case before giving up
+MAX_TRIES_PER_CASE = 100
+
+
+def _set_bits(value):
+    # bit indices (LSB = 0) of a non-negative int
+    bits = []
+    while value:
+        low = value & -value
+        bits.append(low.bit_length() - 1)
+        value ^= low
+    return bits
+
+
+class CaseFinder:
+    def __init__(self, frame, seed=None, start=OFF_DATA, stop=None):
+        """
+        frame: DataFrame / PackedDataFrame or its bit-string (any redundancy type)
+        start, stop: bit positions errors may touch (default: the payload)
+        """
+        bits = frame
+        if not isinstance(bits, str):
+            bits = frame.toBitString() if hasattr(frame, "toBitString") else frame.serialize()
+        red_type = DataFrame(bits).getRedundantBitType()
+        if red_type == "unknown":
+            raise ValueError("frame has an unknown redundancy code")
+        self.message = bits[: len(bits) - redundancy_len(red_type, len(bits))]
+        self.m = len(self.message)
+        self.start = start
+        self.stop = self.m if stop is None else min(stop, self.m)
+        if self.stop <= self.start:
+            raise ValueError("empty error region")
+        # checksum verdicts are for the message as a checksum frame carries it
+        self.value = int(self._message("checksum"), 2)
+        self.base_sum = ones_complement_sum(self.value)
+        self.rng = random.Random(seed)
+        self._syn = {}
+        self._words = None
+
+    # --- verdicts ---------------------------------------------------------------
+    def syndromes(self, crc):
+        # syn[p] = x^(m-1-p) mod G, message positions
+        if crc not in self._syn:
+            self._syn[crc] = syndrome_table(CRC_POLY[crc], self.m).tolist()
+        return self._syn[crc]
+
+    def crc_detects(self, crc, positions):
+        syn = self.syndromes(crc)
+        s = 0
+        for p in positions:
+            s ^= syn[p]
+        return s != 0
+
+    def checksum_detects(self, error):
+        # error: int mask over the message value
+        return ones_complement_sum(self.value ^ error) != self.base_sum
+
+    def _positions(self, error):
+        return tuple(sorted(self.m - 1 - b for b in _set_bits(error)))
+
+    # --- searches ---------------------------------------------------------------
+    def crc_misses(self, crc, count, max_terms=3, max_tries=None):
+        """
+        Up to `count` distinct cases the CRC misses and the checksum detects.
+        Each pattern is the sum of 1..max_terms shifted copies of G.
+        """
+        poly = int(CRC_POLY[crc], 2)
+        width = len(CRC_POLY[crc]) - 1
+        # shifts keeping x^s * G inside [start, stop): bit b is position m-1-b
+        low, high = self.m - self.stop, self.m - 1 - self.start - width
+        if high < low:
+            raise ValueError("error region shorter than the generator")
+        rng = self.rng
+        cases, seen = [], set()
+        tries = count * MAX_TRIES_PER_CASE if max_tries is None else max_tries
+        for _ in range(tries):
+            error = 0
+            for _ in range(rng.randint(1, max_terms)):
+                error ^= poly << rng.randint(low, high)
+            if not error or error in seen:
+                continue
+            seen.add(error)
+            if self.checksum_detects(error):
+                cases.append(Case(self._positions(error), crc, False, True))
+                if len(cases) == count:
+                    break
+        return cases
+
+    def _word_bits(self):
+        # message value bits in the region, by bit-in-word and value: zeros[k], ones[k]
+        if self._words is None:
+            zeros = [[] for _ in range(WORD_BITS)]
+            ones = [[] for _ in range(WORD_BITS)]
+            for b in range(self.m - self.stop, self.m - self.start):
+                (ones if self.value >> b & 1 else zeros)[b % WORD_BITS].append(b)
+            usable = [k for k in range(WORD_BITS) if zeros[k] and ones[k]]
+            self._words = zeros, ones, usable
+        return self._words
+
+    def checksum_misses(self, crc, count, max_pairs=3, max_tries=None):
+        """
+        Up to `count` distinct cases the checksum misses and the CRC detects.
+        Each pattern is 1..max_pairs compensating flip pairs.
+        """
+        zeros, ones, usable = self._word_bits()
+        if not usable:
+            raise ValueError("no word-aligned compensating pair in the error region")
+        syn = self.syndromes(crc)
+        m = self.m
+        rng = self.rng
+        cases, seen = [], set()
+        tries = count * MAX_TRIES_PER_CASE if max_tries is None else max_tries
+        for _ in range(tries):
+            error = 0
+            for _ in range(rng.randint(1, max_pairs)):
+                k = rng.choice(usable)
+                error |= (1 << rng.choice(zeros[k])) | (1 << rng.choice(ones[k]))
+            # pairs sharing a bit collapse; the exact check below still decides
+            if error in seen:
+                continue
+            seen.add(error)
+            if self.checksum_detects(error):
+                continue
+            bits = _set_bits(error)
+            s = 0
+            for b in bits:
+                s ^= syn[m - 1 - b]
+            if s:
+                cases.append(Case(tuple(sorted(m - 1 - b for b in bits)), crc, True, False))
+                if len(cases) == count:
+                    break
+        return cases
+
+    # --- exact re-check -----------------------------------------------------------
+    def _message(self, scheme):
+        # the message with `scheme`'s code in the redundancy code field
+        return self.message[:OFF_RED_CODE] + REDUNDANT_BIT_CODE[scheme] + self.message[OFF_DATA:]
+
+    def codeword(self, scheme):
+        """The frame's message as a `scheme` frame: its code field, then its CRC / checksum."""
+        message = self._message(scheme)
+        if scheme == "checksum":
+            return message + calculate_checksum(message)
+        return message + calculate_crc(message, CRC_POLY[scheme])
+
+    def verify(self, case):
+        """Re-run both receivers' checks on the flipped codewords."""
+        width = len(CRC_POLY[case.crc]) - 1
+        crc_word = flip_bitstring(self.codeword(case.crc), case.positions)
+        crc_detects = calculate_crc(crc_word[:-width], CRC_POLY[case.crc]) != crc_word[-width:]
+        checksum_detects = not verify_checksum(flip_bitstring(self.codeword("checksum"), case.positions))
+        return (crc_detects, checksum_detects) == (case.crc_detects, case.checksum_detects)
+
+
+def find_cases(frame, count=100, crcs=None, seed=None):
+    """
+    Both kinds of cases for every CRC in crcs (default all of utils.CRC_POLY).
+    Returns {crc: {"crc_misses": [...], "checksum_misses": [...]}}.
+    """
+    finder = CaseFinder(frame, seed=seed)
+    return {
+        crc: {"crc_misses": finder.crc_misses(crc, count), "checksum_misses": finder.checksum_misses(crc, count)}
+        for crc in (CRC_POLY if crcs is None else crcs)
+    }
+
+
+if __name__ == "__main__":
+    from utils import ascii_to_bin
+
+    addr = ("0" * 32, "0" * 16)
+    text = "The quick brown fox jumps over the lazy dog. " * 2
+    frame = DataFrame.createFrames(ascii_to_bin(text), addr, addr, redundant_bits_type="crc-16", frame_size=64)[0]
+    finder = CaseFinder(frame, seed=0)
+    for crc in CRC_POLY:
+        for kind, search in (("CRC misses", finder.crc_misses), ("checksum misses", finder.checksum_misses)):
+            began = time.perf_counter()
+            cases = search(crc, 10_000)
+            elapsed = time.perf_counter() - began
+            verified = all(finder.verify(c) for c in cases[:200])
+            print(
+                f"{crc:>7} {kind:>15}: {len(cases)} cases in {elapsed:.3f}s "
+                f"({len(cases) / elapsed:.0f}/s), verified={verified}, e.g. {list(cases[0].positions) if cases else None}"
+            )
@@ -0,0 +1,81 @@
+"""
+Vectorized 16-bit one's complement checksum (NumPy).
+
+Data is viewed as big-endian uint16 words and summed in a single pass; the
+carries are folded back in afterwards (end-around carry). Folding the plain
+sum gives the same value as adding word by word with end-around carry, so
+the results match error_handler.calculate_checksum on the same bits.
+
+Odd-length data gets a zero byte in front, the same left padding
+calculate_checksum applies to bit-strings.
+"""
+
+import numpy as np
+
+
+def _fold(total):
+    # fold carries of an (array of) uint64 sums down to 16 bits
+    while True:
+        high = total >> 16
+        if not np.any(high):
+            return total
+        total = (total & 0xFFFF) + high
+
+
+def _as_words(data):
+    buf = np.frombuffer(data, dtype=np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+    if buf.size % 2:
+        buf = np.concatenate((np.zeros(1, dtype=np.uint8), buf))
+    return buf.view(">u2")
+
+
+def _as_word_matrix(frames):
+    # frames: 2-D uint8 array (one frame per row) or a list of equal-length bytes
+    if isinstance(frames, np.ndarray):
+        block = np.ascontiguousarray(frames, dtype=np.uint8)
+    else:
+        block = np.array([np.frombuffer(f, dtype=np.uint8) for f in frames], dtype=np.uint8)
+    if block.ndim != 2:
+        raise ValueError("frames must be a 2-D array or a list of equal-length frames")
+    if block.shape[1] % 2:
+        block = np.hstack((np.zeros((block.shape[0], 1), dtype=np.uint8), block))
+    return block.view(">u2")
+
+
+def ones_complement_sum(data):
+    """16-bit one's complement sum of bytes-like data (or a uint8 array)."""
+    words = _as_words(data)
+    return int(_fold(np.uint64(words.sum(dtype=np.uint64))))
+
+
+def checksum(data):
+    """Checksum (complement of the one's complement sum) of bytes-like data, as an int."""
+    return ones_complement_sum(data) ^ 0xFFFF
+
+
+def verify(data_with_checksum):
+    """True if the trailing 16-bit checksum of a packed block matches the rest."""
+    buf = np.frombuffer(data_with_checksum, dtype=np.uint8)
+    return checksum(buf[:-2]) == (int(buf[-2]) << 8 | int(buf[-1]))
+
+
+def checksum_batch(frames):
+    """
+    Checksums of many equal-length frames in one call.
+    Returns a uint16 array with one checksum per frame (row).
+    """
+    words = _as_word_matrix(frames)
+    sums = _fold(words.sum(axis=1, dtype=np.uint64))
+    return (sums ^ 0xFFFF).astype(np.uint16)
+
+
+def verify_batch(frames):
+    """
+    Verify many packed frames whose last 2 bytes are the checksum.
+    Returns a bool array, True where the checksum matches.
+    """
+    block = np.ascontiguousarray(frames, dtype=np.uint8) if isinstance(frames, np.ndarray) else np.array(
+        [np.frombuffer(f, dtype=np.uint8) for f in frames], dtype=np.uint8
+    )
+    received = (block[:, -2].astype(np.uint16) << 8) | block[:, -1]
+    return checksum_batch(block[:, :-2]) == received
@@ -1,83 +1,766 @@
+import asyncio
+import os
+import select
+import socket
+import struct
+from collections import deque
+
+import metrics
+from frame_ring import FrameRingListener, FrameRingSenderSession
+
+# Default receiver address and port
+RECEIVER_ADDRESS = ('localhost', 12345)
+
+# Transports: TCP stream (length-prefixed frames), one frame per datagram,
+# or a shared-memory ring between two local processes (frame_ring)
+TRANSPORTS = ("tcp", "udp", "unix", "shm")
+
+# Default receiver socket path of the "unix" (AF_UNIX datagram) transport
+UNIX_ADDRESS = "/tmp/error_detection_receiver.sock"
+
+# Largest UDP payload; the datagram receiver reads this much per datagram
+MAX_DATAGRAM = 65507
+
+# A datagram session ends on its end marker, or after this many idle seconds
+# (the end marker can be lost over UDP)
+DEFAULT_IDLE_TIMEOUT = 5.0
+
+# Every datagram starts with its sequence number; the end marker is a datagram
+# of just this header, holding the number of frames in the session
+DATAGRAM_SEQ = struct.Struct("!I")
+
+# UDP flow control: the receiver reports the next sequence number it will
+# consume every CREDIT_INTERVAL frames, and the sender keeps at most
+# DATAGRAM_WINDOW frames beyond the last report in flight. A sender that hears
+# nothing for CREDIT_TIMEOUT seconds assumes the report was lost and goes on.
+CREDIT = struct.Struct("!I")
+DATAGRAM_WINDOW = 256
+CREDIT_INTERVAL = DATAGRAM_WINDOW // 4
+CREDIT_TIMEOUT = 0.05
+
+# Socket buffer asked for on datagram sockets (the OS may cap it)
+DATAGRAM_SOCKET_BUFFER = 4 * 1024 * 1024
+
+# Every frame on the wire is preceded by its length in bytes (4-byte big-endian)
+LENGTH_PREFIX = struct.Struct("!I")
+
+# Packed sessions prefix each frame with its length in BITS instead
+NBITS_PREFIX = struct.Struct("!I")
+
+# Pending bytes after which a session pushes its batched frames to the socket
+DEFAULT_BATCH_BYTES = 64 * 1024
+
+# Receive buffers of a BufferPool (frames larger than this get their own)
+DEFAULT_BUFFER_BYTES = 256 * 1024
+
+# Most segments one sendmsg() call takes
+try:
+    MAX_IOV = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    MAX_IOV = 1024
+
+
+def _to_bytes(frame):
+    # bit-strings are encoded, packed frames (PackedDataFrame.serialize()) go out as-is
+    return frame.encode() if isinstance(frame, str) else frame
+
+
+def _recv_exact(sock, n):
+    # read exactly n bytes, None if the peer closed the connection first
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:])
+        if k == 0:
+            return None
+        got += k
+    return buf
+
+
+def _sendmsg_all(sock, buffers):
+    """
+    Write every buffer with scatter-gather sendmsg() (no join into one
+    bytes object). sendmsg may stop part way, then the rest is retried.
+    """
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+    # empty segments (e.g. no redundancy segment) would make sendmsg return 0
+    views = [v for v in (memoryview(b).cast("B") for b in buffers) if len(v)]
+    i = 0
+    while i < len(views):
+        sent = sock.sendmsg(views[i : i + MAX_IOV])
+        while sent:
+            n = len(views[i])
+            if sent < n:
+                views[i] = views[i][sent:]
+                break
+            sent -= n
+            i += 1
+
+
+class BufferPool:
+    """Preallocated receive buffers, handed out and taken back instead of allocating per frame."""
+
+    def __init__(self, count=2, size=DEFAULT_BUFFER_BYTES):
+        self.size = size
+        self._free = [bytearray(size) for _ in range(count)]
+
+    def acquire(self):
+        return self._free.pop() if self._free else bytearray(self.size)
+
+    def release(self, buf):
+        if len(buf) == self.size:
+            self._free.append(buf)
+
+
+# For the sender
+class SenderSession:
+    """
+    One TCP connection kept open for a whole transfer.
+
+    Frames are length-prefixed and collected in a buffer, which is written
+    with a single sendall() once it reaches batch_bytes (and on flush/close).
+
+        with SenderSession() as session:
+            for frame in frames:
+                session.send(frame.serialize())
+    """
+
+    def __init__(self, address=RECEIVER_ADDRESS, batch_bytes=DEFAULT_BATCH_BYTES):
+        self.address = address
+        self.batch_bytes = batch_bytes
+        self.sock = None
+        self._pending = []
+        self._pending_bytes = 0
+        self.frames_sent = 0
+
+    def connect(self):
+        self.sock = socket.create_connection(self.address)
+        # batching is done here, don't let Nagle delay the final flush
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self
+
+    def send(self, frame):
+        """Queue one frame; it is written once the batch is full or on flush()."""
+        payload = _to_bytes(frame)
+        self._pending.append(LENGTH_PREFIX.pack(len(payload)))
+        self._pending.append(payload)
+        self._pending_bytes += LENGTH_PREFIX.size + len(payload)
+        self.frames_sent += 1
+        metrics.count("frames_sent")
+        metrics.count("bytes_sent", len(payload))
+        if self._pending_bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            with metrics.timer("send"):
+                self.sock.sendall(b"".join(self._pending))
+            self._pending = []
+            self._pending_bytes = 0
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.flush()
+            finally:
+                self.sock.close()
+                self.sock = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PackedSenderSession(SenderSession):
+    """
+    SenderSession for packed frames (PackedDataFrame), without copies: each
+    frame is queued as its NBITS_PREFIX and its header / payload / redundancy
+    memoryviews (PackedDataFrame.segments()), and flush() hands the queued
+    segments to sendmsg() as they are. Read by PackedReceiverSession.
+
+    The frames' buffers must not change until they are flushed.
+    """
+
+    def send(self, frame):
+        self.sendParts(frame.segments(), frame.nbits)
+
+    def sendParts(self, parts, nbits):
+        """Queue one frame of nbits bits given as a list of bytes-like segments."""
+        self._pending.append(NBITS_PREFIX.pack(nbits))
+        self._pending.extend(parts)
+        size = (nbits + 7) >> 3
+        self._pending_bytes += NBITS_PREFIX.size + size
+        self.frames_sent += 1
+        metrics.count("frames_sent")
+        metrics.count("bytes_sent", size)
+        if self._pending_bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            with metrics.timer("send"):
+                _sendmsg_all(self.sock, self._pending)
+            self._pending = []
+            self._pending_bytes = 0
+
+
+# For the receiver
+class ReceiverSession:
+    """Reads length-prefixed frames from one accepted sender connection."""
+
+    def __init__(self, connection, client_address=None, raw=False):
+        self.connection = connection
+        self.client_address = client_address
+        self.raw = raw
+
+    def receive(self):
+        """Return the next frame, or None once the sender has closed the connection."""
+        with metrics.timer("receive"):
+            header = _recv_exact(self.connection, LENGTH_PREFIX.size)
+            if header is None:
+                return None
+            (length,) = LENGTH_PREFIX.unpack(header)
+            frame = _recv_exact(self.connection, length)
+            if frame is None:
+                return None
+        metrics.count("frames_received")
+        metrics.count("bytes_received", length)
+        return bytes(frame) if self.raw else frame.decode()
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PackedReceiverSession:
+    """
+    Reads frames sent by a PackedSenderSession. Data is read with recv_into()
+    into a buffer from a BufferPool, as much as fits per call, and receive()
+    returns (memoryview, nbits) slices of that buffer, ready for
+    PackedDataFrame(view, nbits). A slice is only valid until the next
+    receive(): the buffer is reused (copy it to keep a frame).
+    """
+
+    def __init__(self, connection, client_address=None, pool=None):
+        self.connection = connection
+        self.client_address = client_address
+        self.pool = pool or BufferPool(count=1)
+        self._buf = self.pool.acquire()
+        self._view = memoryview(self._buf)
+        self._start = self._end = 0
+
+    def _fill(self, need):
+        # read more data, first making room for `need` bytes from _start
+        if self._start + need > len(self._buf):
+            # move the partial frame to the front of a fresh buffer
+            buf = self.pool.acquire() if need <= self.pool.size else bytearray(need)
+            view = memoryview(buf)
+            n = self._end - self._start
+            view[:n] = self._view[self._start : self._end]
+            self.pool.release(self._buf)
+            self._buf, self._view = buf, view
+            self._start, self._end = 0, n
+        k = self.connection.recv_into(self._view[self._end :])
+        self._end += k
+        return k
+
+    def receive(self):
+        """Return (view, nbits) for the next frame, or None once the sender has closed the connection."""
+        with metrics.timer("receive"):
+            while True:
+                avail = self._end - self._start
+                need = NBITS_PREFIX.size
+                if avail >= need:
+                    (nbits,) = NBITS_PREFIX.unpack_from(self._buf, self._start)
+                    need += (nbits + 7) >> 3
+                    if avail >= need:
+                        break
+                if self._fill(need) == 0:
+                    return None
+            begin = self._start + NBITS_PREFIX.size
+            self._start += need
+        metrics.count("frames_received")
+        metrics.count("bytes_received", need - NBITS_PREFIX.size)
+        return self._view[begin : self._start], nbits
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        self.connection.close()
+        if self._buf is not None:
+            self.pool.release(self._buf)
+            self._buf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameListener:
+    """Listening socket bound once and reused for every incoming sender session."""
+
+    def __init__(self, address=RECEIVER_ADDRESS, backlog=5):
+        # receive buffers shared by the packed sessions of this listener
+        self.pool = BufferPool()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.bind(address)
+            self.sock.listen(backlog)
+        except Exception:
+            self.sock.close()
+            raise
+
+    def accept(self, raw=False, packed=False):
+        """packed: read a PackedSenderSession (frames as (view, nbits), see PackedReceiverSession)"""
+        connection, client_address = self.sock.accept()
+        if packed:
+            return PackedReceiverSession(connection, client_address, self.pool)
+        return ReceiverSession(connection, client_address, raw=raw)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Datagram transports: UDP and AF_UNIX, one frame per datagram
+# ---------------------------------------------------------------------------
+
+def _datagram_socket(transport):
+    if transport == "udp":
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if transport == "unix":
+        return socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    raise ValueError("Unknown datagram transport: {}".format(transport))
+
+
+def _default_address(transport):
+    return UNIX_ADDRESS if transport == "unix" else RECEIVER_ADDRESS
+
+
+# For the sender
+class DatagramSenderSession:
+    """
+    SenderSession interface over UDP or AF_UNIX datagrams. Every frame is one
+    datagram, DATAGRAM_SEQ sequence number + frame (the datagram boundary is
+    the frame boundary); frames are queued and sent once batch_bytes are
+    pending (and on flush/close). close() sends the end marker.
+
+    With packed=True frames are PackedDataFrames, sent as NBITS_PREFIX plus
+    their segments with one scatter-gather sendmsg() per datagram.
+
+    UDP does not retransmit, so the sender is paced by the receiver's credits
+    (at most window frames ahead of what it has consumed); frames lost anyway
+    show up as sequence gaps on the receiver. An AF_UNIX sender blocks when
+    the receiver is full and needs no credits.
+    """
+
+    def __init__(
+        self, transport="udp", address=None, batch_bytes=DEFAULT_BATCH_BYTES, packed=False, window=DATAGRAM_WINDOW
+    ):
+        self.transport = transport
+        self.address = address or _default_address(transport)
+        self.batch_bytes = batch_bytes
+        self.packed = packed
+        self.window = window if transport == "udp" else None
+        self.sock = None
+        self._pending = []
+        self._pending_bytes = 0
+        self._credit = 0  # sequence number the receiver will consume next
+        self.frames_sent = 0
+
+    def connect(self):
+        self.sock = _datagram_socket(self.transport)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, DATAGRAM_SOCKET_BUFFER)
+            # a connected datagram socket skips the address lookup per send
+            self.sock.connect(self.address)
+        except Exception:
+            self.sock.close()
+            raise
+        return self
+
+    def send(self, frame):
+        seq = DATAGRAM_SEQ.pack(self.frames_sent)
+        if self.packed:
+            parts = [seq, NBITS_PREFIX.pack(frame.nbits)] + frame.segments()
+            size = (frame.nbits + 7) >> 3
+        else:
+            parts = [seq, _to_bytes(frame)]
+            size = len(parts[1])
+        if size + len(seq) + NBITS_PREFIX.size > MAX_DATAGRAM:
+            raise ValueError("frame of {} bytes does not fit a datagram".format(size))
+        self._pending.append((self.frames_sent, parts))
+        self._pending_bytes += size
+        self.frames_sent += 1
+        metrics.count("frames_sent")
+        metrics.count("bytes_sent", size)
+        if self._pending_bytes >= self.batch_bytes:
+            self.flush()
+
+    def _wait_credit(self, seq):
+        # block until frame `seq` is within the window of the receiver's last credit
+        while seq - self._credit >= self.window:
+            readable, _, _ = select.select([self.sock], [], [], CREDIT_TIMEOUT)
+            if not readable:
+                # credit lost (or a receiver that sends none): allow another window
+                metrics.count("credit_timeouts")
+                self._credit = seq
+                return
+            while True:
+                try:
+                    data = self.sock.recv(CREDIT.size, socket.MSG_DONTWAIT)
+                except BlockingIOError:
+                    break
+                if len(data) == CREDIT.size:
+                    self._credit = max(self._credit, CREDIT.unpack(data)[0])
+
+    def flush(self):
+        if self._pending:
+            with metrics.timer("send"):
+                for seq, parts in self._pending:
+                    if self.window:
+                        self._wait_credit(seq)
+                    self.sock.sendmsg([p for p in parts if len(p)])
+            self._pending = []
+            self._pending_bytes = 0
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.flush()
+                self.sock.send(DATAGRAM_SEQ.pack(self.frames_sent))
+            finally:
+                self.sock.close()
+                self.sock = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# For the receiver
+class DatagramReceiverSession:
+    """
+    Frames of one DatagramSenderSession, read from the listener's socket.
+
+    The socket is non-blocking: when nothing is queued, receive() waits for
+    it to become readable (up to idle_timeout) and then reads every datagram
+    already waiting with recvfrom_into() into one pool buffer. Frames are
+    returned like ReceiverSession (str, or bytes when raw) or, when packed,
+    as (memoryview, nbits) slices valid until the next receive().
+
+    Sequence numbers are checked as frames are handed out: frames_missing is
+    the number that never arrived (a lower bound if the end marker was lost
+    too) and frames_reordered those that arrived after a later one. A UDP
+    sender is sent a credit every CREDIT_INTERVAL frames.
+    """
+
+    def __init__(self, sock, pool, raw=False, packed=False, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.sock = sock
+        self.pool = pool
+        self.raw = raw
+        self.packed = packed
+        self.idle_timeout = idle_timeout
+        self.client_address = None
+        self._buf = pool.acquire()
+        self._view = memoryview(self._buf)
+        self._queue = deque()  # (start, length) of datagrams in _buf
+        self._closed = False
+        self._credits = sock.family != socket.AF_UNIX
+        self._next = 0  # one past the highest sequence number seen
+        self._credited = 0
+        self.total = None  # frames in the session, from the end marker
+        self.frames_received = 0
+        self.frames_reordered = 0
+
+    def _drain(self, timeout):
+        # wait for the socket, then read what is queued; False if nothing came in time
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return False
+        view = self._view
+        end = 0
+        while len(view) - end >= MAX_DATAGRAM:
+            try:
+                n, address = self.sock.recvfrom_into(view[end : end + MAX_DATAGRAM])
+            except BlockingIOError:
+                break
+            if self.client_address is None:
+                self.client_address = address
+            self._queue.append((end, n))
+            end += n
+            if n == DATAGRAM_SEQ.size:
+                # end of the session, later datagrams belong to the next one
+                break
+        return True
+
+    def receive(self):
+        """Return the next frame, or None at the end of the session (or after idle_timeout)."""
+        with metrics.timer("receive"):
+            while not self._queue:
+                if self._closed or not self._drain(self.idle_timeout):
+                    self._closed = True
+                    return None
+            start, n = self._queue.popleft()
+        if n < DATAGRAM_SEQ.size:
+            # not from a DatagramSenderSession
+            return self.receive()
+        (seq,) = DATAGRAM_SEQ.unpack_from(self._view, start)
+        if n == DATAGRAM_SEQ.size:
+            self.total = seq
+            self._closed = True
+            return None
+        if seq < self._next:
+            self.frames_reordered += 1
+        self._next = max(self._next, seq + 1)
+        self.frames_received += 1
+        if self._credits and self._next - self._credited >= CREDIT_INTERVAL:
+            self._credit()
+        metrics.count("frames_received")
+        metrics.count("bytes_received", n)
+        frame = self._view[start + DATAGRAM_SEQ.size : start + n]
+        if self.packed:
+            (nbits,) = NBITS_PREFIX.unpack_from(frame)
+            return frame[NBITS_PREFIX.size :], nbits
+        return bytes(frame) if self.raw else bytes(frame).decode()
+
+    @property
+    def frames_missing(self):
+        return max(0, (self._next if self.total is None else self.total) - self.frames_received)
+
+    def _credit(self):
+        # everything before _next is consumed once the caller asks for the next frame
+        try:
+            self.sock.sendto(CREDIT.pack(self._next), self.client_address)
+            self._credited = self._next
+        except OSError:
+            # a full send buffer or a sender that is gone: the sender times out and goes on
+            pass
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        # the socket belongs to the listener
+        if self._buf is not None:
+            self.pool.release(self._buf)
+            self._buf = None
+            if self.frames_missing:
+                metrics.count("frames_missing", self.frames_missing)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class DatagramListener:
+    """
+    FrameListener interface for the datagram transports: binds one socket,
+    and accept() waits for the first datagram of the next session.
+    """
+
+    def __init__(self, transport="udp", address=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.transport = transport
+        self.address = address or _default_address(transport)
+        self.idle_timeout = idle_timeout
+        self.pool = BufferPool()
+        self.sock = _datagram_socket(transport)
+        try:
+            if transport == "unix" and os.path.exists(self.address):
+                # left over from an earlier receiver
+                os.unlink(self.address)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, DATAGRAM_SOCKET_BUFFER)
+            self.sock.bind(self.address)
+            self.sock.setblocking(False)
+        except Exception:
+            self.sock.close()
+            raise
+
+    def accept(self, raw=False, packed=False):
+        # no connection to wait for: block until the first datagram arrives
+        select.select([self.sock], [], [])
+        return DatagramReceiverSession(self.sock, self.pool, raw=raw, packed=packed, idle_timeout=self.idle_timeout)
+
+    def close(self):
+        self.sock.close()
+        if self.transport == "unix" and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def openSenderSession(transport="tcp", address=None, packed=False):
+    """Sender session for one of TRANSPORTS (not connected yet, use `with`)."""
+    if transport == "tcp":
+        address = address or RECEIVER_ADDRESS
+        return PackedSenderSession(address) if packed else SenderSession(address)
+    if transport == "shm":
+        return FrameRingSenderSession(*(address,) if address else (), packed=packed)
+    return DatagramSenderSession(transport, address, packed=packed)
+
+
+def openListener(transport="tcp", address=None):
+    """Bound listener for one of TRANSPORTS; accept() returns receiver sessions."""
+    if transport == "tcp":
+        return FrameListener(address or RECEIVER_ADDRESS)
+    if transport == "shm":
+        return FrameRingListener(*(address,) if address else ())
+    return DatagramListener(transport, address)
+
+
+# For the receiver (asyncio)
+class AsyncReceiverSession:
+    """asyncio counterpart of ReceiverSession for one sender connection."""
+
+    def __init__(self, reader, writer, raw=False):
+        self.reader = reader
+        self.writer = writer
+        self.raw = raw
+        self.client_address = writer.get_extra_info("peername")
+
+    async def receive(self):
+        """Return the next complete frame, or None once the sender has closed the connection."""
+        try:
+            header = await self.reader.readexactly(LENGTH_PREFIX.size)
+            (length,) = LENGTH_PREFIX.unpack(header)
+            started = metrics.start()
+            frame = await self.reader.readexactly(length)
+            metrics.stop("receive", started)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        metrics.count("frames_received")
+        metrics.count("bytes_received", length)
+        return frame if self.raw else frame.decode()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.receive()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def startFrameServer(on_session, address=RECEIVER_ADDRESS, raw=False):
+    """
+    Bind once and serve many senders concurrently.
+    on_session(session) is a coroutine run for every accepted connection with an
+    AsyncReceiverSession; the session is closed when it returns.
+    Returns the asyncio.Server (use `async with server: await server.serve_forever()`).
+    """
+
+    async def handle(reader, writer):
+        session = AsyncReceiverSession(reader, writer, raw=raw)
+        try:
+            await on_session(session)
+        finally:
+            await session.close()
+
+    host, port = address
+    return await asyncio.start_server(handle, host, port, reuse_address=True)
+
+
 # For the sender
 def sendFrame(frame):
     """
     Send a frame through socket connection.
-    
+    Thin wrapper over SenderSession: one connection carrying one frame.
+
     Args:
-        frame (str): The frame to be sent
-    """
-    import socket
-    
-    # Create a socket
-    sender_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    
-    # Define receiver address and port
-    receiver_address = ('localhost', 12345)
-    
+        frame (str | bytes-like): The frame to be sent. Bit-strings are
+            encoded, packed frames (PackedDataFrame.serialize()) go out as-is.
+    """
     try:
-        # Connect to receiver
-        sender_socket.connect(receiver_address)
-        
-        # Send the frame
-        sender_socket.sendall(frame.encode())
+        with SenderSession() as session:
+            session.send(frame)
         print("Frame sent successfully")
-        
+
     except Exception as e:
         print(f"Error sending frame: {e}")
-        
-    finally:
-        # Close the socket
-        sender_socket.close()
 
 
 
 
 # For the receiver
-def receiveFrame():
+def receiveFrame(raw=False):
     """
     Receive a frame through socket connection.
-    
+    Thin wrapper over FrameListener: bind, accept one sender, read one frame.
+
+    Args:
+        raw (bool): Return the received bytes undecoded (packed frames)
+
     Returns:
-        str: The received frame or None if an error occurred
-    """
-    import socket
-    
-    # Create a socket
-    receiver_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    
-    # Define server address and port
-    server_address = ('localhost', 12345)
-    
+        str | bytes: The received frame or None if an error occurred
+    """
     try:
-        # Bind the socket to the address and port
-        receiver_socket.bind(server_address)
-        
-        # Listen for incoming connections
-        receiver_socket.listen(1)
-        print("Waiting for connection...")
-        
-        # Accept a connection
-        connection, client_address = receiver_socket.accept()
-        print("Connection established with", client_address)
-        
-        try:
-            # Receive the frame
-            frame = connection.recv(4096).decode()
-            print("Frame received")
-            return frame
-            
-        except Exception as e:
-            print(f"Error receiving frame: {e}")
-            return None
-            
-        finally:
-            # Close the connection
-            connection.close()
-            
+        with FrameListener(backlog=1) as listener:
+            print("Waiting for connection...")
+
+            # Accept a connection
+            with listener.accept(raw=raw) as session:
+                print("Connection established with", session.client_address)
+
+                try:
+                    frame = session.receive()
+                    print("Frame received")
+                    return frame
+
+                except Exception as e:
+                    print(f"Error receiving frame: {e}")
+                    return None
+
     except Exception as e:
         print(f"Error setting up receiver: {e}")
         return None
-        
-    finally:
-        # Close the socket
-        receiver_socket.close()
@@ -0,0 +1,315 @@
+"""
+Sparse, seeded error injection with channel models.
+
+Errors are produced as position arrays, never as per-bit Python loops: a
+batch of F frames of n bits is treated as one stream of F*n bits and the
+models draw only the positions that flip.
+
+  * BSC(ber)                 -- independent flips; the gaps between errors are
+                                geometric, so the cost is O(errors), not O(bits)
+  * GilbertElliott(...)      -- two-state bursty channel; good/bad sojourns are
+                                geometric runs and each state is a BSC over the
+                                concatenation of its runs. The state carries over
+                                from one batch to the next.
+  * FixedWeight(k)           -- exactly k distinct flips per frame
+  * Burst(min_len, max_len)  -- one solid burst per frame (like inject_error)
+
+model_for() maps the inject_error type names onto these models. ErrorInjector
+owns the seeded generator, so the same seed reproduces the same errors, and
+returns the flipped positions along with the corrupted frames.
+"""
+
+import numpy as np
+
+import metrics
+
+# inject_error draws burst lengths from randint(2, 6)
+BURST_MIN = 2
+BURST_MAX = 6
+
+
+class ErrorBatch:
+    """
+    Flipped positions for a batch of frames, CSR style: the positions of frame
+    i are positions[offsets[i]:offsets[i + 1]], sorted, 0 = first bit sent.
+    """
+
+    __slots__ = ("offsets", "positions")
+
+    def __init__(self, offsets, positions):
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def fromRows(cls, rows):
+        # rows: 2-D array with one row of positions per frame
+        frames, weight = rows.shape
+        return cls(np.arange(frames + 1, dtype=np.int64) * weight, np.sort(rows, axis=1).ravel())
+
+    @classmethod
+    def fromStream(cls, stream, n, frames):
+        # stream: sorted positions in a stream of frames * n bits
+        rows = stream // n
+        offsets = np.searchsorted(rows, np.arange(frames + 1, dtype=np.int64))
+        return cls(offsets, stream - rows * n)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.positions[self.offsets[i] : self.offsets[i + 1]]
+
+    def counts(self):
+        # number of flipped bits per frame
+        return np.diff(self.offsets)
+
+    def rows(self):
+        # frame index of every entry of positions
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.counts())
+
+
+# ---------------------------------------------------------------------------
+# Sampling helpers
+# ---------------------------------------------------------------------------
+
+def _bsc_stream(rng, ber, total):
+    """Sorted error positions in a stream of `total` bits with flip probability ber."""
+    if total <= 0 or ber <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if ber >= 1:
+        return np.arange(total, dtype=np.int64)
+    expected = total * ber
+    chunk = int(expected + 6 * np.sqrt(expected) + 16)
+    parts = []
+    last = -1
+    while True:
+        gaps = rng.geometric(ber, size=chunk)
+        pos = last + np.cumsum(gaps)
+        if pos[-1] >= total:
+            parts.append(pos[: np.searchsorted(pos, total)])
+            break
+        parts.append(pos)
+        last = int(pos[-1])
+    return np.concatenate(parts)
+
+
+def _scatter_runs(virtual, starts, lengths):
+    """Map positions in the concatenation of runs back to absolute positions."""
+    if len(virtual) == 0:
+        return virtual
+    run_offsets = np.concatenate(([0], np.cumsum(lengths)))
+    run = np.searchsorted(run_offsets, virtual, side="right") - 1
+    return starts[run] + (virtual - run_offsets[run])
+
+
+# ---------------------------------------------------------------------------
+# Channel models
+# ---------------------------------------------------------------------------
+
+class BSC:
+    """Binary symmetric channel: every bit flips independently with probability ber."""
+
+    def __init__(self, ber):
+        if not 0 <= ber <= 1:
+            raise ValueError("ber must be in [0, 1]")
+        self.ber = ber
+
+    def sample(self, rng, n, frames):
+        return ErrorBatch.fromStream(_bsc_stream(rng, self.ber, n * frames), n, frames)
+
+
+class GilbertElliott:
+    """
+    Two-state Markov channel. Each bit the good state moves to bad with
+    probability p_gb and the bad state back with p_bg; bits flip with
+    ber_good / ber_bad. Mean burst (bad run) length is 1 / p_bg.
+    """
+
+    def __init__(self, p_gb, p_bg, ber_good=0.0, ber_bad=0.5):
+        if not (0 < p_gb <= 1 and 0 < p_bg <= 1):
+            raise ValueError("transition probabilities must be in (0, 1]")
+        self.p_gb = p_gb
+        self.p_bg = p_bg
+        self.ber_good = ber_good
+        self.ber_bad = ber_bad
+        self.bad = None  # current state, drawn from the stationary distribution on first use
+
+    def stationary_bad(self):
+        return self.p_gb / (self.p_gb + self.p_bg)
+
+    def average_ber(self):
+        pb = self.stationary_bad()
+        return (1 - pb) * self.ber_good + pb * self.ber_bad
+
+    def _runs(self, rng, total):
+        # alternating good/bad sojourns covering `total` bits
+        if self.bad is None:
+            self.bad = bool(rng.random() < self.stationary_bad())
+        # mean length of a good + bad pair, used to size the draws
+        pair = 1 / self.p_gb + 1 / self.p_bg
+        chunk = int(total / pair) + 16
+        lengths, states = [], []
+        covered = 0
+        bad = self.bad
+        while covered < total:
+            first = rng.geometric(self.p_bg if bad else self.p_gb, size=chunk)
+            second = rng.geometric(self.p_gb if bad else self.p_bg, size=chunk)
+            run = np.empty(2 * chunk, dtype=np.int64)
+            run[0::2] = first
+            run[1::2] = second
+            state = np.empty(2 * chunk, dtype=bool)
+            state[0::2] = bad
+            state[1::2] = not bad
+            lengths.append(run)
+            states.append(state)
+            covered += int(run.sum())
+        lengths = np.concatenate(lengths)
+        states = np.concatenate(states)
+        ends = np.cumsum(lengths)
+        count = int(np.searchsorted(ends, total)) + 1
+        lengths, states, ends = lengths[:count], states[:count], ends[:count]
+        starts = ends - lengths
+        lengths[-1] = total - starts[-1]
+        # memoryless sojourns: the cut run simply continues in the next batch
+        self.bad = bool(states[-1])
+        return starts, lengths, states
+
+    def sample(self, rng, n, frames):
+        total = n * frames
+        if total == 0:
+            return ErrorBatch.fromStream(np.zeros(0, dtype=np.int64), n, frames)
+        starts, lengths, states = self._runs(rng, total)
+        parts = []
+        for state, ber in ((False, self.ber_good), (True, self.ber_bad)):
+            mask = states == state
+            virtual = _bsc_stream(rng, ber, int(lengths[mask].sum()))
+            parts.append(_scatter_runs(virtual, starts[mask], lengths[mask]))
+        return ErrorBatch.fromStream(np.sort(np.concatenate(parts)), n, frames)
+
+
+class FixedWeight:
+    """Exactly `weight` distinct flipped bits per frame, uniformly placed."""
+
+    def __init__(self, weight):
+        if weight < 0:
+            raise ValueError("weight must be >= 0")
+        self.weight = weight
+
+    def sample(self, rng, n, frames):
+        if self.weight > n:
+            raise ValueError("weight exceeds frame length")
+        pos = rng.integers(0, n, size=(frames, self.weight))
+        if self.weight > 1:
+            # redraw rows with a repeated position
+            while True:
+                s = np.sort(pos, axis=1)
+                bad = np.any(s[:, 1:] == s[:, :-1], axis=1)
+                if not bad.any():
+                    break
+                pos[bad] = rng.integers(0, n, size=(int(bad.sum()), self.weight))
+        return ErrorBatch.fromRows(pos)
+
+
+class Burst:
+    """One solid burst per frame (every bit in the run flipped), length in [min_len, max_len]."""
+
+    def __init__(self, min_len=BURST_MIN, max_len=BURST_MAX):
+        if not 1 <= min_len <= max_len:
+            raise ValueError("need 1 <= min_len <= max_len")
+        self.min_len = min_len
+        self.max_len = max_len
+
+    def sample(self, rng, n, frames):
+        if self.min_len > n:
+            raise ValueError("burst longer than the frame")
+        lengths = rng.integers(self.min_len, min(self.max_len, n) + 1, size=frames)
+        starts = rng.integers(0, n - lengths + 1)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        within = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+        return ErrorBatch(offsets, np.repeat(starts, lengths) + within)
+
+
+def model_for(error_type):
+    """Model matching an error_handler.inject_error type name."""
+    models = {
+        "single": lambda: FixedWeight(1),
+        "two_isolated": lambda: FixedWeight(2),
+        "odd": lambda: FixedWeight(3),
+        "burst": lambda: Burst(),
+    }
+    if error_type not in models:
+        raise ValueError("Unknown error type: {}".format(error_type))
+    return models[error_type]()
+
+
+# ---------------------------------------------------------------------------
+# Applying errors
+# ---------------------------------------------------------------------------
+
+def flip_bitstring(bits, positions):
+    """Bit-string with the given positions flipped (one int XOR, no per-bit loop)."""
+    n = len(bits)
+    if n == 0 or len(positions) == 0:
+        return bits
+    mask = 0
+    for p in np.asarray(positions).tolist():
+        mask |= 1 << (n - 1 - p)
+    return format(int(bits, 2) ^ mask, "0{}b".format(n))
+
+
+def flip_packed(buf, positions):
+    """Flip bits of a packed frame (bytearray / writable buffer) in place."""
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    positions = np.asarray(positions, dtype=np.int64)
+    np.bitwise_xor.at(arr, positions >> 3, (0x80 >> (positions & 7)).astype(np.uint8))
+    return buf
+
+
+class ErrorInjector:
+    """
+    Seeded injector around a channel model (or an inject_error type name).
+
+        injector = ErrorInjector(BSC(1e-4), seed=7)
+        corrupted, positions = injector.inject(frame.serialize())
+        batch = injector.injectBatch(frames)   # uint8 matrix, one packed frame per row
+    """
+
+    def __init__(self, model, seed=None):
+        self.model = model_for(model) if isinstance(model, str) else model
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, n, frames=1):
+        """ErrorBatch of flipped positions for `frames` frames of n bits."""
+        batch = self.model.sample(self.rng, n, frames)
+        metrics.count("bits_flipped", len(batch.positions))
+        return batch
+
+    def positions(self, n):
+        """Sorted flipped positions for one frame of n bits."""
+        return self.sample(n)[0]
+
+    def inject(self, codeword, nbits=None):
+        """
+        Corrupt one frame. codeword is a bit-string (returns a new string) or a
+        packed bytes-like of nbits bits (returns a corrupted bytearray copy).
+        Returns (corrupted, positions).
+        """
+        with metrics.timer("inject"):
+            if isinstance(codeword, str):
+                positions = self.positions(len(codeword))
+                return flip_bitstring(codeword, positions), positions
+            buf = bytearray(codeword)
+            positions = self.positions(len(buf) * 8 if nbits is None else nbits)
+            return flip_packed(buf, positions), positions
+
+    def injectBatch(self, frames, nbits=None):
+        """
+        Corrupt a uint8 matrix of packed frames (one frame per row, nbits bits
+        each, default the full row) in place. Returns the ErrorBatch.
+        """
+        with metrics.timer("inject"):
+            count, width = frames.shape
+            batch = self.sample(width * 8 if nbits is None else nbits, count)
+            pos = batch.positions
+            np.bitwise_xor.at(frames, (batch.rows(), pos >> 3), (0x80 >> (pos & 7)).astype(np.uint8))
+        return batch
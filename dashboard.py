@@ -28,28 +28,14 @@ from typing import List, Tuple, Dict, Any
 
 # Import user's modules (these must be in the same directory)
 from utils import DataFrame, ascii_to_bin, bytes_to_bits, bits_to_bytes, bin_to_ascii
-from error_handler import inject_error, verify_crc, verify_checksum
 import utils
+# frame-case processing lives in its own module so worker processes can import it
+from frame_cases import ERROR_TYPE_MAP, run_simulation
 
 # ---------------------------------------------------------------------------
 # Utility helpers inside the dashboard (keeps user's code unchanged)
 # ---------------------------------------------------------------------------
 
-def flip_bits(bitstring: str, positions: List[int]) -> str:
-    """Flip bits at given integer positions in a binary string.
-    Positions are 0-based from the leftmost bit (index 0).
-    If a position is out-of-range it is ignored.
-    """
-    if not bitstring:
-        return bitstring
-    bits = list(bitstring)
-    L = len(bits)
-    for pos in positions:
-        if 0 <= pos < L:
-            bits[pos] = "1" if bits[pos] == "0" else "0"
-    return "".join(bits)
-
-
 def parse_positions(text: str) -> List[int]:
     """Parse comma/space separated numbers into list of ints."""
     if not text:
@@ -77,14 +63,6 @@ def read_uploaded_file(uploaded_file) -> Tuple[str, bool]:
         return (bytes_to_bits(raw), True)
 
 
-# Map UI label -> inject_error type
-ERROR_TYPE_MAP = {
-    "Single-bit error": "single",
-    "Two isolated single-bit errors": "two_isolated",
-    "Odd number of errors (3 bits)": "odd",
-    "Burst error": "burst",
-}
-
 # Friendly names for redundant bit types (use keys from utils)
 AVAILABLE_PROTOCOLS = list(utils.REDUNDANT_BITS_CNT.keys())  # e.g. checksum, crc-8, ...
 
@@ -95,102 +73,6 @@ DEFAULT_RECEIVER_IP = "0" * utils.RECEIVER_IP_LEN
 DEFAULT_RECEIVER_PORT = "0" * utils.RECEIVER_PORT_LEN
 
 
-# ---------------------------------------------------------------------------
-# Core processing: create frames, inject errors, validate
-# ---------------------------------------------------------------------------
-
-def process_frame_case(frame_bits: str, protocol: str, error_type_key: str, custom_positions: List[int]) -> Dict[str, Any]:
-    """Given a serialized frame bits string (already with CRC/checksum appended by createFrames),
-    apply the requested error (either built-in or custom) and validate it.
-
-    Returns a dictionary with original, corrupted, detected (bool), remainder (for CRC),
-    flipped positions, redundant bit type and the **received** data interpretation (bits, raw bytes, attempted UTF-8 text).
-    """
-    original = frame_bits
-
-    # Create corrupted version
-    if error_type_key == "Custom positions":
-        corrupted = flip_bits(original, custom_positions)
-        flipped_positions = custom_positions
-    else:
-        # map label -> inject_error mode (error_handler.inject_error expects 'single','two_isolated','odd','burst')
-        inject_mode = ERROR_TYPE_MAP.get(error_type_key)
-        if inject_mode is None:
-            # fallback: treat as single
-            inject_mode = "single"
-        corrupted = inject_error(original, error_type=inject_mode)
-        # inject_error prints flipped positions but does not return them. We will detect them by comparing strings.
-        flipped_positions = [i for i in range(len(original)) if original[i] != corrupted[i]]
-
-    # Validate using utils.DataFrame.validate()
-    try:
-        original_df = DataFrame(original)
-        corrupted_df = DataFrame(corrupted)
-        # The DataFrame.validate() returns True when frame is considered valid (i.e., no error detected)
-        original_valid = original_df.validate()
-        corrupted_valid = corrupted_df.validate()
-    except Exception as e:
-        return {
-            "original": original,
-            "corrupted": corrupted,
-            "detected": True,
-            "error": f"Exception during validation: {e}",
-            "flipped_positions": flipped_positions,
-            "received": {"bits": corrupted, "bytes": None, "text": None},
-        }
-
-    detected = not corrupted_valid  # if corrupted frame is invalid -> error detected
-
-    # Try to compute CRC remainder if protocol is CRC
-    remainder = None
-    note = ""
-    red_type = corrupted_df.getRedundantBitType()
-    if red_type.startswith("crc"):
-        try:
-            # verify_crc prints remainder inside error_handler, but we'll also compute it here by calling verify_crc
-            # verify_crc expects codeword and polynomial; utils.CRC_POLY contains polynomial strings
-            polynomial = utils.CRC_POLY.get(red_type)
-            if polynomial:
-                crc_ok = verify_crc(corrupted, polynomial)
-                remainder = "OK" if crc_ok else "NONZERO_REMAINDER"
-        except Exception:
-            remainder = None
-
-    # For checksum we can show if verify_checksum passes
-    if red_type == "checksum":
-        try:
-            checksum_ok = verify_checksum(corrupted)
-            remainder = "OK" if checksum_ok else "NONZERO_CHECKSUM"
-        except Exception:
-            remainder = None
-
-    # Build received-data: try to produce bytes and attempt UTF-8 decode for user-friendly display
-    try:
-        received_bytes = bits_to_bytes(corrupted)
-        try:
-            received_text = received_bytes.decode('utf-8')
-        except Exception:
-            # not valid UTF-8
-            received_text = None
-        received = {
-            "bits": corrupted,
-            "bytes": received_bytes,
-            "text": received_text,
-        }
-    except Exception:
-        received = {"bits": corrupted, "bytes": None, "text": None}
-
-    return {
-        "original": original,
-        "corrupted": corrupted,
-        "detected": detected,
-        "remainder": remainder,
-        "flipped_positions": flipped_positions,
-        "red_type": red_type,
-        "received": received,
-    }
-
-
 # ---------------------------------------------------------------------------
 # Streamlit UI
 # ---------------------------------------------------------------------------
@@ -257,8 +139,20 @@ with st.sidebar:
     custom_positions_text = st.text_input("If using Custom positions — enter comma-separated bit indices (0-based):", value="")
     custom_positions = parse_positions(custom_positions_text)
 
+    workers = st.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1)
     run_button = st.button("Run simulation")
 
+    st.markdown("---")
+    st.header("Monte Carlo detection rates")
+    mc_trials = st.number_input("Trials per error type", min_value=1000, max_value=50_000_000, value=1_000_000, step=100_000)
+    mc_seed = st.number_input("Random seed", min_value=0, value=0)
+    mc_button = st.button("Run Monte Carlo")
+
+    st.markdown("---")
+    st.header("Case finder")
+    cf_count = st.number_input("Cases per CRC and direction", min_value=1, max_value=100_000, value=20)
+    cf_button = st.button("Find checksum / CRC cases")
+
 # Main area: results
 if "" == data_bits:
     st.info("No input data yet — paste text/bits or upload a file from the left sidebar.")
@@ -285,52 +179,46 @@ else:
         else:
             st.success("Running simulation — this may take a moment depending on data length and frame count.")
 
-            # Build results container
-            results = []
+            # Frames x error types are sharded over a process pool (by protocol and frame range)
+            with st.spinner(f"Running on {int(workers)} worker process(es)..."):
+                results = run_simulation(
+                    data_bits,
+                    sender_addr,
+                    receiver_addr,
+                    protocols,
+                    error_types_selected,
+                    custom_positions,
+                    frame_size=int(frame_size),
+                    workers=int(workers),
+                )
 
             for protocol in protocols:
-                # create frames for this protocol
-                try:
-                    frames = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bits_type=protocol, frame_size=frame_size)
-                except Exception as e:
-                    st.error(f"Failed to create frames for protocol {protocol}: {e}")
+                entry = results[protocol]
+                if "error" in entry:
+                    st.error(entry["error"])
                     continue
 
-                st.markdown(f"#### Protocol: `{protocol}` — {len(frames)} frame(s) created")
+                st.markdown(f"#### Protocol: `{protocol}` — {entry['frames']} frame(s) created")
 
-                # For each error type apply to each frame and record
                 protocol_table_rows = []
-                for err in error_types_selected:
-                    for fi, frame_obj in enumerate(frames):
-                        frame_bits = frame_obj.serialize()
-                        # choose positions to flip (if custom) -- note these positions are relative to the whole serialized frame
-                        positions_for_case = custom_positions if err == "Custom positions" else []
-
-                        res = process_frame_case(frame_bits, protocol, err, positions_for_case)
-                        # Add additional metadata
-                        res_row = {
-                            "protocol": protocol,
-                            "frame_index": fi,
-                            "error_type": err,
-                            "detected": res.get("detected"),
-                            "flipped_positions": res.get("flipped_positions"),
-                            "remainder": res.get("remainder"),
-                            "corrupted_length": len(res.get("corrupted", "")),
-                        }
-                        protocol_table_rows.append(res_row)
-
-                        # Show a collapsible detail for the first few frames to avoid noise
-                        if fi < 4:
-                            with st.expander(f"Protocol={protocol} | Frame={fi} | Error={err} | Detected={res_row['detected']}"):
-                                st.write("**Flipped positions**:", res_row["flipped_positions"]) 
-                                st.write("**Remainder/Checksum status**:", res_row["remainder"]) 
-                                st.write("Original (first 256 bits):")
-                                st.code(res.get("original")[:256] + ("..." if len(res.get("original")) > 256 else ""))
-                                st.write("Corrupted (first 256 bits):")
-                                st.code(res.get("corrupted")[:256] + ("..." if len(res.get("corrupted")) > 256 else ""))
-                                # Download links
-                                b_io = io.BytesIO(bits_to_bytes(res.get("corrupted")))
-                                st.download_button(label="Download corrupted frame as bytes", data=b_io.getvalue(), file_name=f"corrupted_{protocol}_frame{fi}_{err}.bin")
+                for res_row in entry["rows"]:
+                    res = res_row.pop("details", None)
+                    protocol_table_rows.append(res_row)
+
+                    # Show a collapsible detail for the first few frames to avoid noise
+                    if res is not None:
+                        fi = res_row["frame_index"]
+                        err = res_row["error_type"]
+                        with st.expander(f"Protocol={protocol} | Frame={fi} | Error={err} | Detected={res_row['detected']}"):
+                            st.write("**Flipped positions**:", res_row["flipped_positions"]) 
+                            st.write("**Remainder/Checksum status**:", res_row["remainder"]) 
+                            st.write("Original (first 256 bits):")
+                            st.code(res.get("original")[:256] + ("..." if len(res.get("original")) > 256 else ""))
+                            st.write("Corrupted (first 256 bits):")
+                            st.code(res.get("corrupted")[:256] + ("..." if len(res.get("corrupted")) > 256 else ""))
+                            # Download links
+                            b_io = io.BytesIO(bits_to_bytes(res.get("corrupted")))
+                            st.download_button(label="Download corrupted frame as bytes", data=b_io.getvalue(), file_name=f"corrupted_{protocol}_frame{fi}_{err}.bin")
 
                 # aggregated dataframe for protocol
                 st.markdown(f"**Summary table for {protocol}**")
@@ -353,5 +241,60 @@ else:
         st.info("Configure options in the sidebar and press **Run simulation**.")
 
 
+# ---------------------------------------------------------------------------
+# Monte Carlo: syndrome-based detection rates (simulator.simulate)
+# ---------------------------------------------------------------------------
+if mc_button:
+    import pandas as pd
+    from simulator import simulate
+    from utils import PackedDataFrame
+
+    mc_protocols = protocols or AVAILABLE_PROTOCOLS
+    mc_error_types = [ERROR_TYPE_MAP[e] for e in error_types_selected if e in ERROR_TYPE_MAP] or list(ERROR_TYPE_MAP.values())
+    # checksum detection depends on the frame contents: use the first frame of the input if there is one
+    mc_frame = None
+    if data_bits and "checksum" in mc_protocols:
+        first = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bits_type="checksum", frame_size=frame_size)[0]
+        mc_frame = PackedDataFrame.fromDataFrame(first).serialize()
+
+    st.markdown("### Monte Carlo detection rates")
+    with st.spinner(f"Simulating {int(mc_trials):,} error patterns per error type..."):
+        mc_rows = simulate(
+            frame_size=int(frame_size),
+            trials=int(mc_trials),
+            error_types=mc_error_types,
+            protocols=mc_protocols,
+            frame=mc_frame,
+            seed=int(mc_seed),
+        )
+    st.dataframe(pd.DataFrame(mc_rows))
+    st.caption("CRC verdicts depend only on the error pattern's syndrome; rates are per error type with 95% Wilson intervals.")
+
+
+# ---------------------------------------------------------------------------
+# Case finder: constructed errors only one of checksum / CRC detects
+# ---------------------------------------------------------------------------
+if cf_button:
+    import pandas as pd
+    from case_finder import find_cases
+
+    if not data_bits:
+        st.error("The case finder needs input data to build a frame from.")
+    else:
+        cf_type = (protocols or ["crc-16"])[0]
+        cf_frame = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bits_type=cf_type, frame_size=frame_size)[0]
+        cf_crcs = [p for p in protocols if p in utils.CRC_POLY] or list(utils.CRC_POLY)
+        st.markdown("### Checksum vs CRC cases (first frame)")
+        cf_rows = []
+        for crc, found in find_cases(cf_frame, int(cf_count), cf_crcs, seed=int(mc_seed)).items():
+            for kind, cases in found.items():
+                for case in cases:
+                    cf_rows.append({"crc": crc, "case": kind, "weight": len(case.positions), "positions": list(case.positions),
+                                    "crc_detects": case.crc_detects, "checksum_detects": case.checksum_detects})
+        st.dataframe(pd.DataFrame(cf_rows))
+        # other protocols build different frames (payload length, code field), so a case only replays in cf_type's
+        st.caption(f"Positions are bit indices in the first `{cf_type}` frame; paste them into Custom positions "
+                   f"to replay a case against the `{cf_type}` protocol.")
+
 st.markdown("---")
-st.caption("Built for the CSE lab assignment. Let me know if you want extra features: visual bitmaps of frames, per-bit heatmap, or automatic case-finding where checksum detects but CRC doesn't (I can add that!).")
+st.caption("Built for the CSE lab assignment. Let me know if you want extra features: visual bitmaps of frames or a per-bit heatmap.")
@@ -1,88 +1,87 @@
+import random
 import socket
 import sys
-import random
+
+from crc_engine import get_engine
+from custom_error_injector import BURST_MAX, BURST_MIN
+import metrics
 
 def calculate_crc(dataword, polynomial):
     """
     Calculates the CRC for a given dataword and polynomial.
+    Uses the table-driven engine in crc_engine (same remainder as long division).
     """
-    # Convert strings to lists for mutable operations
-    n = len(polynomial)
-    padded_data = list(dataword + '0' * (n-1))
-    
-    # Perform polynomial division
-    for i in range(len(dataword)):
-        if padded_data[i] == '1':
-            for j in range(n):
-                padded_data[i+j] = str(int(padded_data[i+j]) ^ int(polynomial[j]))
-    
-    # Return the CRC remainder
-    return ''.join(padded_data)[-n+1:]
+    return get_engine(polynomial).compute_bitstring(dataword)
+
+
+def ones_complement_sum(value):
+    """
+    16-bit one's complement sum of the words of a non-negative int.
+    Same result as adding the words with end-around carry: that sum is
+    congruent to the int mod 0xFFFF and is only 0 when every word is 0.
+    """
+    if value == 0:
+        return 0
+    return value % 0xFFFF or 0xFFFF
 
 
 def calculate_checksum(data):
-    if len(data) % 16 != 0:
-        padding_needed = 16 - (len(data) % 16)
-        data = '0' * padding_needed + data
-        
-    words = [data[i:i+16] for i in range(0, len(data), 16)]
-    
-    total_sum = '0' * 16
-    for word in words:
-        sum_val = int(total_sum, 2) + int(word, 2)
-        if sum_val > 0xFFFF: # Handle carry
-            sum_val = (sum_val & 0xFFFF) + 1
-        total_sum = format(sum_val, '016b')
-
-    checksum = ''.join('1' if bit == '0' else '0' for bit in total_sum)
-    return checksum
-
-def inject_error(codeword,error_type='single'):
-    codeword_list = list(codeword)
-    length = len(codeword_list)
-    if error_type == 'single':
-        pos = random.randint(0, length - 1)
-        codeword_list[pos] = '1' if codeword_list[pos] == '0' else '0'
-        print(f"Flipping bit at position {pos}")
-
-    elif error_type == 'two_isolated':
-        pos1 = random.randint(0, length - 1)
-        pos2 = random.randint(0, length - 1)
-        while pos1 == pos2: 
-            pos2 = random.randint(0, length - 1)
-        
-        codeword_list[pos1] = '1' if codeword_list[pos1] == '0' else '0'
-        codeword_list[pos2] = '1' if codeword_list[pos2] == '0' else '0'
-        print(f"Flipping bits at positions {pos1} and {pos2}")
-
-    elif error_type == 'odd':
-        num_errors = 3
-        positions = random.sample(range(length), num_errors)
-        for pos in positions:
-            codeword_list[pos] = '1' if codeword_list[pos] == '0' else '0'
-        print(f"Flipping bits at positions {sorted(positions)}")
-
-    elif error_type == 'burst':
-        burst_length = random.randint(2, 6)
+    # left padding to whole 16-bit words does not change the int value
+    total_sum = ones_complement_sum(int(data, 2)) if data else 0
+    return format(total_sum ^ 0xFFFF, '016b')
+
+# error type -> number of distinct flipped bits (burst is handled apart)
+_ERROR_WEIGHTS = {'single': 1, 'two_isolated': 2, 'odd': 3}
+
+
+def _error_positions(length, error_type):
+    # same distributions as custom_error_injector.model_for, drawn with `random`
+    # (a few scalar draws are much cheaper than a NumPy call for one frame)
+    if error_type == 'burst':
+        burst_length = random.randint(BURST_MIN, min(BURST_MAX, length))
         start_pos = random.randint(0, length - burst_length)
-        
-        for i in range(start_pos, start_pos + burst_length):
-            codeword_list[i] = '1' if codeword_list[i] == '0' else '0'
-        print(f"Flipping a burst of {burst_length} bits from position {start_pos}")
-    
-    return "".join(codeword_list)
-
-def verify_crc(codeword, polynomial):
-    n = len(polynomial)
-    codeword_list = list(codeword)
-    for i in range(len(codeword) - n + 1):
-        if codeword_list[i] == '1':
-            for j in range(n):
-                codeword_list[i + j] = str(int(codeword_list[i + j]) ^ int(polynomial[j]))
+        return list(range(start_pos, start_pos + burst_length))
+    if error_type not in _ERROR_WEIGHTS:
+        raise ValueError("Unknown error type: {}".format(error_type))
+    return sorted(random.sample(range(length), _ERROR_WEIGHTS[error_type]))
 
-    # The remainder is the last n-1 bits of the result
-    remainder = "".join(codeword_list)[-(n-1):]
-    print(f"Receiver's CRC Calculation (Remainder): {remainder}")
+
+def inject_error(codeword, error_type='single', injector=None):
+    """
+    Corrupt a bit-string codeword with an error of `error_type` ('single',
+    'two_isolated', 'odd', 'burst'; see custom_error_injector.model_for).
+    Pass a seeded custom_error_injector.ErrorInjector (any channel model) to
+    make it reproducible; by default the positions come from `random`.
+    Returns (corrupted, positions), positions 0-based from the first bit.
+    """
+    if injector is not None:
+        corrupted, positions = injector.inject(codeword)
+        metrics.count("errors_injected")
+        return corrupted, positions.tolist()
+    started = metrics.start()
+    n = len(codeword)
+    positions = _error_positions(n, error_type)
+    mask = 0
+    for pos in positions:
+        mask |= 1 << (n - 1 - pos)
+    corrupted = format(int(codeword, 2) ^ mask, "0{}b".format(n))
+    metrics.stop("inject", started)
+    metrics.count("bits_flipped", len(positions))
+    metrics.count("errors_injected")
+    return corrupted, positions
+
+def verify_crc(codeword, polynomial, verbose=True):
+    n = len(polynomial)
+    if len(codeword) < n:
+        # nothing to divide, the codeword itself is the remainder
+        remainder = codeword
+    else:
+        # codeword mod G == CRC(message) xor received CRC bits
+        engine = get_engine(polynomial)
+        received = int(codeword[-(n - 1):], 2)
+        remainder = format(engine.update_bitstring(0, codeword[:-(n - 1)]) ^ received, "0{}b".format(n - 1))
+    if verbose:
+        print(f"Receiver's CRC Calculation (Remainder): {remainder}")
 
     # If the remainder contains any '1's, an error is present
     return '1' not in remainder
@@ -91,4 +90,23 @@ def verify_checksum(data_with_checksum,redundant_bits_cnt=16):
     data = data_with_checksum[:-redundant_bits_cnt]
     checksum = data_with_checksum[-redundant_bits_cnt:]
     calculated_checksum = calculate_checksum(data)
-    return calculated_checksum == checksum
\ No newline at end of file
+    return calculated_checksum == checksum
+
+# ---------------------------------------------------------------------------
+# Packed (bytes) variants used by utils.PackedDataFrame
+# ---------------------------------------------------------------------------
+
+def verify_crc_bytes(codeword, polynomial):
+    """
+    CRC check for a packed codeword (MSB first, zero padded on the right).
+    Right padding multiplies by x^k, which keeps a zero remainder zero.
+    """
+    return get_engine(polynomial).compute(codeword) == 0
+
+
+def verify_checksum_bytes(codeword, nbits, redundant_bits_cnt=16):
+    """Checksum check for a packed codeword holding `nbits` meaningful bits."""
+    value = int.from_bytes(codeword, "big") >> (len(codeword) * 8 - nbits)
+    checksum = value & ((1 << redundant_bits_cnt) - 1)
+    data = value >> redundant_bits_cnt
+    return (ones_complement_sum(data) ^ 0xFFFF) == checksum
@@ -0,0 +1,353 @@
+"""
+Forward error correction redundancy types: extended Hamming (SECDED) and
+Reed-Solomon over GF(256).
+
+Both are systematic and byte oriented: the codeword is the message (frame
+header + payload + padding, a whole number of bytes) followed by the parity
+bytes, so the header fields keep their OFF_* offsets and the frame is read the
+same way whatever the redundancy type.
+
+  hamming  SECDED (8,4) per nibble: every 4 message bits get 3 Hamming parity
+           bits + 1 overall parity bit. Corrects 1 and detects 2 bit errors in
+           each 8-bit (nibble, parity) pair. Parity length = message length.
+  rs       Reed-Solomon, RS_PARITY parity bytes per block of up to
+           255 - RS_PARITY message bytes. Corrects up to RS_PARITY / 2 bad
+           bytes per block (any number of bit errors inside those bytes).
+
+Encoders and the error-free decode path are table lookups over numpy arrays;
+Reed-Solomon only drops to per-block Python (Berlekamp-Massey, Chien search,
+Forney) when a block has non-zero syndromes.
+"""
+
+import numpy as np
+
+FEC_TYPES = ("hamming", "rs")
+
+RS_PARITY = 16  # parity bytes per Reed-Solomon block (corrects 8 byte errors)
+RS_BLOCK = 255  # GF(256) code length
+RS_DATA = RS_BLOCK - RS_PARITY
+
+# decode status per (nibble, parity) pair / per block
+CLEAN = 0
+CORRECTED = 1
+FAILED = 2
+
+
+# ---------------------------------------------------------------------------
+# Extended Hamming (8,4)
+# ---------------------------------------------------------------------------
+
+def _hamming_parity(d):
+    # d = d1 d2 d3 d4 (msb first) -> p1 p2 p3 p0 (p0 = overall parity)
+    d1, d2, d3, d4 = (d >> 3) & 1, (d >> 2) & 1, (d >> 1) & 1, d & 1
+    p1 = d1 ^ d2 ^ d4
+    p2 = d1 ^ d3 ^ d4
+    p3 = d2 ^ d3 ^ d4
+    p0 = d1 ^ d2 ^ d3 ^ d4 ^ p1 ^ p2 ^ p3
+    return (p1 << 3) | (p2 << 2) | (p3 << 1) | p0
+
+
+def _hamming_tables():
+    # nearest codeword for every received (nibble << 4 | parity) byte
+    parity = np.array([_hamming_parity(d) for d in range(16)], dtype=np.uint8)
+    codewords = (np.arange(16, dtype=np.uint8) << 4) | parity
+    received = np.arange(256, dtype=np.uint8)
+    distance = np.unpackbits((received[:, None] ^ codewords[None, :])[..., None], axis=-1).sum(axis=-1)
+    nearest = distance.argmin(axis=1)
+    best = distance.min(axis=1)
+    fixed = codewords[nearest]
+    status = np.where(best == 0, CLEAN, np.where(best == 1, CORRECTED, FAILED)).astype(np.uint8)
+    # minimum distance 4: two flips are detected, never "corrected"
+    fixed = np.where(status == FAILED, received, fixed).astype(np.uint8)
+    return parity, fixed, status
+
+
+HAMMING_PARITY, HAMMING_FIXED, HAMMING_STATUS = _hamming_tables()
+
+
+def hamming_encode(message):
+    """Parity bytes (same length as message): parity nibble of each message nibble."""
+    m = np.frombuffer(bytes(message), dtype=np.uint8)
+    return ((HAMMING_PARITY[m >> 4] << 4) | HAMMING_PARITY[m & 15]).astype(np.uint8).tobytes()
+
+
+def hamming_decode(codeword):
+    """
+    (corrected codeword bytes or None, bits corrected) for message || parity.
+    None when any nibble has an uncorrectable (double) error.
+    """
+    c = np.frombuffer(bytes(codeword), dtype=np.uint8)
+    k = len(c) // 2
+    m, p = c[:k], c[k:]
+    pairs = np.concatenate(((m & 0xF0) | (p >> 4), ((m & 15) << 4) | (p & 15)))
+    status = HAMMING_STATUS[pairs]
+    if status.max(initial=CLEAN) == FAILED:
+        return None, 0
+    corrected = int(np.count_nonzero(status))
+    if not corrected:
+        return bytes(codeword), 0
+    fixed = HAMMING_FIXED[pairs]
+    hi, lo = fixed[:k], fixed[k:]
+    m = (hi & 0xF0) | (lo >> 4)
+    p = ((hi & 15) << 4) | (lo & 15)
+    return m.tobytes() + p.astype(np.uint8).tobytes(), corrected
+
+
+# ---------------------------------------------------------------------------
+# GF(256) and Reed-Solomon
+# ---------------------------------------------------------------------------
+
+def _gf_tables(primitive=0x11D):
+    exp = np.zeros(512, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= primitive
+    exp[255:510] = exp[:255]
+    mul = np.zeros((256, 256), dtype=np.uint8)
+    nz = np.arange(1, 256)
+    mul[1:, 1:] = exp[(log[nz][:, None] + log[nz][None, :]) % 255]
+    return exp, log, mul
+
+
+GF_EXP, GF_LOG, GF_MUL = _gf_tables()
+_EXP = GF_EXP.tolist()
+_LOG = GF_LOG.tolist()
+
+
+def _mul(a, b):
+    return 0 if a == 0 or b == 0 else _EXP[_LOG[a] + _LOG[b]]
+
+
+def _inv(a):
+    return _EXP[255 - _LOG[a]]
+
+
+def _poly_eval_low(poly, x):
+    # poly low-first
+    y = 0
+    for coef in reversed(poly):
+        y = _mul(y, x) ^ coef
+    return y
+
+
+def _rs_tables(nsym):
+    # generator g(x) = prod (x - a^i), i < nsym, high-first
+    g = [1]
+    for i in range(nsym):
+        root = _EXP[i]
+        nxt = g + [0]
+        for j in range(len(g)):
+            nxt[j + 1] ^= _mul(g[j], root)
+        g = nxt
+    # parity of a message byte d positions before the end of the message:
+    # x^(nsym + d) mod g, as nsym coefficients high-first
+    encode = np.zeros((RS_BLOCK - nsym, nsym), dtype=np.uint8)
+    reg = [0] * nsym
+    reg[-1] = 1  # x^0
+    for e in range(RS_BLOCK):
+        if e >= nsym:
+            encode[RS_BLOCK - 1 - e] = reg
+        # reg = reg * x mod g
+        top = reg[0]
+        reg = reg[1:] + [0]
+        if top:
+            reg = [r ^ _mul(top, gc) for r, gc in zip(reg, g[1:])]
+    # syndrome i of a byte at power p: a^(i * p)
+    powers = np.arange(RS_BLOCK)[:, None] * np.arange(nsym)[None, :]
+    syndrome = GF_EXP[powers % 255].astype(np.uint8)[::-1]
+    return encode, syndrome
+
+
+RS_ENCODE, RS_SYNDROME = _rs_tables(RS_PARITY)
+
+
+def _xor_reduce(products):
+    return np.bitwise_xor.reduce(products, axis=-2) if products.shape[-2] else np.zeros(products.shape[-1], np.uint8)
+
+
+def rs_encode_block(message):
+    """RS_PARITY parity bytes for one block of up to RS_DATA message bytes (uint8 array)."""
+    k = len(message)
+    return _xor_reduce(GF_MUL[message[:, None], RS_ENCODE[RS_DATA - k :]])
+
+
+def rs_syndromes(block):
+    # S_i = r(a^i) for i < RS_PARITY, r high-first
+    return _xor_reduce(GF_MUL[block[:, None], RS_SYNDROME[RS_BLOCK - len(block) :]])
+
+
+def rs_correct_block(block, synd):
+    """Correct one block in place from its (non-zero) syndromes; number of bytes fixed or None."""
+    synd = [int(s) for s in synd]
+    n = len(block)
+    # Berlekamp-Massey, error locator low-first
+    C, B = [1], [1]
+    L, m, b = 0, 1, 1
+    for i in range(RS_PARITY):
+        d = synd[i]
+        for j in range(1, L + 1):
+            if j < len(C):
+                d ^= _mul(C[j], synd[i - j])
+        if d == 0:
+            m += 1
+            continue
+        coef = _mul(d, _inv(b))
+        T = C[:]
+        if len(C) < len(B) + m:
+            C = C + [0] * (len(B) + m - len(C))
+        for j, bj in enumerate(B):
+            C[j + m] ^= _mul(coef, bj)
+        if 2 * L <= i:
+            L, B, b, m = i + 1 - L, T, d, 1
+        else:
+            m += 1
+    while len(C) > 1 and C[-1] == 0:
+        C.pop()
+    if L * 2 > RS_PARITY or len(C) - 1 != L:
+        return None
+    # Chien search: byte j has power p = n-1-j, located where C(a^-p) == 0
+    errors = [n - 1 - p for p in range(n) if _poly_eval_low(C, _EXP[(255 - p) % 255]) == 0]
+    if len(errors) != L:
+        return None
+    # Forney: e = X * Omega(X^-1) / C'(X^-1), Omega = S * C mod x^nsym
+    omega = [0] * RS_PARITY
+    for i, s in enumerate(synd):
+        if s:
+            for j, c in enumerate(C):
+                if i + j < RS_PARITY:
+                    omega[i + j] ^= _mul(s, c)
+    deriv = [C[j] if j % 2 else 0 for j in range(1, len(C))]
+    for j in errors:
+        p = n - 1 - j
+        x = _EXP[p]
+        x_inv = _EXP[(255 - p) % 255]
+        denom = _poly_eval_low(deriv, x_inv)
+        if denom == 0:
+            return None
+        block[j] ^= _mul(x, _mul(_poly_eval_low(omega, x_inv), _inv(denom)))
+    if rs_syndromes(block).any():
+        return None
+    return L
+
+
+def _rs_blocks(k):
+    # message byte ranges of each block
+    return [(start, min(start + RS_DATA, k)) for start in range(0, k, RS_DATA)] or [(0, 0)]
+
+
+def rs_encode(message):
+    """Parity bytes for a message of any length (RS_PARITY per block, in block order)."""
+    m = np.frombuffer(bytes(message), dtype=np.uint8)
+    return b"".join(rs_encode_block(m[a:b]).tobytes() for a, b in _rs_blocks(len(m)))
+
+
+def rs_decode(codeword):
+    """(corrected codeword bytes or None, bytes corrected) for message || parity blocks."""
+    c = np.frombuffer(bytes(codeword), dtype=np.uint8)
+    k = rs_message_len(len(c))
+    if k is None:
+        return None, 0
+    blocks = _rs_blocks(k)
+    fixed_total = 0
+    out = None
+    for n, (a, b) in enumerate(blocks):
+        parity = slice(k + n * RS_PARITY, k + (n + 1) * RS_PARITY)
+        block = np.concatenate((c[a:b], c[parity]))
+        synd = rs_syndromes(block)
+        if not synd.any():
+            continue
+        block = block.copy()
+        fixed = rs_correct_block(block, synd)
+        if fixed is None:
+            return None, 0
+        if out is None:
+            out = c.copy()
+        out[a:b] = block[: b - a]
+        out[parity] = block[b - a :]
+        fixed_total += fixed
+    return (bytes(codeword) if out is None else out.tobytes()), fixed_total
+
+
+def rs_message_len(codeword_len):
+    # message bytes in a codeword of codeword_len bytes, None if impossible
+    blocks = max(1, -(-codeword_len // RS_BLOCK))
+    k = codeword_len - blocks * RS_PARITY
+    if k < 0 or len(_rs_blocks(k)) != blocks:
+        return None
+    return k
+
+
+# ---------------------------------------------------------------------------
+# Frame-level helpers (sizes in bits, as in utils)
+# ---------------------------------------------------------------------------
+
+def redundancy_bits(name, message_bits):
+    """Parity bits for a message of message_bits bits (rounded up to whole bytes)."""
+    k = (message_bits + 7) // 8
+    if name == "hamming":
+        return k * 8
+    if name == "rs":
+        return len(_rs_blocks(k)) * RS_PARITY * 8
+    raise ValueError("Unknown FEC type: {}".format(name))
+
+
+def message_bits(name, frame_bits):
+    """
+    Largest message (bits, whole bytes) whose codeword fits in frame_bits.
+    The codeword can come out a byte or so shorter than frame_bits when the
+    sizes do not divide evenly.
+    """
+    n = frame_bits // 8
+    if name == "hamming":
+        return (n // 2) * 8
+    if name == "rs":
+        blocks = max(1, -(-n // RS_BLOCK))
+        k = n - blocks * RS_PARITY
+        if k <= (blocks - 1) * RS_DATA:
+            # the last block would hold parity only, fill one block less
+            k = (blocks - 1) * RS_DATA
+        if k <= 0:
+            raise ValueError("no RS message fits {} bytes".format(n))
+        return k * 8
+    raise ValueError("Unknown FEC type: {}".format(name))
+
+
+def encode(name, message):
+    """Parity bytes for message bytes."""
+    if name == "hamming":
+        return hamming_encode(message)
+    if name == "rs":
+        return rs_encode(message)
+    raise ValueError("Unknown FEC type: {}".format(name))
+
+
+def decode(name, codeword):
+    """(corrected codeword bytes or None if uncorrectable, units corrected)."""
+    if name == "hamming":
+        return hamming_decode(codeword)
+    if name == "rs":
+        return rs_decode(codeword)
+    raise ValueError("Unknown FEC type: {}".format(name))
+
+
+def encode_bits(name, message):
+    """Parity bit-string for a message bit-string (zero padded to whole bytes first)."""
+    pad = (-len(message)) % 8
+    nbytes = (len(message) + pad) // 8
+    data = (int(message, 2) << pad).to_bytes(nbytes, "big") if message else b""
+    parity = encode(name, data)
+    return format(int.from_bytes(parity, "big"), "0{}b".format(len(parity) * 8)) if parity else ""
+
+
+def decode_bits(name, codeword):
+    """decode() for a bit-string codeword (whole bytes): (corrected bit-string or None, units corrected)."""
+    n = len(codeword)
+    fixed, count = decode(name, int(codeword, 2).to_bytes(n // 8, "big") if n else b"")
+    if fixed is None:
+        return None, 0
+    return (format(int.from_bytes(fixed, "big"), "0{}b".format(n)) if count else codeword), count
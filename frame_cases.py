@@ -0,0 +1,235 @@
+"""
+Per-frame error-injection cases for the dashboard, plus a process-pool runner.
+
+Kept out of dashboard.py so that worker processes can import it without
+executing the Streamlit script.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any
+import os
+
+from utils import DataFrame, bits_to_bytes
+from custom_error_injector import ErrorInjector
+from error_handler import inject_error, verify_crc, verify_checksum
+import utils
+
+# How many frames per protocol/error type get a detail view in the dashboard
+DETAIL_FRAMES = 4
+
+
+def flip_bits(bitstring: str, positions: List[int]) -> str:
+    """Flip bits at given integer positions in a binary string.
+    Positions are 0-based from the leftmost bit (index 0).
+    If a position is out-of-range it is ignored.
+    """
+    if not bitstring:
+        return bitstring
+    bits = list(bitstring)
+    L = len(bits)
+    for pos in positions:
+        if 0 <= pos < L:
+            bits[pos] = "1" if bits[pos] == "0" else "0"
+    return "".join(bits)
+
+
+# Map UI label -> inject_error type
+ERROR_TYPE_MAP = {
+    "Single-bit error": "single",
+    "Two isolated single-bit errors": "two_isolated",
+    "Odd number of errors (3 bits)": "odd",
+    "Burst error": "burst",
+}
+
+
+# ---------------------------------------------------------------------------
+# Core processing: create frames, inject errors, validate
+# ---------------------------------------------------------------------------
+
+def process_frame_case(frame_bits: str, protocol: str, error_type_key: str, custom_positions: List[int], injector=None) -> Dict[str, Any]:
+    """Given a serialized frame bits string (already with CRC/checksum appended by createFrames),
+    apply the requested error (either built-in or custom) and validate it.
+    `injector` is an optional seeded custom_error_injector.ErrorInjector for the built-in errors.
+
+    Returns a dictionary with original, corrupted, detected (bool), remainder (for CRC),
+    flipped positions, redundant bit type and the **received** data interpretation (bits, raw bytes, attempted UTF-8 text).
+    """
+    original = frame_bits
+
+    # Create corrupted version
+    if error_type_key == "Custom positions":
+        corrupted = flip_bits(original, custom_positions)
+        flipped_positions = custom_positions
+    else:
+        # map label -> inject_error mode (error_handler.inject_error expects 'single','two_isolated','odd','burst')
+        inject_mode = ERROR_TYPE_MAP.get(error_type_key)
+        if inject_mode is None:
+            # fallback: treat as single
+            inject_mode = "single"
+        corrupted, flipped_positions = inject_error(original, error_type=inject_mode, injector=injector)
+
+    # Validate using utils.DataFrame.validate()
+    try:
+        original_df = DataFrame(original)
+        corrupted_df = DataFrame(corrupted)
+        # The DataFrame.validate() returns True when frame is considered valid (i.e., no error detected)
+        original_valid = original_df.validate()
+        corrupted_valid = corrupted_df.validate()
+    except Exception as e:
+        return {
+            "original": original,
+            "corrupted": corrupted,
+            "detected": True,
+            "error": f"Exception during validation: {e}",
+            "flipped_positions": flipped_positions,
+            "received": {"bits": corrupted, "bytes": None, "text": None},
+        }
+
+    detected = not corrupted_valid  # if corrupted frame is invalid -> error detected
+
+    # Try to compute CRC remainder if protocol is CRC
+    remainder = None
+    note = ""
+    red_type = corrupted_df.getRedundantBitType()
+    if red_type.startswith("crc"):
+        try:
+            # verify_crc prints remainder inside error_handler, but we'll also compute it here by calling verify_crc
+            # verify_crc expects codeword and polynomial; utils.CRC_POLY contains polynomial strings
+            polynomial = utils.CRC_POLY.get(red_type)
+            if polynomial:
+                crc_ok = verify_crc(corrupted, polynomial)
+                remainder = "OK" if crc_ok else "NONZERO_REMAINDER"
+        except Exception:
+            remainder = None
+
+    # For checksum we can show if verify_checksum passes
+    if red_type == "checksum":
+        try:
+            checksum_ok = verify_checksum(corrupted)
+            remainder = "OK" if checksum_ok else "NONZERO_CHECKSUM"
+        except Exception:
+            remainder = None
+
+    # Build received-data: try to produce bytes and attempt UTF-8 decode for user-friendly display
+    try:
+        received_bytes = bits_to_bytes(corrupted)
+        try:
+            received_text = received_bytes.decode('utf-8')
+        except Exception:
+            # not valid UTF-8
+            received_text = None
+        received = {
+            "bits": corrupted,
+            "bytes": received_bytes,
+            "text": received_text,
+        }
+    except Exception:
+        received = {"bits": corrupted, "bytes": None, "text": None}
+
+    return {
+        "original": original,
+        "corrupted": corrupted,
+        "detected": detected,
+        "remainder": remainder,
+        "flipped_positions": flipped_positions,
+        "red_type": red_type,
+        "received": received,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parallel runner: shards (protocol, frame range) over a process pool
+# ---------------------------------------------------------------------------
+
+def run_shard(protocol: str, frames: List[str], start: int, error_types: List[str], custom_positions: List[int], seed=None) -> List[Dict[str, Any]]:
+    """Run every error type over one contiguous range of a protocol's frames.
+
+    `frames` are serialized frames with indices start, start+1, ...
+    seed: optional seed of the shard's injectors (unseeded inject_error by default).
+    Returns one row per (error type, frame); rows for the first DETAIL_FRAMES
+    frames also carry the full case result under "details".
+    """
+    rows = []
+    for e, err in enumerate(error_types):
+        mode = ERROR_TYPE_MAP.get(err, "single")
+        # unseeded runs use inject_error's own (per-process reseeded) generator
+        injector = None if seed is None else ErrorInjector(mode, seed=[*seed, e])
+        for offset, frame_bits in enumerate(frames):
+            fi = start + offset
+            # choose positions to flip (if custom) -- note these positions are relative to the whole serialized frame
+            positions_for_case = custom_positions if err == "Custom positions" else []
+            res = process_frame_case(frame_bits, protocol, err, positions_for_case, injector)
+            row = {
+                "protocol": protocol,
+                "frame_index": fi,
+                "error_type": err,
+                "detected": res.get("detected"),
+                "flipped_positions": res.get("flipped_positions"),
+                "remainder": res.get("remainder"),
+                "corrupted_length": len(res.get("corrupted", "")),
+            }
+            if fi < DETAIL_FRAMES:
+                row["details"] = res
+            rows.append(row)
+    return rows
+
+
+def _shard_seed(seed, index):
+    return None if seed is None else [seed, index]
+
+
+def run_simulation(
+    data_bits: str,
+    sender_addr,
+    receiver_addr,
+    protocols: List[str],
+    error_types: List[str],
+    custom_positions: List[int],
+    frame_size: int = 64,
+    workers: int = None,
+    seed: int = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Create frames per protocol and run all error cases on a process pool.
+
+    Work is split by protocol and frame range; the shards are merged back in
+    the serial order (error type, then frame index). With a seed each shard's
+    injectors are seeded from (seed, shard index), so a run is reproducible
+    for the same worker count. Returns, per protocol,
+    {"frames": frame count, "rows": [...]} or {"error": message}.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    shards = []
+    for protocol in protocols:
+        try:
+            frames = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bits_type=protocol, frame_size=frame_size)
+        except Exception as e:
+            results[protocol] = {"error": f"Failed to create frames for protocol {protocol}: {e}"}
+            continue
+        serialized = [f.serialize() for f in frames]
+        results[protocol] = {"frames": len(serialized), "rows": []}
+        # a few shards per worker keeps the pool busy when protocols differ in cost
+        per_shard = max(1, -(-len(serialized) // (workers * 4)))
+        for start in range(0, len(serialized), per_shard):
+            shards.append((protocol, serialized[start : start + per_shard], start))
+
+    if not shards:
+        return results
+
+    if workers == 1 or len(shards) == 1:
+        outputs = [run_shard(p, f, s, error_types, custom_positions, _shard_seed(seed, i)) for i, (p, f, s) in enumerate(shards)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_shard, p, f, s, error_types, custom_positions, _shard_seed(seed, i))
+                for i, (p, f, s) in enumerate(shards)
+            ]
+            outputs = [fut.result() for fut in futures]
+
+    order = {err: i for i, err in enumerate(error_types)}
+    for (protocol, _, _), rows in zip(shards, outputs):
+        results[protocol]["rows"].extend(rows)
+    for entry in results.values():
+        if "rows" in entry:
+            entry["rows"].sort(key=lambda r: (order[r["error_type"]], r["frame_index"]))
+    return results
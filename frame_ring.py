@@ -0,0 +1,366 @@
+"""
+Shared-memory transport between a sender and a receiver process.
+
+A multiprocessing.shared_memory segment holds a single-producer /
+single-consumer ring of fixed-size frame slots:
+
+    control block   magic, slot count, slot size; head, tail and session
+                    state, each u64 on its own cache line
+    slots           u32 frame size (bytes, or bits for packed frames) + frame
+
+The sender copies each serialized frame into the slot at head and then
+publishes head + 1; the receiver reads the slot at tail and only moves tail
+past it on the next receive(), so a packed frame can be validated in place
+(PackedDataFrame(view, nbits)) while the sender keeps filling other slots.
+There are no locks and no syscalls per frame: an empty or full ring is
+polled, first spinning and then with short sleeps. Each index has a single
+writer and is stored with one aligned 8-byte write. Python cannot issue a
+memory fence, so this relies on x86 not reordering stores with other stores
+(the slot copy is visible before head); on other machines the ring refuses
+to start.
+
+The receiver owns the segment (FrameRingListener creates and unlinks it);
+senders attach to it by name, one at a time. Both ends store their pid in
+the control block, and a polling end checks that the other is still alive
+between sleeps: a receiver whose sender died ends that session after the
+frames it had published (and frees the ring for the next sender), and a
+sender whose receiver died gets ConnectionRefusedError / BrokenPipeError
+instead of waiting forever. Both ends follow the
+SenderSession / FrameListener interface of communication_handler:
+
+    with FrameRingListener() as listener:           # receiver process
+        with listener.accept(packed=True) as session:
+            for view, nbits in session: ...
+
+    with FrameRingSenderSession(packed=True) as session:   # sender process
+        for frame in frames:
+            session.send(frame)
+"""
+
+import os
+import platform
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import metrics
+
+# Default segment name (receiver.py / sender.py --transport=shm)
+RING_NAME = "error_detection_ring"
+
+DEFAULT_SLOTS = 1024
+# fits a bit-string frame of FRAME_SIZE 512 (or a packed one of 4 KiB)
+DEFAULT_SLOT_BYTES = 4096
+
+MAGIC = b"ERNG"
+LAYOUT = struct.Struct("<4sII")  # magic, slot count, slot bytes
+# u64 indices into the control block: the pids share the (read-mostly) first
+# cache line with the layout, the moving indices are 64 bytes apart
+RECEIVER_PID = 4
+SENDER_PID = 5
+HEAD = 8
+TAIL = 16
+STATE = 24
+CONTROL_BYTES = 256
+
+# machines whose stores are not reordered with other stores (see above)
+ORDERED_STORE_MACHINES = ("x86_64", "amd64", "i386", "i486", "i586", "i686", "x86")
+
+SLOT_HEADER = struct.Struct("<I")
+
+# session state
+IDLE = 0
+OPEN = 1
+CLOSED = 2
+
+# polls of an empty / full ring before sleeping between polls; the sleep
+# doubles from POLL_INTERVAL up to MAX_POLL_INTERVAL while nothing changes
+SPIN = 1000
+POLL_INTERVAL = 20e-6  # seconds
+MAX_POLL_INTERVAL = 1e-3
+
+
+def _wait(ready, alive=None, timeout=None):
+    """
+    Poll ready() until it is true, spinning first. Between sleeps gives up
+    (returns False) once alive() is false or timeout seconds have passed.
+    """
+    for _ in range(SPIN):
+        if ready():
+            return True
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = POLL_INTERVAL
+    while not ready():
+        if alive is not None and not alive():
+            return ready()
+        if deadline is not None and time.monotonic() >= deadline:
+            return ready()
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_POLL_INTERVAL)
+    return True
+
+
+def _pid_alive(pid):
+    if pid == 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # exists, owned by someone else
+        return True
+    try:
+        # an exited child its parent has not reaped yet is still signalable
+        with open("/proc/{}/stat".format(pid), "rb") as f:
+            return f.read().rpartition(b")")[2].split()[0] != b"Z"
+    except (OSError, IndexError):
+        return True
+
+
+def _check_machine():
+    if platform.machine().lower() not in ORDERED_STORE_MACHINES:
+        raise RuntimeError(
+            "the shm transport relies on x86 store ordering, not available on {}".format(platform.machine())
+        )
+
+
+class _Ring:
+    """Views over an attached or created segment."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        magic, self.slots, self.slot_bytes = LAYOUT.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not a frame ring".format(shm.name))
+        self.stride = (SLOT_HEADER.size + self.slot_bytes + 7) & ~7
+        self.control = shm.buf[:CONTROL_BYTES].cast("Q")
+        self.data = shm.buf[CONTROL_BYTES : CONTROL_BYTES + self.slots * self.stride]
+
+    def slot(self, index):
+        # byte offset of the slot for a head / tail counter value
+        return (index % self.slots) * self.stride
+
+    def close(self):
+        self.control.release()
+        self.data.release()
+        try:
+            self.shm.close()
+        except BufferError:
+            # a frame view is still referenced; the mapping goes with it
+            pass
+
+
+def _attach(name):
+    # attach without handing the segment to this process's resource tracker,
+    # which would unlink it when the sender exits (Python < 3.13)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+# For the sender
+class FrameRingSenderSession:
+    """
+    SenderSession interface over a FrameRingListener's ring. connect() waits
+    until the previous sender's session is drained. Frames are bit-strings
+    or bytes, or with packed=True PackedDataFrames (their nbits is stored).
+    """
+
+    def __init__(self, name=RING_NAME, packed=False):
+        self.name = name
+        self.packed = packed
+        self.ring = None
+        self.frames_sent = 0
+
+    def connect(self):
+        _check_machine()
+        self.ring = _Ring(_attach(self.name))
+        control = self.ring.control
+        receiver_alive = lambda: _pid_alive(control[RECEIVER_PID])
+        if not _wait(lambda: control[STATE] == IDLE, receiver_alive):
+            self.ring.close()
+            self.ring = None
+            raise ConnectionRefusedError("no receiver is attached to {}".format(self.name))
+        self._receiver_alive = receiver_alive
+        self._head = control[HEAD]
+        control[SENDER_PID] = os.getpid()
+        control[STATE] = OPEN
+        return self
+
+    def send(self, frame):
+        if self.packed:
+            payload, size = frame.serialize(), frame.nbits
+        else:
+            payload = frame.encode() if isinstance(frame, str) else frame
+            size = len(payload)
+        n = len(payload)
+        ring = self.ring
+        if n > ring.slot_bytes:
+            raise ValueError("frame of {} bytes does not fit a {}-byte slot".format(n, ring.slot_bytes))
+        control = ring.control
+        head = self._head
+        if head - control[TAIL] >= ring.slots:
+            with metrics.timer("send"):
+                if not _wait(lambda: head - control[TAIL] < ring.slots, self._receiver_alive):
+                    raise BrokenPipeError("the receiver of {} is gone".format(self.name))
+        offset = ring.slot(head)
+        SLOT_HEADER.pack_into(ring.data, offset, size)
+        offset += SLOT_HEADER.size
+        ring.data[offset : offset + n] = payload
+        # publish the slot
+        self._head = control[HEAD] = head + 1
+        self.frames_sent += 1
+        metrics.count("frames_sent")
+        metrics.count("bytes_sent", n)
+
+    def flush(self):
+        # every send() is visible to the receiver right away
+        pass
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.control[STATE] = CLOSED
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# For the receiver
+class FrameRingReceiverSession:
+    """
+    Frames of one sender session, read in place. receive() returns a str (or
+    bytes when raw) copy, or with packed=True a (memoryview, nbits) view of
+    the slot that stays valid until the next receive() (it is released then,
+    so the segment can be closed while a stale frame is still referenced).
+    """
+
+    def __init__(self, ring, raw=False, packed=False):
+        self.ring = ring
+        self.raw = raw
+        self.packed = packed
+        self.client_address = ("shm", ring.shm.name)
+        self._tail = ring.control[TAIL]
+        sender = ring.control[SENDER_PID]
+        self._sender_alive = lambda: _pid_alive(sender)
+        self._held = False
+        self._view = None
+        self._done = False
+
+    def receive(self):
+        """Return the next frame, or None once the sender has closed the session."""
+        if self._done:
+            return None
+        ring = self.ring
+        control = ring.control
+        tail = self._tail
+        if self._held:
+            # the previous frame is done with, hand its slot back
+            self._release()
+            tail = self._tail = control[TAIL] = tail + 1
+            self._held = False
+        with metrics.timer("receive"):
+            if control[HEAD] == tail:
+                # state before head: CLOSED is only set after the last publish
+                _wait(lambda: control[HEAD] != tail or control[STATE] == CLOSED, self._sender_alive)
+                if control[HEAD] == tail:
+                    if control[STATE] != CLOSED:
+                        # the sender died mid-session; its unpublished slot is ignored
+                        print("Sender {} is gone, ending its session".format(control[SENDER_PID]))
+                        metrics.count("senders_lost")
+                    # drained: the next sender may attach
+                    control[STATE] = IDLE
+                    self._done = True
+                    return None
+        offset = ring.slot(tail)
+        (size,) = SLOT_HEADER.unpack_from(ring.data, offset)
+        offset += SLOT_HEADER.size
+        n = (size + 7) >> 3 if self.packed else size
+        self._held = True
+        metrics.count("frames_received")
+        metrics.count("bytes_received", n)
+        view = ring.data[offset : offset + n]
+        if self.packed:
+            self._view = view
+            return view, size
+        return bytes(view) if self.raw else bytes(view).decode()
+
+    def _release(self):
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                # the caller still holds a slice of it
+                pass
+            self._view = None
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        # release the last frame; the ring itself belongs to the listener
+        self._release()
+        if self._held:
+            self._tail = self.ring.control[TAIL] = self._tail + 1
+            self._held = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class FrameRingListener:
+    """
+    FrameListener interface: creates the shared ring (replacing a stale one
+    of the same name) and accept() waits for a sender to attach (for at most
+    timeout seconds if given, then TimeoutError).
+    """
+
+    def __init__(self, name=RING_NAME, slots=DEFAULT_SLOTS, slot_bytes=DEFAULT_SLOT_BYTES):
+        _check_machine()
+        stride = (SLOT_HEADER.size + slot_bytes + 7) & ~7
+        size = CONTROL_BYTES + slots * stride
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # left over from a receiver that did not shut down
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        LAYOUT.pack_into(shm.buf, 0, MAGIC, slots, slot_bytes)
+        self.ring = _Ring(shm)
+        self.ring.control[RECEIVER_PID] = os.getpid()
+
+    def accept(self, raw=False, packed=False, timeout=None):
+        control = self.ring.control
+        if not _wait(lambda: control[STATE] != IDLE, timeout=timeout):
+            raise TimeoutError("no sender attached within {}s".format(timeout))
+        return FrameRingReceiverSession(self.ring, raw=raw, packed=packed)
+
+    def close(self):
+        if self.ring is not None:
+            shm = self.ring.shm
+            self.ring.close()
+            shm.unlink()
+            self.ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
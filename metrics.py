@@ -0,0 +1,198 @@
+"""
+Lightweight per-stage counters and latency histograms.
+
+Disabled by default. While disabled, timer() hands back one shared no-op
+context manager and count() returns immediately, so the instrumented hot
+paths only pay for a flag check. Enable with metrics.enable() (sender.py /
+receiver.py --metrics) or METRICS_ENABLED=1 in the environment.
+
+Stages used across the project:
+    frame_build, redundancy, inject, send, receive, validate, write
+
+Snapshots export as JSON (snapshot()/to_json()) or Prometheus text
+(to_prometheus()); serve() exposes both over HTTP for scraping.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.getenv("METRICS_ENABLED", "0") not in ("", "0", "false", "False")
+
+# latency bucket upper bounds in seconds (1us .. 10s)
+BUCKETS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-quantile
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def disable():
+    enable(False)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name, n=1):
+    """Add n to a counter (no-op while disabled)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(stage, seconds):
+    """Record one latency sample for a stage (no-op while disabled)."""
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = Histogram()
+        hist.observe(seconds)
+
+
+def timer(stage):
+    """Context manager timing a block into the stage's histogram."""
+    return _Timer(stage) if ENABLED else _NULL
+
+
+def start():
+    """Start time for stop(), or None while disabled (for loops that yield)."""
+    return time.perf_counter() if ENABLED else None
+
+
+def stop(stage, started):
+    if started is not None:
+        observe(stage, time.perf_counter() - started)
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def snapshot():
+    """Point-in-time copy of all counters and histograms as plain dicts."""
+    with _lock:
+        stages = {}
+        for stage, h in _histograms.items():
+            stages[stage] = {
+                "count": h.count,
+                "sum_seconds": h.total,
+                "mean_seconds": h.total / h.count if h.count else 0.0,
+                "max_seconds": h.max,
+                "p50_seconds": h.quantile(0.5),
+                "p99_seconds": h.quantile(0.99),
+                "buckets": {str(b): n for b, n in zip(BUCKETS + ("+Inf",), h.counts)},
+            }
+        return {"timestamp": time.time(), "counters": dict(_counters), "stages": stages}
+
+
+def to_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus(prefix="errctl"):
+    """Prometheus text exposition format (counters + cumulative histograms)."""
+    with _lock:
+        lines = []
+        for name, value in sorted(_counters.items()):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        metric = f"{prefix}_stage_seconds"
+        if _histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for stage, h in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {h.total}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, ctype = to_json().encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, ctype = to_prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=9100, host="127.0.0.1"):
+    """Serve /metrics (Prometheus) and /metrics.json from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,79 @@
+"""
+Multi-core CRC of large buffers.
+
+The buffer is copied once into multiprocessing.shared_memory; each worker
+attaches to it and CRCs one segment through a memoryview (no pickling of the
+data). The segment CRCs are merged in order with CRCEngine.combine:
+CRC(A||B) = CRC(A) * x^len(B) mod G  xor  CRC(B).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from crc_engine import get_engine
+from utils import CRC_POLY
+
+# below this many bytes the pool costs more than it saves
+MIN_PARALLEL_BYTES = 1 << 20
+
+
+def _segment_crc(shm_name, polynomial, start, end):
+    # worker: CRC of shm[start:end]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf[start:end]
+        try:
+            return get_engine(polynomial).compute(view)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def _polynomial(polynomial):
+    # accept a CRC name from CRC_POLY or a polynomial bit-string
+    return CRC_POLY.get(polynomial, polynomial)
+
+
+def crc_parallel(data, polynomial, workers=None, segments=None, executor=None):
+    """
+    CRC (int) of bytes-like `data`, split into segments over a process pool.
+    polynomial is a CRC_POLY name ('crc-32') or bit-string. Same value as
+    calculate_crc(bytes_to_bits(data), polynomial).
+    """
+    polynomial = _polynomial(polynomial)
+    engine = get_engine(polynomial)
+    size = len(data)
+    workers = workers or os.cpu_count() or 1
+    segments = segments or workers
+    if size < MIN_PARALLEL_BYTES or segments < 2:
+        return engine.compute(data)
+
+    step = -(-size // segments)
+    bounds = [(start, min(start + step, size)) for start in range(0, size, step)]
+
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:size] = data
+        own_pool = executor is None
+        pool = ProcessPoolExecutor(max_workers=workers) if own_pool else executor
+        try:
+            futures = [pool.submit(_segment_crc, shm.name, polynomial, start, end) for start, end in bounds]
+            crc = 0
+            for (start, end), fut in zip(bounds, futures):
+                crc = engine.combine(crc, fut.result(), (end - start) * 8)
+        finally:
+            if own_pool:
+                pool.shutdown()
+        return crc
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def calculate_crc_parallel(data, polynomial, workers=None, segments=None, executor=None):
+    """Bit-string form of crc_parallel, matching error_handler.calculate_crc."""
+    polynomial = _polynomial(polynomial)
+    crc = crc_parallel(data, polynomial, workers, segments, executor)
+    return format(crc, "0{}b".format(len(polynomial) - 1))
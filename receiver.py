@@ -1,5 +1,15 @@
-from communication_handler import receiveFrame
-from utils import DataFrame,bin_to_ascii,hex_to_bin,bits_to_bytes
+import asyncio
+import codecs
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from capture import RECEIVED, CaptureWriter
+
+from communication_handler import openListener, startFrameServer, RECEIVER_ADDRESS
+from utils import DataFrame,PackedDataFrame,bin_to_ascii,hex_to_bin,bits_to_bytes
+import metrics
 import os
 from dotenv import load_dotenv
 
@@ -10,34 +20,217 @@ SENDER_PORT = hex_to_bin(str(os.getenv('SENDER_PORT')))
 RECEIVER_IP = hex_to_bin(str(os.getenv('RECEIVER_IP')))
 RECEIVER_PORT = hex_to_bin(str(os.getenv('RECEIVER_PORT')))
 
-def receiver():
-    receiver_data = ""
-    while True:
-        res = receiveFrame()
-        if res is not None:
-            frame = DataFrame(res)
-            if frame.validate():
-                print("Valid frame received : ",frame.getData())
-                receiver_data += frame.getData()
-            else:
-                print("Error: Invalid frame received : ",frame.getData())
-                # receiver_data+= frame.getData()
-            print("isLast : ",frame.isLast())
-            if frame.isLast():
-                print("Last frame received")
+class ReceivedDataWriter:
+    """
+    Writes validated payload to <name>.bin / <name>.txt as frames arrive.
+
+    Payloads are bit-strings whose length need not be a multiple of 8, so
+    up to 7 leftover bits are carried into the next frame; the final partial
+    byte is zero padded on close (same as bits_to_bytes). The text copy uses
+    an incremental UTF-8 decoder, so characters split across frames decode
+    correctly and invalid sequences are replaced.
+    """
+
+    def __init__(self, name="receiver", buffering=1 << 16):
+        self.fbin = open(name + ".bin", "wb", buffering=buffering)
+        self.ftxt = open(name + ".txt", "w", encoding="utf-8", buffering=buffering)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.carry = ""
+        self.bits_written = 0
+
+    def write_bytes(self, data):
+        self.fbin.write(data)
+        self.ftxt.write(self.decoder.decode(data))
+
+    def write_bits(self, bits):
+        with metrics.timer("write"):
+            self.bits_written += len(bits)
+            bits = self.carry + bits
+            whole = len(bits) - len(bits) % 8
+            self.carry = bits[whole:]
+            if whole:
+                self.write_bytes(int(bits[:whole], 2).to_bytes(whole // 8, "big"))
+
+    def write_frame(self, frame):
+        """Payload of a PackedDataFrame, written straight from its buffer when byte aligned."""
+        length = frame.getDatawordLen()
+        if self.carry or length % 8:
+            self.write_bits(frame.getDataBits())
+            return
+        with metrics.timer("write"):
+            self.bits_written += length
+            self.write_bytes(frame.getData())
+
+    def close(self):
+        try:
+            if self.carry:
+                self.write_bytes(bits_to_bytes(self.carry))
+                self.carry = ""
+            self.ftxt.write(self.decoder.decode(b"", final=True))
+        finally:
+            self.fbin.close()
+            self.ftxt.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def receiver(capture=None, channel=None, packed=False, transport="tcp"):
+    """
+    Receive one transfer into receiver.bin / receiver.txt.
+    channel: optional SimulatedChannel to receive from instead of a TCP socket.
+    packed: the sender uses a PackedSenderSession (sender.py --stream --packed);
+    frames are validated in place in the receive buffer.
+    transport: "tcp", "udp", "unix" or "shm" (see communication_handler.TRANSPORTS).
+    """
+    done = False
+    recorder = CaptureWriter(capture) if capture else nullcontext()
+    listener = channel if channel is not None else openListener(transport)
+    # bind once; a sender keeps one session open for the whole transfer
+    with listener, ReceivedDataWriter() as writer, recorder:
+        while not done:
+            last_seen = False
+            with listener.accept(packed=True) if packed else listener.accept() as session:
+                print("Connection established with", session.client_address)
+                for res in session:
+                    # packed sessions give (view, nbits) into the receive buffer, nothing is copied
+                    frame = PackedDataFrame(*res) if packed else DataFrame(res)
+                    if capture:
+                        # recorded as it came off the wire, before validation
+                        recorder.write(frame if packed else res, RECEIVED)
+                    valid = frame.validate()
+                    if packed:
+                        if valid:
+                            writer.write_frame(frame)
+                        else:
+                            print("Error: Invalid frame received")
+                    elif valid:
+                        print("Valid frame received : ",frame.getData())
+                        # written to receiver.bin / receiver.txt right away
+                        writer.write_bits(frame.getData())
+                    else:
+                        print("Error: Invalid frame received : ",frame.getData())
+                    print("isLast : ",frame.isLast())
+                    # the isLast bit of a corrupted frame cannot be trusted; the
+                    # session is drained either way, so the sender never blocks
+                    if frame.isLast():
+                        last_seen = True
+                        if valid:
+                            print("Last frame received")
+                            done = True
+            # datagram sessions number their frames; nothing else can drop one silently
+            missing = getattr(session, "frames_missing", 0)
+            if missing:
+                print(f"Warning: {missing} frames never arrived, receiver.bin has gaps")
+            if getattr(session, "frames_reordered", 0):
+                print(f"Warning: {session.frames_reordered} frames arrived out of order")
+            if last_seen and not done:
+                # the sender is finished, it will not reconnect to resend it
+                print("Transfer ended, the last frame was invalid")
+                done = True
+            if (channel is not None or transport != "tcp") and not done:
+                # a simulated or datagram sender does not reconnect (the last frame was lost)
+                print("Transfer ended without the last frame")
                 break
-    print("Received data : ",receiver_data)
-    print("Data length : ",len(receiver_data))
-    # convert and write raw bytes
-    data_bytes = bits_to_bytes(receiver_data)
-    # raw bytes
-    with open("receiver.bin", "wb") as fbin:
-        fbin.write(data_bytes)
-
-    # readable text (utf-8, replacing invalid sequences)
-    with open("receiver.txt", "w", encoding="utf-8") as ftxt:
-        ftxt.write(data_bytes.decode("utf-8", errors="replace"))
+    print("Data length : ",writer.bits_written)
+
+
+def checkFrame(res, verbose=True):
+    # runs in the executor: parse + validate one serialized frame
+    frame = DataFrame(res)
+    return frame.validate(verbose), frame.getData(), frame.isLast()
+
+
+async def handleTransfer(session, executor, name, window=32, capture=False):
+    """
+    Receive one transfer from an AsyncReceiverSession.
+    Up to `window` frames are validated in the executor at once; results are
+    consumed in arrival order so the payload is reassembled correctly.
+    With capture=True the raw frames are also recorded to <name>.ecap.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    writer = ReceivedDataWriter(name)
+    recorder = CaptureWriter(name + ".ecap") if capture else None
+    # file writes block, so they leave the event loop too; the writer holds
+    # open files and cannot go to a process pool, use the loop's threads then
+    io_executor = executor if isinstance(executor, ThreadPoolExecutor) else None
+    last_seen = False
+
+    async def consume():
+        nonlocal last_seen
+        valid, data, isLast = await pending.popleft()
+        if valid:
+            # awaited before the next frame, so writes stay in order
+            await loop.run_in_executor(io_executor, writer.write_bits, data)
+        else:
+            print(f"[{name}] Error: Invalid frame received")
+        # a corrupted isLast bit must not end the transfer
+        last_seen = last_seen or (valid and isLast)
+
+    try:
+        async for res in session:
+            if recorder:
+                recorder.write(res, RECEIVED)
+            pending.append(loop.run_in_executor(executor, checkFrame, res))
+            if len(pending) >= window:
+                await consume()
+            if last_seen:
+                break
+        while pending and not last_seen:
+            await consume()
+        if pending:
+            # frames behind the last one: let their checks finish, then drop them
+            await asyncio.gather(*pending)
+            print(f"[{name}] Ignored {len(pending)} frames after the last frame")
+            pending.clear()
+    finally:
+        await loop.run_in_executor(io_executor, writer.close)
+        if recorder:
+            recorder.close()
+
+    print(f"[{name}] {session.client_address}: {writer.bits_written} bits received (last frame: {last_seen})")
+
+
+async def receiverServer(address=RECEIVER_ADDRESS, workers=None, executor=None, capture=False):
+    """
+    Long-lived receiver: binds once and accepts any number of concurrent
+    senders. Each connection is one transfer, written to receiver_<n>.bin/.txt
+    (and receiver_<n>.ecap when capture is set).
+    Frame validation runs in `executor` (a thread pool by default; pass a
+    ProcessPoolExecutor to spread it over cores).
+    """
+    executor = executor or ThreadPoolExecutor(max_workers=workers)
+    transfer_ids = iter(range(1, sys.maxsize))
+
+    async def on_session(session):
+        await handleTransfer(session, executor, f"receiver_{next(transfer_ids)}", capture=capture)
+
+    server = await startFrameServer(on_session, address)
+    print("Receiver server listening on", address)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+
 
 if __name__ == "__main__":
-    receiver()
+    # usage: python receiver.py [--server] [--metrics] [--capture | --capture=FILE] [--packed]
+    #                           [--transport=tcp|udp|unix|shm]
+    if "--metrics" in sys.argv:
+        metrics.enable()
+    capture = next((a.partition("=")[2] or "receiver.ecap" for a in sys.argv[1:] if a.startswith("--capture")), None)
+    if "--server" in sys.argv:
+        if metrics.ENABLED:
+            metrics.serve(int(os.getenv("METRICS_PORT", 9100)))
+        asyncio.run(receiverServer(capture=bool(capture)))
+    else:
+        transport = next((a.partition("=")[2] for a in sys.argv[1:] if a.startswith("--transport=")), "tcp")
+        receiver(capture, packed="--packed" in sys.argv, transport=transport)
+        if metrics.ENABLED:
+            print(metrics.to_json())
 
@@ -0,0 +1,151 @@
+"""
+hashlib-style incremental objects for the detection codes of utils.REDUNDANT_BIT_TYPE
+(checksum and CRCs; the FEC types hamming / rs are rejected by new()).
+
+    h = redundancy.new("crc-32")
+    h.update(b"first part")
+    h.update(b"second part")
+    h.digest()            # bytes, big-endian
+    h.bitdigest()         # '0'/'1' string, same as calculate_crc on the whole input
+
+update() takes bytes-like data; update_bits() takes the legacy '0'/'1'
+strings, and the two can be mixed. combine(a, b, len_b) merges the values of
+two independently computed segments like zlib.crc32_combine (len_b in bytes).
+"""
+
+from crc_engine import get_engine
+from error_handler import ones_complement_sum
+from utils import CRC_POLY, FEC_TYPES, REDUNDANT_BIT_TYPE, REDUNDANT_BITS_CNT
+
+
+class CRCHash:
+    """Running CRC (same remainder as error_handler.calculate_crc)."""
+
+    def __init__(self, name, data=None):
+        if name not in CRC_POLY:
+            raise ValueError("Unknown CRC type: {}".format(name))
+        self.name = name
+        self.engine = get_engine(CRC_POLY[name])
+        self.width = self.engine.width
+        self.digest_size = (self.width + 7) // 8
+        self.value = 0
+        self.nbits = 0
+        if data is not None:
+            self.update(data)
+
+    def update(self, data):
+        self.value = self.engine.update(self.value, data)
+        self.nbits += len(data) * 8
+
+    def update_bits(self, bits):
+        self.value = self.engine.update_bitstring(self.value, bits)
+        self.nbits += len(bits)
+
+    def copy(self):
+        other = CRCHash.__new__(CRCHash)
+        other.name = self.name
+        other.engine = self.engine
+        other.width = self.width
+        other.digest_size = self.digest_size
+        other.value = self.value
+        other.nbits = self.nbits
+        return other
+
+    def digest(self):
+        return self.value.to_bytes(self.digest_size, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def bitdigest(self):
+        return format(self.value, "0{}b".format(self.width))
+
+    def combine(self, crc_a, crc_b, len_b):
+        """CRC of A||B from CRC(A), CRC(B) and len(B) in bytes."""
+        return self.engine.combine(crc_a, crc_b, len_b * 8)
+
+
+class ChecksumHash:
+    """
+    Running 16-bit one's complement checksum (same result as
+    error_handler.calculate_checksum on the whole input).
+
+    Appending L bits to a value V gives V*2^L + chunk, and 2^16 == 1 mod 0xFFFF,
+    so only the running sum mod 0xFFFF and whether any bit was set are kept.
+    """
+
+    name = "checksum"
+    width = 16
+    digest_size = 2
+
+    def __init__(self, name="checksum", data=None):
+        if name != "checksum":
+            raise ValueError("Unknown checksum type: {}".format(name))
+        self._sum = 0
+        self._nonzero = False
+        self.nbits = 0
+        if data is not None:
+            self.update(data)
+
+    def _append(self, chunk, nbits):
+        if chunk:
+            self._nonzero = True
+        self._sum = ((self._sum << (nbits % 16)) + chunk) % 0xFFFF
+        self.nbits += nbits
+
+    def update(self, data):
+        self._append(int.from_bytes(data, "big"), len(data) * 8)
+
+    def update_bits(self, bits):
+        if bits:
+            self._append(int(bits, 2), len(bits))
+
+    def copy(self):
+        other = ChecksumHash()
+        other._sum = self._sum
+        other._nonzero = self._nonzero
+        other.nbits = self.nbits
+        return other
+
+    @property
+    def value(self):
+        total = (self._sum or 0xFFFF) if self._nonzero else 0
+        return total ^ 0xFFFF
+
+    def digest(self):
+        return self.value.to_bytes(2, "big")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def bitdigest(self):
+        return format(self.value, "016b")
+
+    def combine(self, checksum_a, checksum_b, len_b):
+        """Checksum of A||B from the two checksums and len(B) in bytes."""
+        sum_a = checksum_a ^ 0xFFFF
+        sum_b = checksum_b ^ 0xFFFF
+        # a sum of 0 only comes from all-zero data; 0xFFFF is the non-zero "0"
+        if sum_a == 0 and sum_b == 0:
+            return 0xFFFF
+        total = ones_complement_sum((sum_a << ((len_b * 8) % 16)) + sum_b)
+        return total ^ 0xFFFF
+
+
+def new(name, data=None):
+    """Create a running CRC/checksum object; name is a REDUNDANT_BITS_CNT key or a REDUNDANT_BIT_TYPE code."""
+    if isinstance(name, int):
+        name = REDUNDANT_BIT_TYPE.get(name, name)
+    if name in FEC_TYPES:
+        # the parity depends on the whole codeword layout (fec.py), not a running register
+        raise ValueError("FEC types have no incremental check: {}".format(name))
+    if name not in REDUNDANT_BITS_CNT:
+        raise ValueError("Unknown redundancy type: {}".format(name))
+    if name == "checksum":
+        return ChecksumHash(name, data)
+    return CRCHash(name, data)
+
+
+def combine(name, value_a, value_b, len_b):
+    """Module-level combine: merge segment values for redundancy type `name` (len_b in bytes)."""
+    return new(name).combine(value_a, value_b, len_b)
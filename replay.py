@@ -0,0 +1,124 @@
+"""
+Replay a capture file (see capture.py) through the receiver.
+
+Frames are fed to receiver.checkFrame, the same parse + validate step the
+receiver runs on every frame it gets off the wire, either as fast as
+possible or with the gaps between the recorded timestamps. With --send the
+frames go over TCP to a running receiver instead.
+
+    python replay.py capture.ecap                 # full speed, print stats
+    python replay.py capture.ecap --paced         # recorded pacing
+    python replay.py capture.ecap --paced --speed 10
+    python replay.py capture.ecap --output replay # also write replay.bin / replay.txt
+    python replay.py capture.ecap --send          # to receiver.py on RECEIVER_ADDRESS
+"""
+
+import argparse
+import time
+
+from capture import RECEIVED, SENT, CaptureReader
+from communication_handler import RECEIVER_ADDRESS, SenderSession
+from receiver import ReceivedDataWriter, checkFrame
+
+DIRECTIONS = {"sent": SENT, "received": RECEIVED}
+
+
+def _records(reader, direction=None, start=0, stop=None):
+    for i in range(start, len(reader) if stop is None else min(stop, len(reader))):
+        record = reader[i]
+        if direction is None or record.direction == direction:
+            yield record
+
+
+def _paced(records, speed):
+    # sleep so frames come out with the recorded gaps (divided by speed)
+    first = origin = None
+    for record in records:
+        if first is None:
+            first, origin = record.timestamp, time.perf_counter()
+        else:
+            delay = (record.timestamp - first) / speed - (time.perf_counter() - origin)
+            if delay > 0:
+                time.sleep(delay)
+        yield record
+
+
+def replay(path, direction=None, paced=False, speed=1.0, start=0, stop=None, output=None):
+    """
+    Validate the frames of a capture like the receiver does.
+    Returns stats: frames, valid, invalid, last, injected (frames recorded
+    with errors), detected / missed (injected frames rejected / accepted),
+    false_rejects (clean frames rejected), elapsed and frames_per_sec.
+    """
+    stats = dict.fromkeys(("frames", "valid", "invalid", "last", "injected", "detected", "missed", "false_rejects"), 0)
+    writer = ReceivedDataWriter(output) if output else None
+    began = time.perf_counter()
+    try:
+        with CaptureReader(path) as reader:
+            records = _records(reader, direction, start, stop)
+            if paced:
+                records = _paced(records, speed)
+            for record in records:
+                # the stats are the report; no per-frame remainder prints
+                valid, data, isLast = checkFrame(record.frame.toBitString(), verbose=False)
+                stats["frames"] += 1
+                stats["valid" if valid else "invalid"] += 1
+                stats["last"] += isLast
+                if record.error_positions:
+                    stats["injected"] += 1
+                    stats["missed" if valid else "detected"] += 1
+                elif not valid:
+                    stats["false_rejects"] += 1
+                if writer is not None and valid:
+                    writer.write_bits(data)
+    finally:
+        if writer is not None:
+            writer.close()
+    stats["elapsed"] = time.perf_counter() - began
+    stats["frames_per_sec"] = stats["frames"] / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+def replaySend(path, address=RECEIVER_ADDRESS, direction=SENT, paced=False, speed=1.0, start=0, stop=None):
+    """Send the captured frames to a live receiver over one SenderSession."""
+    with CaptureReader(path) as reader, SenderSession(address) as session:
+        records = _records(reader, direction, start, stop)
+        if paced:
+            records = _paced(records, speed)
+        for record in records:
+            session.send(record.frame.toBitString())
+            if paced:
+                session.flush()
+    return session.frames_sent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="capture file written by CaptureWriter")
+    parser.add_argument("--direction", choices=("sent", "received", "all"), default="all")
+    parser.add_argument("--paced", action="store_true", help="keep the recorded gaps between frames")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing speed-up factor")
+    parser.add_argument("--start", type=int, default=0, help="first record to replay")
+    parser.add_argument("--stop", type=int, help="replay up to (not including) this record")
+    parser.add_argument("--output", help="write accepted payload to OUTPUT.bin / OUTPUT.txt")
+    parser.add_argument("--send", action="store_true", help="send to a running receiver instead")
+    args = parser.parse_args(argv)
+
+    direction = DIRECTIONS.get(args.direction)
+    if args.send:
+        sent = replaySend(args.capture, RECEIVER_ADDRESS, direction, args.paced, args.speed, args.start, args.stop)
+        print(f"Sent {sent} frames")
+        return
+    stats = replay(args.capture, direction, args.paced, args.speed, args.start, args.stop, args.output)
+    print(
+        f"{stats['frames']} frames in {stats['elapsed']:.3f}s ({stats['frames_per_sec']:.0f} frames/s): "
+        f"{stats['valid']} valid, {stats['invalid']} invalid, {stats['last']} last"
+    )
+    if stats["injected"]:
+        print(f"injected errors: {stats['injected']} frames, {stats['detected']} detected, {stats['missed']} missed")
+    if stats["false_rejects"]:
+        print(f"clean frames rejected: {stats['false_rejects']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
-from communication_handler import sendFrame
-from utils import DataFrame,ascii_to_bin,hex_to_bin,bytes_to_bits
+from communication_handler import openSenderSession
+from utils import DataFrame,PackedDataFrame,ascii_to_bin,hex_to_bin,bytes_to_bits
 from error_handler import inject_error
+from capture import CaptureWriter
+from contextlib import nullcontext
+from receiver import ReceivedDataWriter, receiver
+from arq import GO_BACK_N
+import arq
+from simulated_channel import SimulatedChannel
+from custom_error_injector import BSC
+import metrics
+import mmap
 import os
+import shutil
+import sys
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,16 +22,22 @@ SENDER_IP = hex_to_bin(str(os.getenv('SENDER_IP')))
 SENDER_PORT = hex_to_bin(str(os.getenv('SENDER_PORT')))
 RECEIVER_IP = hex_to_bin(str(os.getenv('RECEIVER_IP')))
 RECEIVER_PORT = hex_to_bin(str(os.getenv('RECEIVER_PORT')))
+FRAME_SIZE = int(os.getenv('FRAME_SIZE', 64))
 
 
 sender_addr = (SENDER_IP, SENDER_PORT)
 receiver_addr = (RECEIVER_IP, RECEIVER_PORT)
 redundant_bit_type = "checksum"
 # Send a file to the receiver
-def sendFile(filename,binary=None):
+def sendFile(filename,binary=None,capture=None,error_type=None,channel=None,transport="tcp"):
     """
     Send a file. If filename ends with .bin OR binary==True -> treat as raw bytes.
     Otherwise read as text and encode to UTF-8 bytes before converting to bits.
+    capture: optional capture file path, every sent frame is recorded there.
+    error_type: optional inject_error type applied to every frame (recorded
+    in the capture with the flipped positions).
+    channel: optional SimulatedChannel used instead of the TCP connection.
+    transport: "tcp", "udp", "unix" or "shm" (see communication_handler.TRANSPORTS).
     """
     # decide binary vs text. explicit `binary` param overrides extension check.
     if binary is None:
@@ -45,13 +63,149 @@ def sendFile(filename,binary=None):
     print(f"Preparing to send file: {filename}  (binary={binary})")
     print("Total payload bits:", len(data_bits))
 
-    frames = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bit_type)
+    frames = DataFrame.createFrames(data_bits, sender_addr, receiver_addr, redundant_bit_type, FRAME_SIZE)
     number_of_frames = len(frames)
     print(f"Sending {number_of_frames} frames")
     # print("data to sent : ", data_bits)
-    for frame in frames:
-        # sendFrame(inject_error(frame.serialize(),error_type='burst'))
-        sendFrame(frame.serialize())
+    # one connection for the whole transfer, frames are length-prefixed
+    with _session(channel, transport=transport) as session, _recorder(capture) as recorder:
+        for frame in frames:
+            wire = frame.serialize()
+            positions = ()
+            if error_type:
+                wire, positions = inject_error(wire, error_type=error_type)
+            session.send(wire)
+            if recorder:
+                recorder.write(wire, error_type=error_type, positions=positions)
+    print(f"Sent {session.frames_sent} frames")
+
+
+def _session(channel, packed=False, transport="tcp"):
+    if channel is not None:
+        return channel.connect()
+    return openSenderSession(transport, packed=packed)
+
+
+def _recorder(capture):
+    return CaptureWriter(capture) if capture else nullcontext()
+
+
+def sendFileStreaming(filename, binary=None, capture=None, channel=None, packed=False, transport="tcp"):
+    """
+    Constant-memory variant of sendFile for large inputs.
+    The file is mmapped and frames are built lazily (PackedDataFrame.iterFrames)
+    and sent as they are produced, so nothing is expanded to a bit-string up
+    front. Frames on the wire are the same bit-strings sendFile sends, or with
+    packed=True the packed frames themselves, written with scatter-gather
+    sendmsg (receiver.py --packed).
+    Text files are sent as their raw UTF-8 bytes (no newline translation).
+    """
+    if binary is None:
+        binary = filename.lower().endswith(".bin")
+
+    if not binary:
+        # binary copy of the input text, streamed instead of read into memory
+        shutil.copyfile(filename, "input.bin")
+
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        print(f"Streaming file: {filename}  (binary={binary}, {size} bytes)")
+        if size == 0:
+            print("Nothing to send")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            frames = PackedDataFrame.iterFrames(mm, sender_addr, receiver_addr, redundant_bit_type, FRAME_SIZE)
+            with _session(channel, packed, transport) as session, _recorder(capture) as recorder:
+                for frame in frames:
+                    session.send(frame if packed and channel is None else frame.toBitString())
+                    if recorder:
+                        recorder.write(frame)
+    print(f"Sent {session.frames_sent} frames")
+
+def simulateTransfer(filename, channel=None, stream=False):
+    """
+    Run sender and receiver in this process over a SimulatedChannel
+    (error free by default), no sockets involved. Returns the channel stats.
+    """
+    channel = channel or SimulatedChannel()
+    receiving = threading.Thread(target=receiver, kwargs={"channel": channel})
+    receiving.start()
+    try:
+        if stream:
+            sendFileStreaming(filename, channel=channel)
+        else:
+            sendFile(filename, channel=channel)
+    finally:
+        receiving.join()
+    return channel.stats
+
+
+def sendFileARQ(filename, mode=GO_BACK_N, window=8, forward=None, reverse=None, binary=None, adaptive=False):
+    """
+    Reliable in-process transfer of a file with sliding-window ARQ (see arq.py)
+    over a pair of SimulatedChannels. The receiver side writes receiver.bin /
+    receiver.txt. With adaptive=True FRAME_SIZE is only the starting size.
+    Returns the sender and receiver statistics.
+    """
+    if binary is None:
+        binary = filename.lower().endswith(".bin")
+    if not binary:
+        shutil.copyfile(filename, "input.bin")
+    with open(filename, "rb") as f:
+        data_bits = bytes_to_bits(f.read())
+    print(f"ARQ transfer of {filename}: {mode}, window {window}, {len(data_bits)} bits")
+    with ReceivedDataWriter() as writer:
+        result = arq.transfer(
+            data_bits,
+            mode,
+            window,
+            forward=forward,
+            reverse=reverse,
+            sender_addr=sender_addr,
+            receiver_addr=receiver_addr,
+            redundant_bit_type=redundant_bit_type,
+            frame_size=FRAME_SIZE,
+            on_data=lambda bits, isLast: writer.write_bits(bits),
+            adaptive=adaptive,
+        )
+    return result
+
+
+def _option(name):
+    # value of a --name=value argument, or None
+    prefix = "--" + name + "="
+    return next((a[len(prefix):] for a in sys.argv[1:] if a.startswith(prefix)), None)
+
 
 if __name__ == "__main__":
-    sendFile("input.txt")
+    # usage: python sender.py [filename] [--stream [--packed]] [--transport=tcp|udp|unix|shm] [--metrics]
+    #                         [--capture=FILE] [--inject=TYPE]
+    #        python sender.py [filename] [--stream] --sim [--loss=P] [--ber=P] [--seed=N]
+    #        python sender.py [filename] --sim --arq=MODE [--window=N] [--adaptive] [--loss=P] [--ber=P] [--seed=N]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    filename = args[0] if args else "input.txt"
+    if "--metrics" in sys.argv:
+        metrics.enable()
+    if "--sim" in sys.argv:
+        ber = float(_option("ber") or 0)
+        seed = int(_option("seed") or 0)
+        loss = float(_option("loss") or 0)
+        channel = SimulatedChannel(loss=loss, error_model=BSC(ber) if ber else None, seed=seed)
+        if _option("arq"):
+            # ACK/NAK frames travel back over a second channel with the same impairments
+            reverse = SimulatedChannel(capacity=0, loss=loss, error_model=BSC(ber) if ber else None, seed=seed + 1)
+            result = sendFileARQ(
+                filename, _option("arq"), int(_option("window") or 8), channel, reverse, adaptive="--adaptive" in sys.argv
+            )
+            print("Sender:", result["sender"])
+            print("Receiver:", result["receiver"])
+        else:
+            print("Channel:", simulateTransfer(filename, channel, "--stream" in sys.argv))
+    elif "--stream" in sys.argv:
+        sendFileStreaming(
+            filename, capture=_option("capture"), packed="--packed" in sys.argv, transport=_option("transport") or "tcp"
+        )
+    else:
+        sendFile(filename, capture=_option("capture"), error_type=_option("inject"), transport=_option("transport") or "tcp")
+    if metrics.ENABLED:
+        print(metrics.to_json())
@@ -0,0 +1,267 @@
+"""
+In-process channel with the same interface as the TCP transport.
+
+SimulatedChannel stands in for both ends of communication_handler:
+channel.connect() returns a sender session (send / flush / close,
+frames_sent) and channel.accept() a receiver session (receive, iteration,
+client_address), so sender.sendFile and receiver.receiver run unchanged in
+one process, with the receiver in a thread:
+
+    channel = SimulatedChannel(loss=0.01, error_model=BSC(1e-4), seed=1)
+    t = threading.Thread(target=receiver, kwargs={"channel": channel})
+    t.start()
+    sendFile("input.txt", channel=channel)
+    t.join()
+
+Frames travel through a bounded queue (a full queue blocks the sender, like
+a full socket buffer; once the receiver session is closed send() raises
+BrokenPipeError instead of blocking). On the way they can be delayed (latency + jitter),
+dropped (loss), swapped with the next frame (reorder) and corrupted by a
+custom_error_injector model. Every random choice comes from one seeded
+generator, so a run is reproducible.
+"""
+
+import heapq
+import itertools
+import queue
+import time
+
+import numpy as np
+
+import metrics
+from custom_error_injector import ErrorInjector
+from utils import PackedDataFrame
+
+# marks the end of a sender session in the queue
+_CLOSED = object()
+
+# seconds a blocked send() waits between checks for a closed receiver
+PUT_POLL = 0.1
+
+
+class SimulatedChannel:
+    def __init__(
+        self,
+        capacity=1024,
+        latency=0.0,
+        jitter=0.0,
+        loss=0.0,
+        reorder=0.0,
+        error_model=None,
+        seed=None,
+        name="simulated",
+    ):
+        """
+        capacity: frames the queue holds before send() blocks (0 = unbounded)
+        latency, jitter: delivery delay in seconds, latency + uniform(0, jitter)
+        loss: probability a frame is dropped
+        reorder: probability a frame is held back and delivered after the next one
+        error_model: custom_error_injector model, inject_error type name or
+            ErrorInjector applied to every delivered frame (None = error free)
+        """
+        self.queue = queue.Queue(maxsize=capacity)
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = np.random.default_rng(seed)
+        if error_model is None or isinstance(error_model, ErrorInjector):
+            self.injector = error_model
+        else:
+            # share the channel's generator so one seed fixes the whole run
+            self.injector = ErrorInjector(error_model)
+            self.injector.rng = self.rng
+        self.name = name
+        self.receiver_closed = False
+        self.stats = dict.fromkeys(("sent", "lost", "reordered", "corrupted", "bits_flipped", "delivered"), 0)
+
+    # --- endpoints ------------------------------------------------------------
+    def connect(self):
+        """Sender side, used like communication_handler.SenderSession."""
+        return ChannelSenderSession(self)
+
+    def accept(self, raw=False, packed=False):
+        """Receiver side, used like FrameListener.accept()."""
+        self.receiver_closed = False
+        return ChannelReceiverSession(self, raw=raw, packed=packed)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- channel effects --------------------------------------------------------
+    def _transmit(self, frame):
+        # sender side: loss, corruption and delivery time for one frame
+        self.stats["sent"] += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.stats["lost"] += 1
+            metrics.count("frames_lost")
+            return None
+        if self.injector is not None:
+            frame, positions = self.injector.inject(frame)
+            if not isinstance(frame, str):
+                frame = bytes(frame)
+            if len(positions):
+                self.stats["corrupted"] += 1
+                self.stats["bits_flipped"] += len(positions)
+        delay = self.latency + (self.rng.random() * self.jitter if self.jitter else 0.0)
+        return time.perf_counter() + delay, frame
+
+
+class ChannelSenderSession:
+    """Sender end of a SimulatedChannel (SenderSession interface)."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.client_address = (channel.name, id(self))
+        self._held = None
+        self.frames_sent = 0
+
+    def connect(self):
+        return self
+
+    def send(self, frame):
+        if isinstance(frame, memoryview):
+            frame = frame.tobytes()
+        self.frames_sent += 1
+        metrics.count("frames_sent")
+        metrics.count("bytes_sent", len(frame))
+        item = self.channel._transmit(frame)
+        if item is None:
+            return
+        channel = self.channel
+        if self._held is None and channel.reorder and channel.rng.random() < channel.reorder:
+            # deliver after the next frame
+            channel.stats["reordered"] += 1
+            self._held = item
+            return
+        self._put(item)
+        if self._held is not None:
+            held, self._held = self._held, None
+            # keep the swap visible even with latency: not due before `item`
+            self._put((max(held[0], item[0]), held[1]))
+
+    def _put(self, item):
+        # blocks while the queue is full, like a socket send, until the receiver goes away
+        channel = self.channel
+        while True:
+            if channel.receiver_closed:
+                raise BrokenPipeError("receiver closed the channel")
+            try:
+                channel.queue.put(item, timeout=PUT_POLL)
+                return
+            except queue.Full:
+                pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.channel is None:
+            return
+        try:
+            if self._held is not None:
+                self._put(self._held)
+                self._held = None
+            self._put(_CLOSED)
+        except BrokenPipeError:
+            # nobody is left to read the rest
+            pass
+        self.channel = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ChannelReceiverSession:
+    """
+    Receiver end of a SimulatedChannel (ReceiverSession interface).
+    Frames are released in order of delivery time. With packed=True they are
+    returned as (view, nbits) like a packed socket session, ready for
+    PackedDataFrame(view, nbits).
+    """
+
+    def __init__(self, channel, raw=False, packed=False):
+        self.channel = channel
+        self.raw = raw
+        self.packed = packed
+        self.client_address = (channel.name, "receiver")
+        self._due = []  # heap of (deliver_at, seq, frame)
+        self._seq = itertools.count()
+        self._closed = False
+
+    def _pull(self, timeout=None):
+        try:
+            item = self.channel.queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        if item is _CLOSED:
+            self._closed = True
+        else:
+            heapq.heappush(self._due, (item[0], next(self._seq), item[1]))
+
+    def receive(self, timeout=None):
+        """
+        Return the next frame, or None once the sender has closed the session.
+        With a timeout (seconds) raises TimeoutError if nothing is due in time.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with metrics.timer("receive"):
+            while True:
+                now = time.perf_counter()
+                left = None if deadline is None else deadline - now
+                if not self._due:
+                    if self._closed:
+                        return None
+                    if left is not None and left <= 0:
+                        raise TimeoutError("no frame within {}s".format(timeout))
+                    self._pull(timeout=left)
+                    continue
+                wait = self._due[0][0] - now
+                if wait <= 0:
+                    break
+                if left is not None:
+                    if left <= 0:
+                        raise TimeoutError("no frame within {}s".format(timeout))
+                    wait = min(wait, left)
+                if self._closed:
+                    time.sleep(wait)
+                else:
+                    # a later send may still be due earlier
+                    self._pull(timeout=wait)
+            _, _, frame = heapq.heappop(self._due)
+        self.channel.stats["delivered"] += 1
+        metrics.count("frames_received")
+        metrics.count("bytes_received", len(frame))
+        if self.packed:
+            # frames travel as bit-strings (str, or their ASCII bytes)
+            frame = PackedDataFrame.fromBitString(frame if isinstance(frame, str) else bytes(frame).decode())
+            return frame.serialize(), frame.nbits
+        if self.raw:
+            return frame.encode() if isinstance(frame, str) else bytes(frame)
+        return frame if isinstance(frame, str) else bytes(frame).decode()
+
+    def __iter__(self):
+        while True:
+            frame = self.receive()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self):
+        # a sender blocked on the full queue gives up instead of waiting forever
+        self.channel.receiver_closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,260 @@
+"""
+Batched Monte Carlo error-detection simulator.
+
+CRC is linear, so whether an error is caught depends only on the error
+pattern e(x), never on the frame: the receiver sees (c(x) + e(x)) mod G and
+c(x) mod G == 0, so the verdict is "e(x) mod G != 0". The syndrome of a
+pattern is the XOR of the per-position syndromes x^(n-1-p) mod G, so a whole
+batch of error vectors is checked with one gather + XOR reduce (bursts use a
+prefix-XOR table and cost O(1) each).
+
+The checksum is not linear over GF(2) (a flip adds or subtracts 2^k depending
+on the bit it hits), so it is simulated against a concrete frame: each flip
+contributes +/- 2^k to the one's complement sum, which only matters mod 0xFFFF.
+
+Error types follow error_handler.inject_error: 'single', 'two_isolated',
+'odd' (3 bits) and 'burst' (2..6 contiguous bits).
+"""
+
+import math
+
+import numpy as np
+
+from checksum_engine import checksum as _checksum
+from utils import CRC_POLY, REDUNDANT_BITS_CNT
+
+ERROR_TYPES = ("single", "two_isolated", "odd", "burst")
+
+# inject_error draws burst lengths from randint(2, 6)
+BURST_MIN = 2
+BURST_MAX = 6
+ODD_WEIGHT = 3
+
+DEFAULT_BATCH = 1 << 16
+
+# z for a two-sided 95% interval
+Z_95 = 1.959963984540054
+
+
+# ---------------------------------------------------------------------------
+# Syndrome tables
+# ---------------------------------------------------------------------------
+
+def syndrome_table(polynomial, n):
+    """
+    syn[p] = x^(n-1-p) mod G for every bit position p of an n-bit codeword
+    (position 0 is the first bit sent, as in the bit-strings).
+    """
+    width = len(polynomial) - 1
+    poly = int(polynomial, 2)
+    top = 1 << width
+    syn = np.zeros(n, dtype=np.uint64)
+    reg = 1
+    for p in range(n - 1, -1, -1):
+        syn[p] = reg
+        reg <<= 1
+        if reg & top:
+            reg ^= poly
+    return syn
+
+
+def prefix_xor(table):
+    """pre[i] = table[0] ^ ... ^ table[i-1]; a run [s, s+L) is pre[s+L] ^ pre[s]."""
+    pre = np.zeros(len(table) + 1, dtype=table.dtype)
+    np.bitwise_xor.accumulate(table, out=pre[1:])
+    return pre
+
+
+# ---------------------------------------------------------------------------
+# Error generation
+# ---------------------------------------------------------------------------
+
+def _distinct_positions(rng, n, trials, weight):
+    # draw `weight` distinct positions per row, redrawing rows with collisions
+    pos = rng.integers(0, n, size=(trials, weight))
+    if weight < 2:
+        return pos
+    while True:
+        s = np.sort(pos, axis=1)
+        bad = np.any(s[:, 1:] == s[:, :-1], axis=1)
+        if not bad.any():
+            return pos
+        pos[bad] = rng.integers(0, n, size=(int(bad.sum()), weight))
+
+
+def sample_errors(error_type, n, trials, rng):
+    """
+    Draw a batch of error patterns for an n-bit frame.
+    Returns ("positions", array[trials, k]) or ("burst", (starts, lengths)).
+    """
+    if error_type == "single":
+        return "positions", rng.integers(0, n, size=(trials, 1))
+    if error_type == "two_isolated":
+        first = rng.integers(0, n, size=trials)
+        second = (first + rng.integers(1, n, size=trials)) % n
+        return "positions", np.stack((first, second), axis=1)
+    if error_type == "odd":
+        return "positions", _distinct_positions(rng, n, trials, ODD_WEIGHT)
+    if error_type == "burst":
+        lengths = rng.integers(BURST_MIN, BURST_MAX + 1, size=trials)
+        starts = rng.integers(0, n - lengths + 1)
+        return "burst", (starts, lengths)
+    raise ValueError("Unknown error type: {}".format(error_type))
+
+
+# ---------------------------------------------------------------------------
+# Detection per scheme
+# ---------------------------------------------------------------------------
+
+def crc_detected(syn, pre, errors):
+    """Bool array: True where the CRC with this syndrome table catches the error."""
+    kind, data = errors
+    if kind == "burst":
+        starts, lengths = data
+        syndromes = pre[starts + lengths] ^ pre[starts]
+    else:
+        syndromes = np.bitwise_xor.reduce(syn[data], axis=1)
+    return syndromes != 0
+
+
+class ChecksumModel:
+    """
+    Per-position effect of a flip on a concrete checksum frame (packed bytes,
+    last 16 bits are the checksum, data is left padded to 16-bit words).
+    """
+
+    def __init__(self, frame):
+        bits = np.unpackbits(np.frombuffer(bytes(frame), dtype=np.uint8)).astype(np.int64)
+        n = len(bits)
+        data_bits = n - 16
+        pad = (-data_bits) % 16
+        sign = 1 - 2 * bits  # 0 -> 1 adds, 1 -> 0 subtracts
+
+        weight = np.zeros(n, dtype=np.int64)
+        p = np.arange(data_bits)
+        weight[:data_bits] = 1 << (15 - (p + pad) % 16)
+        self.data_delta = np.where(np.arange(n) < data_bits, sign * weight, 0)
+        c = np.arange(data_bits, n)
+        self.check_delta = np.zeros(n, dtype=np.int64)
+        self.check_delta[data_bits:] = sign[data_bits:] * (1 << (n - 1 - c))
+
+        self.data_pre = np.concatenate(([0], np.cumsum(self.data_delta)))
+        self.check_pre = np.concatenate(([0], np.cumsum(self.check_delta)))
+        value = int.from_bytes(bytes(frame), "big")
+        self.checksum = value & 0xFFFF
+        # one's complement sum of the data part (the checksum is its complement)
+        self.data_sum = self.checksum ^ 0xFFFF
+        self.n = n
+
+    def detected(self, errors):
+        kind, data = errors
+        if kind == "burst":
+            starts, lengths = data
+            d = self.data_pre[starts + lengths] - self.data_pre[starts]
+            c = self.check_pre[starts + lengths] - self.check_pre[starts]
+        else:
+            d = self.data_delta[data].sum(axis=1)
+            c = self.check_delta[data].sum(axis=1)
+        # new one's complement sum, mapped into 1..0xFFFF (data stays non-zero
+        # for any frame with a header, so the all-zero case cannot occur)
+        new_sum = (self.data_sum + d - 1) % 0xFFFF + 1
+        return (new_sum ^ 0xFFFF) != (self.checksum + c)
+
+
+def random_checksum_frame(n_bytes, rng):
+    """Random packed frame of n_bytes with a valid trailing checksum."""
+    data = rng.integers(0, 256, size=n_bytes - 2, dtype=np.uint8).tobytes()
+    return data + _checksum(data).to_bytes(2, "big")
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return (0.0, 1.0)
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def simulate(
+    frame_size=64,
+    trials=1_000_000,
+    error_types=ERROR_TYPES,
+    protocols=None,
+    frame=None,
+    seed=None,
+    batch=DEFAULT_BATCH,
+):
+    """
+    Monte Carlo detection rates for every protocol and error type.
+
+    frame_size is in BYTES (as in DataFrame.createFrames). The CRC results do
+    not depend on frame contents; the checksum is run against `frame` (packed
+    bytes, e.g. PackedDataFrame.serialize()) or a random valid frame.
+    The same error patterns are applied to every protocol.
+
+    Returns a list of dict rows: protocol, error_type, trials, detected,
+    undetected, rate, ci_low, ci_high.
+    """
+    protocols = list(REDUNDANT_BITS_CNT) if protocols is None else list(protocols)
+    rng = np.random.default_rng(seed)
+    n = frame_size * 8
+
+    crc_tables = {}
+    for protocol in protocols:
+        if protocol in CRC_POLY:
+            syn = syndrome_table(CRC_POLY[protocol], n)
+            crc_tables[protocol] = (syn, prefix_xor(syn))
+    checksum_model = None
+    if "checksum" in protocols:
+        checksum_model = ChecksumModel(frame if frame is not None else random_checksum_frame(frame_size, rng))
+        if checksum_model.n != n:
+            raise ValueError("frame length does not match frame_size")
+
+    rows = []
+    for error_type in error_types:
+        detected = dict.fromkeys(protocols, 0)
+        done = 0
+        while done < trials:
+            size = min(batch, trials - done)
+            errors = sample_errors(error_type, n, size, rng)
+            for protocol in protocols:
+                if protocol == "checksum":
+                    hits = checksum_model.detected(errors)
+                else:
+                    hits = crc_detected(*crc_tables[protocol], errors)
+                detected[protocol] += int(np.count_nonzero(hits))
+            done += size
+        for protocol in protocols:
+            low, high = wilson_interval(detected[protocol], trials)
+            rows.append(
+                {
+                    "protocol": protocol,
+                    "error_type": error_type,
+                    "trials": trials,
+                    "detected": detected[protocol],
+                    "undetected": trials - detected[protocol],
+                    "rate": detected[protocol] / trials if trials else 0.0,
+                    "ci_low": low,
+                    "ci_high": high,
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    for row in simulate(trials=1_000_000, seed=0):
+        print(
+            f"{row['protocol']:>8} {row['error_type']:>12}: {row['rate']:.6f} "
+            f"[{row['ci_low']:.6f}, {row['ci_high']:.6f}]  undetected={row['undetected']}"
+        )
@@ -0,0 +1,352 @@
+# benchmark.py
+"""
+Benchmarks for the encode / inject / transmit / validate hot paths.
+
+Measures throughput (ops/s and MB/s of input) and peak allocation per call
+(tracemalloc) for the redundancy functions, frame creation, error injection,
+the bit conversion helpers in utils and a loopback transfer through
+communication_handler. Results are written as JSON and can be compared with
+a stored baseline to catch regressions.
+
+Absolute rates depend on the machine and on its load at the moment, so
+each timing round of a case is followed by a round of a fixed reference (the
+bit-by-bit list CRC of the original code) and the case stores `relative`, its
+throughput as a multiple of the reference's measured alongside it. --compare
+checks these ratios, so the stored baseline applies on other machines too;
+cases missing `relative` fall back to absolute rates. On a shared or
+throttled host single cases can still move by a third between runs, so
+--compare runs the suite again (--retries times) while something is flagged
+and reports only cases that stayed below the tolerance in every run.
+Regenerate the baseline with --save-baseline after an intended speed change,
+over a few runs (--runs) so one lucky round does not set the bar.
+
+    python test/benchmark.py                          # run, print table
+    python test/benchmark.py --output bench.json      # also write JSON
+    python test/benchmark.py --save-baseline --runs 3 # refresh test/benchmark_baseline.json
+    python test/benchmark.py --compare                # exit 1 on a regression vs the baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from communication_handler import FrameListener, SenderSession
+from error_handler import calculate_checksum, calculate_crc, inject_error, verify_checksum, verify_crc
+from utils import (
+    CRC_POLY,
+    DataFrame,
+    ascii_to_bin,
+    bin_to_ascii,
+    bin_to_hex,
+    bits_to_bytes,
+    bytes_to_bits,
+    hex_to_bin,
+)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+FRAME_SIZES = [32, 64, 256, 1500]  # bytes
+INPUT_SIZES = [1024, 16 * 1024, 64 * 1024]  # bytes
+QUICK_FRAME_SIZES = [64]
+QUICK_INPUT_SIZES = [1024]
+ERROR_TYPES = ["single", "two_isolated", "odd", "burst"]
+
+ADDR = ("0" * 32, "0" * 16)
+
+
+def _reference_crc(dataword, polynomial):
+    # the baseline calculate_crc, kept verbatim as the machine-speed yardstick
+    n = len(polynomial)
+    padded_data = list(dataword + '0' * (n-1))
+    for i in range(len(dataword)):
+        if padded_data[i] == '1':
+            for j in range(n):
+                padded_data[i+j] = str(int(padded_data[i+j]) ^ int(polynomial[j]))
+    return ''.join(padded_data)[-n+1:]
+
+
+def _random_bits(n, rng):
+    return format(rng.getrandbits(n) | (1 << n), "b")[1:]
+
+
+REFERENCE_BITS = _random_bits(64 * 8, random.Random(0))
+# seconds per reference round; loops are calibrated on first use
+REFERENCE_TIME = 0.05
+_reference_loops = []
+
+
+def _reference_round():
+    # seconds for one round of the reference
+    if not _reference_loops:
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                _reference_crc(REFERENCE_BITS, CRC_POLY["crc-16"])
+            elapsed = time.perf_counter() - start
+            if elapsed >= REFERENCE_TIME:
+                break
+            loops *= 2
+        _reference_loops.append(loops)
+    loops = _reference_loops[0]
+    start = time.perf_counter()
+    for _ in range(loops):
+        _reference_crc(REFERENCE_BITS, CRC_POLY["crc-16"])
+    return loops, time.perf_counter() - start
+
+
+def measure(fn, nbytes=0, min_time=0.2, repeat=3):
+    """
+    Best-of-`repeat` throughput of fn() and its peak allocation.
+    Iterations are calibrated so one round lasts at least min_time seconds;
+    every round is paired with a reference round (see `relative`).
+    Output printed by fn (verify_crc, createFrames) is discarded.
+    """
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+            loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+        best = elapsed
+        ref_loops, ref_best = _reference_round()
+        for _ in range(repeat - 1):
+            sink.seek(0)
+            sink.truncate()
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            best = min(best, time.perf_counter() - start)
+            ref_best = min(ref_best, _reference_round()[1])
+
+    ops = loops / best
+    return {
+        "ops_per_sec": ops,
+        "mb_per_sec": ops * nbytes / 1e6 if nbytes else None,
+        "peak_alloc_bytes": peak,
+        "relative": ops / (ref_loops / ref_best),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def bench_redundancy(results, frame_sizes, rng, min_time):
+    for size in frame_sizes:
+        bits = _random_bits(size * 8, rng)
+        for name, poly in CRC_POLY.items():
+            crc = calculate_crc(bits, poly)
+            results[f"calculate_crc[{name},{size}B]"] = measure(lambda: calculate_crc(bits, poly), size, min_time)
+            results[f"verify_crc[{name},{size}B]"] = measure(lambda: verify_crc(bits + crc, poly), size, min_time)
+        checksum = calculate_checksum(bits)
+        results[f"calculate_checksum[{size}B]"] = measure(lambda: calculate_checksum(bits), size, min_time)
+        results[f"verify_checksum[{size}B]"] = measure(lambda: verify_checksum(bits + checksum), size, min_time)
+
+
+def bench_frames(results, input_sizes, rng, min_time):
+    for size in input_sizes:
+        bits = _random_bits(size * 8, rng)
+        for red in ("checksum", "crc-16", "crc-32"):
+            results[f"createFrames[{red},{size}B]"] = measure(
+                lambda: DataFrame.createFrames(bits, ADDR, ADDR, red, 64), size, min_time
+            )
+    frame = DataFrame.createFrames(_random_bits(47 * 8, rng), ADDR, ADDR, "crc-32", 64)[0]
+    results["validate[crc-32,64B]"] = measure(frame.validate, 64, min_time)
+
+
+def bench_inject(results, frame_sizes, rng, min_time):
+    for size in frame_sizes:
+        bits = _random_bits(size * 8, rng)
+        for error_type in ERROR_TYPES:
+            results[f"inject_error[{error_type},{size}B]"] = measure(
+                lambda: inject_error(bits, error_type), size, min_time
+            )
+
+
+def bench_conversions(results, input_sizes, rng, min_time):
+    for size in input_sizes:
+        raw = bytes(rng.getrandbits(8) for _ in range(size))
+        bits = bytes_to_bits(raw)
+        text = "".join(chr(rng.randrange(32, 127)) for _ in range(size))
+        text_bits = ascii_to_bin(text)
+        hex_str = raw.hex()
+        results[f"bytes_to_bits[{size}B]"] = measure(lambda: bytes_to_bits(raw), size, min_time)
+        results[f"bits_to_bytes[{size}B]"] = measure(lambda: bits_to_bytes(bits), size, min_time)
+        results[f"ascii_to_bin[{size}B]"] = measure(lambda: ascii_to_bin(text), size, min_time)
+        results[f"bin_to_ascii[{size}B]"] = measure(lambda: bin_to_ascii(text_bits), size, min_time)
+        results[f"hex_to_bin[{size}B]"] = measure(lambda: hex_to_bin(hex_str), size, min_time)
+        results[f"bin_to_hex[{size}B]"] = measure(lambda: bin_to_hex(bits), size, min_time)
+
+
+def _loopback(frames):
+    # one session over an ephemeral localhost port, receiver in a thread
+    with FrameListener(("127.0.0.1", 0)) as listener:
+        address = listener.sock.getsockname()
+        received = []
+
+        def run():
+            with listener.accept() as session:
+                for frame in session:
+                    received.append(frame)
+
+        t = threading.Thread(target=run)
+        t.start()
+        with SenderSession(address) as session:
+            for frame in frames:
+                session.send(frame)
+        t.join()
+    assert len(received) == len(frames)
+
+
+def bench_loopback(results, frame_sizes, rng, min_time, count=1000):
+    for size in frame_sizes:
+        frames = [_random_bits(size * 8, rng) for _ in range(count)]
+        stats = measure(lambda: _loopback(frames), size * count, min_time)
+        stats["frames_per_sec"] = stats["ops_per_sec"] * count
+        results[f"loopback_session[{size}B x{count}]"] = stats
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def run(quick=False, min_time=0.2, seed=1234):
+    rng = random.Random(seed)
+    frame_sizes = QUICK_FRAME_SIZES if quick else FRAME_SIZES
+    input_sizes = QUICK_INPUT_SIZES if quick else INPUT_SIZES
+    results = {}
+    # setup code prints too (createFrames, verify_crc)
+    with contextlib.redirect_stdout(io.StringIO()):
+        bench_redundancy(results, frame_sizes, rng, min_time)
+        bench_frames(results, input_sizes, rng, min_time)
+        bench_inject(results, frame_sizes, rng, min_time)
+        bench_conversions(results, input_sizes, rng, min_time)
+        bench_loopback(results, frame_sizes, rng, min_time)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def median_report(reports):
+    """One report from several runs: per case, the run with the median `relative`."""
+    results = {}
+    for name in reports[0]["results"]:
+        runs = sorted((report["results"][name] for report in reports), key=lambda r: r["relative"])
+        results[name] = runs[len(runs) // 2]
+    meta = dict(reports[0]["meta"], runs=len(reports))
+    return {"meta": meta, "results": results}
+
+
+def compare(current, baseline, tolerance):
+    """
+    Names whose throughput fell more than `tolerance` (fraction) below the
+    baseline, measured against the paired reference rounds when both have it.
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        key = "relative" if "relative" in base and "relative" in cur else "ops_per_sec"
+        ratio = cur[key] / base[key]
+        cur["baseline_ratio"] = ratio
+        if ratio < 1 - tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def print_table(report):
+    print(f"{'benchmark':<40} {'ops/s':>12} {'MB/s':>9} {'x ref':>9} {'peak alloc':>11} {'vs base':>8}")
+    for name, r in report["results"].items():
+        mb = f"{r['mb_per_sec']:.2f}" if r["mb_per_sec"] is not None else "-"
+        ratio = f"{r['baseline_ratio']:.2f}x" if "baseline_ratio" in r else ""
+        print(
+            f"{name:<40} {r['ops_per_sec']:>12.1f} {mb:>9} {r['relative']:>9.2f} "
+            f"{r['peak_alloc_bytes']:>11} {ratio:>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="only 64-byte frames and 1 KiB inputs")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing round")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown fraction")
+    parser.add_argument("--retries", type=int, default=2, help="re-runs to confirm a flagged regression")
+    parser.add_argument("--runs", type=int, default=1, help="runs of the suite, per case the median is kept")
+    args = parser.parse_args(argv)
+
+    report = median_report([run(quick=args.quick, min_time=args.min_time) for _ in range(max(1, args.runs))])
+
+    regressions = []
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            # a flagged case counts only if it is slow again; keep its best run
+            rerun = run(quick=args.quick, min_time=args.min_time)
+            compare(rerun, baseline, args.tolerance)
+            flagged = [name for name, _ in regressions]
+            for name in flagged:
+                if rerun["results"][name]["baseline_ratio"] > report["results"][name]["baseline_ratio"]:
+                    report["results"][name] = rerun["results"][name]
+            regressions = [
+                (name, report["results"][name]["baseline_ratio"])
+                for name in flagged
+                if report["results"][name]["baseline_ratio"] < 1 - args.tolerance
+            ]
+
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print("Baseline saved to", args.baseline)
+
+    if regressions:
+        print("\nRegressions:")
+        for name, ratio in regressions:
+            print(f"  {name}: {ratio:.2f}x of baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
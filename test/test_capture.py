@@ -0,0 +1,95 @@
+# test_capture.py
+"""
+Capture records keep any number of error positions (u32 count, format
+version 2), version 1 files are still read and appended to, and replaying
+a capture reports stats without per-frame prints.
+
+    python -m pytest test/test_capture.py      (or: python test/test_capture.py)
+"""
+import contextlib
+import io
+import os
+import random
+import struct
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import FILE_HEADER, MAGIC, RECEIVED, SENT, CaptureReader, CaptureWriter
+from custom_error_injector import flip_bitstring
+from replay import replay
+from utils import DataFrame, PackedDataFrame
+
+
+def _frame(nbits, seed):
+    bits = format(random.Random(seed).getrandbits(nbits) | 1 << nbits, "b")[1:]
+    return PackedDataFrame.fromBitString(bits)
+
+
+def test_more_than_65535_positions():
+    frame = _frame(100_000, 1)
+    positions = list(range(70_000))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.ecap")
+        with CaptureWriter(path) as writer:
+            writer.write(frame, SENT, "custom", positions, timestamp=1.0)
+            writer.write(_frame(40, 2), RECEIVED, "single", [3], timestamp=2.0)
+        os.remove(path + ".idx")  # rebuilt by a scan
+        with CaptureReader(path) as reader:
+            assert reader.version == 2
+            assert len(reader) == 2
+            assert reader[0].error_positions == positions
+            assert reader[0].frame.toBitString() == frame.toBitString()
+            assert reader[1].error_positions == [3]
+            assert reader[1].timestamp == 2.0
+
+
+def test_version_1_files_are_read_and_appended():
+    frame = _frame(200, 3)
+    data = bytes(frame.serialize())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "old.ecap")
+        with open(path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, 1, 0, 0.0))
+            f.write(struct.pack("!dBBHI", 1.0, SENT, 1, 1, frame.nbits))
+            f.write(struct.pack("!I", 7))
+            f.write(data)
+        with CaptureWriter(path, append=True) as writer:
+            writer.write(frame, RECEIVED, "two_isolated", [1, 9], timestamp=2.0)
+            try:
+                writer.write(frame, RECEIVED, "custom", list(range(70_000)))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("a version 1 record holds at most 65535 positions")
+        with CaptureReader(path) as reader:
+            assert reader.version == 1
+            records = list(reader)
+        assert [r.error_positions for r in records] == [[7], [1, 9]]
+        assert [r.error_type for r in records] == ["single", "two_isolated"]
+        assert all(bytes(r.frame.serialize()) == data for r in records)
+
+
+def test_replay_prints_nothing_per_frame():
+    addr = ("0" * 32, "0" * 16)
+    frames = DataFrame.createFrames("10" * 3000, addr, addr, "crc-16", 64, verbose=False)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.ecap")
+        with CaptureWriter(path) as writer:
+            for frame in frames:
+                writer.write(frame)
+            writer.write(flip_bitstring(frames[0].serialize(), [200]), RECEIVED, "single", [200])
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            stats = replay(path)
+    assert out.getvalue() == ""
+    assert (stats["frames"], stats["valid"], stats["detected"]) == (len(frames) + 1, len(frames), 1)
+
+
+if __name__ == "__main__":
+    test_more_than_65535_positions()
+    test_version_1_files_are_read_and_appended()
+    test_replay_prints_nothing_per_frame()
+    print("ok")
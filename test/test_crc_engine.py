@@ -0,0 +1,117 @@
+# test_crc_engine.py
+"""
+The table-driven CRC engine against the original long division, for every
+polynomial in CRC_POLY and several slice counts, including crc-10 whose
+register is shifted to a byte boundary.
+
+    python -m pytest test/test_crc_engine.py      (or: python test/test_crc_engine.py)
+"""
+import os
+import random
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crc_engine import CRCEngine, get_engine
+from utils import CRC_POLY
+
+SLICES = [1, 2, 4, 8]
+# bit lengths around byte and slice boundaries
+LENGTHS = [0, 1, 7, 8, 9, 10, 15, 16, 17, 31, 32, 33, 63, 64, 65, 100, 257, 1024]
+
+
+def _long_division(dataword, polynomial):
+    # calculate_crc before the engine, bit by bit
+    n = len(polynomial)
+    padded_data = list(dataword + '0' * (n-1))
+    for i in range(len(dataword)):
+        if padded_data[i] == '1':
+            for j in range(n):
+                padded_data[i+j] = str(int(padded_data[i+j]) ^ int(polynomial[j]))
+    return ''.join(padded_data)[-n+1:]
+
+
+def _bits(n, rng):
+    return format(rng.getrandbits(n) | 1 << n, "b")[1:]
+
+
+def test_bitstrings_match_long_division():
+    rng = random.Random(1)
+    for name, poly in CRC_POLY.items():
+        for slices in SLICES:
+            engine = CRCEngine(poly, slices)
+            for n in LENGTHS:
+                bits = _bits(n, rng)
+                assert engine.compute_bitstring(bits) == _long_division(bits, poly), (name, slices, n)
+
+
+def test_bytes_match_long_division():
+    rng = random.Random(2)
+    for name, poly in CRC_POLY.items():
+        for slices in SLICES:
+            engine = CRCEngine(poly, slices)
+            for size in range(0, 40):
+                data = bytes(rng.getrandbits(8) for _ in range(size))
+                bits = "".join(format(b, "08b") for b in data)
+                expected = int(_long_division(bits, poly) or "0", 2)
+                assert engine.compute(data) == expected, (name, slices, size)
+
+
+def test_update_resumes_across_pieces():
+    rng = random.Random(3)
+    for name, poly in CRC_POLY.items():
+        engine = get_engine(poly)
+        bits = _bits(517, rng)
+        expected = int(_long_division(bits, poly), 2)
+        for cut in (1, 5, 8, 13, 96, 120, 300):
+            crc = engine.update_bitstring(0, bits[:cut])
+            assert engine.update_bitstring(crc, bits[cut:]) == expected, (name, cut)
+            # cached header prefix + the rest as an int
+            crc = engine.prefix(int(bits[:cut], 2), cut)
+            assert engine.update_int(crc, int(bits[cut:], 2), len(bits) - cut) == expected, (name, cut)
+
+
+def test_combine():
+    rng = random.Random(4)
+    for name, poly in CRC_POLY.items():
+        engine = get_engine(poly)
+        for len_a, len_b in ((0, 9), (8, 0), (13, 64), (120, 7), (333, 1000)):
+            a, b = _bits(len_a, rng), _bits(len_b, rng)
+            crc_a = engine.update_bitstring(0, a)
+            crc_b = engine.update_bitstring(0, b)
+            assert engine.combine(crc_a, crc_b, len_b) == int(_long_division(a + b, poly), 2), (name, len_a, len_b)
+
+
+def test_crc10_register_alignment():
+    engine = get_engine(CRC_POLY["crc-10"])
+    assert engine.width == 10
+    assert engine.mask == 0x3FF
+    for crc in (0, 1, 0x155, 0x3FF):
+        reg = engine.register(crc)
+        assert reg < 1 << 16 and reg & 0x3F == 0
+        assert engine.value(reg) == crc
+    # every single set bit, so each table entry's alignment shows up
+    for n in (1, 8, 16, 24):
+        for i in range(n):
+            bits = "0" * i + "1" + "0" * (n - i - 1)
+            assert engine.compute_bitstring(bits) == _long_division(bits, CRC_POLY["crc-10"]), (n, i)
+
+
+def test_codeword_leaves_zero_remainder():
+    rng = random.Random(5)
+    for name, poly in CRC_POLY.items():
+        engine = get_engine(poly)
+        for n in (1, 10, 64, 250):
+            bits = _bits(n, rng)
+            assert engine.update_bitstring(0, bits + engine.compute_bitstring(bits)) == 0, (name, n)
+
+
+if __name__ == "__main__":
+    test_bitstrings_match_long_division()
+    test_bytes_match_long_division()
+    test_update_resumes_across_pieces()
+    test_combine()
+    test_crc10_register_alignment()
+    test_codeword_leaves_zero_remainder()
+    print("ok")
@@ -0,0 +1,155 @@
+# test_error_injector.py
+"""
+Channel models and ErrorInjector of custom_error_injector: seeded runs
+reproduce, and each model flips bits at the rate it promises.
+
+    python -m pytest test/test_error_injector.py
+"""
+import os
+import random
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_error_injector import (
+    BSC,
+    BURST_MAX,
+    BURST_MIN,
+    Burst,
+    ErrorInjector,
+    FixedWeight,
+    GilbertElliott,
+    flip_bitstring,
+)
+from error_handler import inject_error
+from utils import bits_to_bytes
+
+
+def _models():
+    # factories: GilbertElliott keeps its channel state, so injectors must not share one
+    return [
+        lambda: BSC(0.01),
+        lambda: GilbertElliott(0.01, 0.1),
+        lambda: FixedWeight(3),
+        lambda: Burst(),
+        lambda: "single",
+        lambda: "burst",
+    ]
+
+
+def _bits(n, seed):
+    return format(random.Random(seed).getrandbits(n) | 1 << n, "b")[1:]
+
+
+def test_gilbert_elliott_runs_cover_the_batch():
+    model = GilbertElliott(p_gb=0.01, p_bg=0.1)
+    rng = np.random.default_rng(3)
+    for total in (1, 7, 1000, 4096):
+        for _ in range(50):
+            starts, lengths, states = model._runs(rng, total)
+            assert starts[0] == 0
+            assert (lengths > 0).all()
+            # contiguous, and the last run ends exactly at `total`
+            assert (starts[1:] == starts[:-1] + lengths[:-1]).all()
+            assert starts[-1] + lengths[-1] == total
+            # runs alternate between the two states
+            assert (states[1:] != states[:-1]).all()
+
+
+def test_gilbert_elliott_ber_matches_stationary_probability():
+    # one frame per batch, so the end of every batch is the end of the frame
+    model = GilbertElliott(p_gb=0.01, p_bg=0.05, ber_good=0.0, ber_bad=0.5)
+    rng = np.random.default_rng(5)
+    n, frames = 512, 20000
+    counts = np.zeros(n)
+    for _ in range(frames):
+        counts += np.bincount(model.sample(rng, n, 1).positions, minlength=n)
+    per_bit = counts / frames
+    expected = model.average_ber()
+    assert abs(per_bit.mean() - expected) < 0.05 * expected
+    # no part of the frame is favoured, in particular not its tail
+    quarter = n // 4
+    for q in range(4):
+        assert abs(per_bit[q * quarter : (q + 1) * quarter].mean() - expected) < 0.05 * expected
+
+
+def test_same_seed_same_errors():
+    bits = _bits(800, 1)
+    for model in _models():
+        a, b = ErrorInjector(model(), seed=42), ErrorInjector(model(), seed=42)
+        for _ in range(20):
+            corrupted_a, pos_a = a.inject(bits)
+            corrupted_b, pos_b = b.inject(bits)
+            assert corrupted_a == corrupted_b
+            assert (pos_a == pos_b).all()
+        frames_a = np.zeros((50, 100), dtype=np.uint8)
+        frames_b = np.zeros((50, 100), dtype=np.uint8)
+        a.injectBatch(frames_a)
+        b.injectBatch(frames_b)
+        assert (frames_a == frames_b).all()
+    # different seeds give different errors
+    a, b = ErrorInjector(BSC(0.01), seed=1), ErrorInjector(BSC(0.01), seed=2)
+    assert not np.array_equal(a.sample(8000).positions, b.sample(8000).positions)
+
+
+def test_string_and_packed_frames_get_the_same_flips():
+    bits = _bits(203, 2)
+    for model in _models():
+        corrupted, pos = ErrorInjector(model(), seed=9).inject(bits)
+        packed, pos_packed = ErrorInjector(model(), seed=9).inject(bits_to_bytes(bits), nbits=len(bits))
+        assert (pos == pos_packed).all()
+        assert bytes(packed) == bits_to_bytes(corrupted)
+        assert corrupted == flip_bitstring(bits, pos)
+
+
+def test_bsc_error_rate():
+    for ber in (1e-4, 1e-2, 0.3):
+        batch = ErrorInjector(BSC(ber), seed=3).sample(1000, 2000)
+        total = 1000 * 2000
+        expected = total * ber
+        # within 5 standard deviations of the binomial count
+        assert abs(len(batch.positions) - expected) < 5 * np.sqrt(expected * (1 - ber))
+        assert len(np.unique(batch.positions + batch.rows() * 1000)) == len(batch.positions)
+        assert ((batch.positions >= 0) & (batch.positions < 1000)).all()
+
+
+def test_fixed_weight_flips_exactly_k_distinct_bits():
+    for weight in (0, 1, 2, 3, 16):
+        batch = ErrorInjector(FixedWeight(weight), seed=4).sample(64, 3000)
+        assert (batch.counts() == weight).all()
+        for i in range(0, 3000, 97):
+            row = batch[i]
+            assert len(np.unique(row)) == weight
+            assert ((row >= 0) & (row < 64)).all()
+
+
+def test_burst_is_one_solid_run():
+    batch = ErrorInjector(Burst(), seed=5).sample(64, 5000)
+    counts = batch.counts()
+    assert counts.min() == BURST_MIN and counts.max() == BURST_MAX
+    assert abs(counts.mean() - (BURST_MIN + BURST_MAX) / 2) < 0.1
+    for i in range(0, 5000, 83):
+        row = batch[i]
+        assert (np.diff(row) == 1).all()
+        assert row[0] >= 0 and row[-1] < 64
+
+
+def test_inject_error_positions_match_the_flips():
+    weights = {"single": 1, "two_isolated": 2, "odd": 3}
+    bits = _bits(512, 6)
+    for error_type in ("single", "two_isolated", "odd", "burst"):
+        for _ in range(200):
+            corrupted, positions = inject_error(bits, error_type)
+            diff = [i for i, (x, y) in enumerate(zip(bits, corrupted)) if x != y]
+            assert diff == positions
+            if error_type == "burst":
+                assert BURST_MIN <= len(positions) <= BURST_MAX
+                assert positions == list(range(positions[0], positions[0] + len(positions)))
+            else:
+                assert len(positions) == weights[error_type]
+    # with an injector the seed decides
+    runs = [inject_error(bits, injector=ErrorInjector("odd", seed=8)) for _ in range(2)]
+    assert runs[0] == runs[1]
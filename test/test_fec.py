@@ -0,0 +1,68 @@
+# test_fec.py
+"""
+Every single-bit error of a hamming and an rs frame is corrected, including
+flips in the redundancy code field, for bit-string and packed frames.
+
+    python -m pytest test/test_fec.py      (or: python test/test_fec.py)
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_error_injector import flip_bitstring
+from utils import OFF_DATA, OFF_RED_CODE, DataFrame, PackedDataFrame
+
+ADDR = ("0" * 31 + "1", "0" * 15 + "1")
+FRAME_SIZE = 32  # bytes
+
+
+def _frame(redundant_bits_type):
+    bits = format(random.Random(7).getrandbits(80) | 1 << 80, "b")[1:]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DataFrame.createFrames(bits, ADDR, ADDR, redundant_bits_type, FRAME_SIZE)[0]
+
+
+def _check_single_flips(redundant_bits_type):
+    frame = _frame(redundant_bits_type)
+    original = frame.serialize()
+    payload = frame.getData()
+    failures = []
+    for pos in range(len(original)):
+        corrupted = flip_bitstring(original, [pos])
+        df = DataFrame(corrupted)
+        packed = PackedDataFrame.fromBitString(corrupted)
+        if not (df.validate() and df.getData() == payload and df.serialize() == original):
+            failures.append(("DataFrame", pos))
+        if not (packed.validate() and packed.getDataBits() == payload and packed.toBitString() == original):
+            failures.append(("PackedDataFrame", pos))
+    assert not failures, failures
+
+
+def test_hamming_single_flips():
+    _check_single_flips("hamming")
+
+
+def test_rs_single_flips():
+    _check_single_flips("rs")
+
+
+def test_code_field_flip_of_detection_frame_is_not_decoded():
+    # one flip in a crc-16 code field must not reach an FEC decoder
+    original = _frame("crc-16").serialize()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for pos in range(OFF_RED_CODE, OFF_DATA):
+            corrupted = flip_bitstring(original, [pos])
+            assert not DataFrame(corrupted).validate()
+            assert not PackedDataFrame.fromBitString(corrupted).validate()
+
+
+if __name__ == "__main__":
+    test_hamming_single_flips()
+    test_rs_single_flips()
+    test_code_field_flip_of_detection_frame_is_not_decoded()
+    print("All single-bit FEC cases corrected")
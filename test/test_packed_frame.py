@@ -0,0 +1,84 @@
+# test_packed_frame.py
+"""
+PackedDataFrame builds the same bits as the bit-string DataFrame for every
+redundancy type, and its field getters, payload and validation agree.
+
+    python -m pytest test/test_packed_frame.py      (or: python test/test_packed_frame.py)
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_error_injector import flip_bitstring
+from utils import REDUNDANT_BIT_CODE, DataFrame, PackedDataFrame, bytes_to_bits
+
+ADDR_BITS = ("11000000101010000000000100000010", "0001111110010000")  # 192.168.1.2:8080
+ADDR_INTS = (int(ADDR_BITS[0], 2), int(ADDR_BITS[1], 2))
+FRAME_SIZES = [32, 64, 100]  # bytes
+DATA_SIZES = [0, 1, 17, 47, 300]  # bytes
+
+
+def _pairs(redundant_bits_type, data, frame_size):
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = DataFrame.createFrames(bytes_to_bits(data), ADDR_BITS, ADDR_BITS, redundant_bits_type, frame_size)
+    packed = PackedDataFrame.createFrames(data, ADDR_INTS, ADDR_INTS, redundant_bits_type, frame_size)
+    assert len(packed) == len(frames)
+    return zip(frames, packed)
+
+
+def test_frames_are_bit_identical():
+    rng = random.Random(1)
+    for redundant_bits_type in REDUNDANT_BIT_CODE:
+        for frame_size in FRAME_SIZES:
+            for size in DATA_SIZES:
+                data = bytes(rng.getrandbits(8) for _ in range(size))
+                for frame, packed in _pairs(redundant_bits_type, data, frame_size):
+                    assert packed.toBitString() == frame.serialize(), (redundant_bits_type, frame_size, size)
+                    assert packed.nbits == len(frame.serialize())
+
+
+def test_fields_and_payload_agree():
+    rng = random.Random(2)
+    data = bytes(rng.getrandbits(8) for _ in range(300))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for redundant_bits_type in REDUNDANT_BIT_CODE:
+            payload = ""
+            for frame, packed in _pairs(redundant_bits_type, data, 64):
+                assert packed.getSenderAddr() == ADDR_INTS
+                assert packed.getReceiverAddr() == ADDR_INTS
+                assert packed.getDatawordLen() == frame.getDatawordLen()
+                assert packed.getRedundantBitType() == frame.getRedundantBitType() == redundant_bits_type
+                assert packed.isLast() == frame.isLast()
+                assert packed.getDataBits() == frame.getData()
+                assert packed.validate() and frame.validate()
+                # crc-10 payloads are not whole bytes, so join them as bits
+                payload += packed.getDataBits()
+            assert payload == bytes_to_bits(data), redundant_bits_type
+
+
+def test_bitstring_round_trip_and_validation_agree():
+    rng = random.Random(3)
+    data = bytes(rng.getrandbits(8) for _ in range(47))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for redundant_bits_type in REDUNDANT_BIT_CODE:
+            frame = DataFrame.createFrames(bytes_to_bits(data), ADDR_BITS, ADDR_BITS, redundant_bits_type, 64)[0]
+            bits = frame.serialize()
+            assert PackedDataFrame.fromBitString(bits).toBitString() == bits
+            assert PackedDataFrame.fromDataFrame(frame).toDataFrame().serialize() == bits
+            for _ in range(20):
+                positions = sorted(rng.sample(range(len(bits)), rng.randint(1, 4)))
+                corrupted = flip_bitstring(bits, positions)
+                expected = DataFrame(corrupted).validate()
+                assert PackedDataFrame.fromBitString(corrupted).validate() == expected, (redundant_bits_type, positions)
+
+
+if __name__ == "__main__":
+    test_frames_are_bit_identical()
+    test_fields_and_payload_agree()
+    test_bitstring_round_trip_and_validation_agree()
+    print("ok")
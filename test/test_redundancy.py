@@ -0,0 +1,116 @@
+# test_redundancy.py
+"""
+The incremental CRC / checksum objects of redundancy.py give the same value
+as calculate_crc / calculate_checksum on the whole input, however it is
+split, and combine() merges independently computed segments exactly.
+
+    python -m pytest test/test_redundancy.py      (or: python test/test_redundancy.py)
+"""
+import os
+import random
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redundancy
+from error_handler import calculate_checksum, calculate_crc
+from utils import CRC_POLY, FEC_TYPES, REDUNDANT_BIT_TYPE, bytes_to_bits
+
+NAMES = list(CRC_POLY) + ["checksum"]
+
+
+def _expected(name, data):
+    bits = bytes_to_bits(data)
+    if name == "checksum":
+        return calculate_checksum(bits)
+    return calculate_crc(bits, CRC_POLY[name])
+
+
+def _samples(rng):
+    yield b""
+    yield bytes(5)  # all zero
+    yield b"\xff" * 2
+    for size in (1, 2, 3, 16, 17, 100, 1000):
+        yield bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def test_split_updates_match_whole_input():
+    rng = random.Random(1)
+    for name in NAMES:
+        for data in _samples(rng):
+            h = redundancy.new(name)
+            i = 0
+            while i < len(data):
+                step = rng.randint(1, 40)
+                h.update(data[i : i + step])
+                i += step
+            assert h.bitdigest() == _expected(name, data), (name, len(data))
+            assert redundancy.new(name, data).bitdigest() == _expected(name, data)
+            assert int.from_bytes(h.digest(), "big") == h.value
+            assert h.nbits == len(data) * 8
+
+
+def test_bits_and_bytes_can_be_mixed():
+    rng = random.Random(2)
+    for name in NAMES:
+        data = bytes(rng.getrandbits(8) for _ in range(64))
+        bits = bytes_to_bits(data)
+        h = redundancy.new(name)
+        h.update_bits(bits[:13])
+        h.update_bits(bits[13:40])
+        h.update(data[5:9])
+        h.update_bits(bits[72:])
+        assert h.bitdigest() == _expected(name, data), name
+
+
+def test_copy_is_independent():
+    for name in NAMES:
+        h = redundancy.new(name, b"shared prefix")
+        c = h.copy()
+        h.update(b" one")
+        c.update(b" two")
+        assert h.bitdigest() == _expected(name, b"shared prefix one")
+        assert c.bitdigest() == _expected(name, b"shared prefix two")
+
+
+def test_combine_matches_concatenation():
+    rng = random.Random(3)
+    for name in NAMES:
+        samples = list(_samples(rng))
+        for a in samples:
+            for b in samples:
+                value_a = redundancy.new(name, a).value
+                value_b = redundancy.new(name, b).value
+                combined = redundancy.combine(name, value_a, value_b, len(b))
+                assert combined == int(_expected(name, a + b), 2), (name, len(a), len(b))
+
+
+def test_new_accepts_codes_and_rejects_fec():
+    for code, name in REDUNDANT_BIT_TYPE.items():
+        if name in FEC_TYPES:
+            for key in (code, name):
+                try:
+                    redundancy.new(key)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError("{} has no incremental check".format(key))
+        else:
+            assert redundancy.new(code).name == name
+    for bad in ("crc-7", 99):
+        try:
+            redundancy.new(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("{} is not a redundancy type".format(bad))
+
+
+if __name__ == "__main__":
+    test_split_updates_match_whole_input()
+    test_bits_and_bytes_can_be_mixed()
+    test_copy_is_independent()
+    test_combine_matches_concatenation()
+    test_new_accepts_codes_and_rejects_fec()
+    print("ok")
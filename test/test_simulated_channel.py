@@ -0,0 +1,71 @@
+# test_simulated_channel.py
+"""
+Packed receiver sessions of SimulatedChannel: frames come out as
+(view, nbits) like a packed socket session, so receiver(channel=...,
+packed=True) works.
+
+    python -m pytest test/test_simulated_channel.py      (or: python test/test_simulated_channel.py)
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from receiver import receiver
+from sender import sendFileStreaming
+from simulated_channel import SimulatedChannel
+from utils import DataFrame, PackedDataFrame, bytes_to_bits
+
+ADDR = ("0" * 31 + "1", "0" * 15 + "1")
+
+
+def test_packed_session_returns_view_and_nbits():
+    data = bytes(random.Random(1).getrandbits(8) for _ in range(200))
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = DataFrame.createFrames(bytes_to_bits(data), ADDR, ADDR, "crc-10", 64)
+    channel = SimulatedChannel()
+    session = channel.accept(packed=True)
+    sending = channel.connect()
+    for i, frame in enumerate(frames):
+        # bit-strings and their ASCII bytes both arrive packed
+        sending.send(frame.serialize() if i % 2 else frame.serialize().encode())
+    sending.close()
+    received = list(session)
+    assert len(received) == len(frames)
+    for (view, nbits), frame in zip(received, frames):
+        packed = PackedDataFrame(view, nbits)
+        assert nbits == len(frame.serialize())
+        assert packed.toBitString() == frame.serialize()
+        assert packed.validate()
+
+
+def test_packed_receiver_over_channel():
+    data = bytes(random.Random(2).getrandbits(8) for _ in range(3000))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open("input.bin", "wb") as f:
+                f.write(data)
+            channel = SimulatedChannel(seed=1)
+            with contextlib.redirect_stdout(io.StringIO()):
+                receiving = threading.Thread(target=receiver, kwargs={"channel": channel, "packed": True})
+                receiving.start()
+                sendFileStreaming("input.bin", binary=True, channel=channel)
+                receiving.join()
+            with open("receiver.bin", "rb") as f:
+                assert f.read() == data
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_packed_session_returns_view_and_nbits()
+    test_packed_receiver_over_channel()
+    print("ok")
@@ -1,6 +1,11 @@
 # utils.py  -- use this exact file (sender_port is 2 bytes / 16 bits)
 
 from error_handler import calculate_crc, verify_crc , calculate_checksum,verify_checksum
+from error_handler import ones_complement_sum, verify_crc_bytes, verify_checksum_bytes
+from crc_engine import get_engine
+from fec import FEC_TYPES
+import fec
+import metrics
 
 # --- Field widths (bits) ---
 SENDER_IP_LEN = 32
@@ -22,13 +27,20 @@ OFF_RED_CODE = OFF_ISLAST + ISLAST_LEN
 OFF_DATA = OFF_RED_CODE + REDUNDANT_CODE_LEN
 
 # --- Redundancy definitions (CRC polynomials and bit lengths are in BITS) ---
-REDUNDANT_BIT_TYPE = {0: "checksum", 1: "crc-8", 2: "crc-10", 3: "crc-16", 4: "crc-32"}
+REDUNDANT_BIT_TYPE = {
+    0: "checksum", 1: "crc-8", 2: "crc-10", 3: "crc-16", 4: "crc-32", 0b1110000: "hamming", 0b1001111: "rs"
+}
 REDUNDANT_BIT_CODE = {
     "checksum": "0000000",
     "crc-8": "0000001",
     "crc-10": "0000010",
     "crc-16": "0000011",
     "crc-32": "0000100",
+    # forward error correction (fec.py), validate() corrects the frame in place.
+    # At Hamming distance >= 3 from every other code, so a code field with one
+    # flipped bit still selects the decoder (FEC_CODE_NEAREST)
+    "hamming": "1110000",
+    "rs": "1001111",
 }
 CRC_POLY = {
     "crc-8": "111010101",
@@ -44,6 +56,23 @@ REDUNDANT_BITS_CNT = {
     "crc-32": 32,
     "checksum": 16,
 }
+# redundancy code field value (int) -> redundancy type, used by packed frames
+REDUNDANT_CODE_TO_TYPE = {int(v, 2): k for k, v in REDUNDANT_BIT_CODE.items()}
+# code field value within one bit flip of an FEC code -> FEC type
+FEC_CODE_NEAREST = {
+    int(REDUNDANT_BIT_CODE[t], 2) ^ flip: t for t in FEC_TYPES for flip in [0] + [1 << k for k in range(REDUNDANT_CODE_LEN)]
+}
+
+
+def redundancy_len(redundant_bits_type, frame_bits):
+    """
+    Bits of a frame_bits frame not available to header + payload. Fixed for
+    the detection codes (REDUNDANT_BITS_CNT); for FEC types it grows with the
+    frame and includes any bytes the codeword leaves unused.
+    """
+    if redundant_bits_type in FEC_TYPES:
+        return frame_bits - fec.message_bits(redundant_bits_type, frame_bits)
+    return REDUNDANT_BITS_CNT[redundant_bits_type]
 
 
 class DataFrame:
@@ -77,8 +106,15 @@ class DataFrame:
                 + data
                 + "0" * padding
             )
-            # append CRC computed over the entire frame so far
-            self.data += calculate_crc(self.data, CRC_POLY[redundant_bit_type])
+            # append CRC (or checksum / FEC parity) computed over the entire frame so far
+            if redundant_bit_type in FEC_TYPES:
+                # FEC codewords are whole bytes
+                self.data += "0" * ((-len(self.data)) % 8)
+                self.data += fec.encode_bits(redundant_bit_type, self.data)
+            elif redundant_bit_type == "checksum":
+                self.data += calculate_checksum(self.data)
+            else:
+                self.data += _frame_crc(self.data, CRC_POLY[redundant_bit_type])
 
     def getSenderAddr(self):
         # return (sender-ip, sender-port) as bit-strings
@@ -108,25 +144,58 @@ class DataFrame:
         end = start + self.getDatawordLen()
         return self.data[start:end]
 
-    def validate(self):
+    def validate(self, verbose=True):
+        # verbose=False drops the per-frame remainder / warning prints
+        with metrics.timer("validate"):
+            valid = self._validate(verbose)
+        metrics.count("frames_valid" if valid else "frames_invalid")
+        return valid
+
+    def _validate(self, verbose=True):
         redundant_bit_type = self.getRedundantBitType()
+        code_str = self.data[OFF_RED_CODE:OFF_DATA]
+        if redundant_bit_type == "unknown" and len(code_str) == REDUNDANT_CODE_LEN:
+            # the decoder repairs the code field along with the rest of the frame
+            redundant_bit_type = FEC_CODE_NEAREST.get(int(code_str, 2), "unknown")
+        if redundant_bit_type in FEC_TYPES:
+            if len(self.data) % 8:
+                return False
+            corrected, count = fec.decode_bits(redundant_bit_type, self.data)
+            if corrected is None:
+                return False
+            if count:
+                # repaired in place: getData() now returns the corrected payload
+                self.data = corrected
+                metrics.count("fec_corrected", count)
+            return True
         if redundant_bit_type == "checksum":
             return verify_checksum(self.data)
         else:
             # Handle unknown redundancy types safely
             if redundant_bit_type not in CRC_POLY:
-                print(f"Warning: Unknown redundancy type '{redundant_bit_type}'. Validation failed.")
+                if verbose:
+                    print(f"Warning: Unknown redundancy type '{redundant_bit_type}'. Validation failed.")
                 return False
             polynomial = CRC_POLY[redundant_bit_type]
-            return verify_crc(self.data, polynomial)
+            return verify_crc(self.data, polynomial, verbose)
 
     @classmethod
     def createFrames(
-        cls, data2send, sender_addr, receiver_addr, redundant_bits_type="crc-16", frame_size=64
+        cls, data2send, sender_addr, receiver_addr, redundant_bits_type="crc-16", frame_size=64, verbose=True
     ):
         """
         Create frames respecting bit-field header widths.
         frame_size is in BYTES (typical 64). All internal arithmetic is in BITS.
+        verbose=False skips the per-frame field lengths printed while building.
+        """
+        return list(cls.iterFrames(data2send, sender_addr, receiver_addr, redundant_bits_type, frame_size, verbose))
+
+    @classmethod
+    def iterFrames(
+        cls, data2send, sender_addr, receiver_addr, redundant_bits_type="crc-16", frame_size=64, verbose=True
+    ):
+        """
+        Generator version of createFrames: yields each frame as soon as it is built.
         """
         # compute header size in BITS explicitly
         header_bits = (
@@ -140,7 +209,7 @@ class DataFrame:
         )
 
         # CRC bits for chosen redundancy
-        crc_bits = REDUNDANT_BITS_CNT[redundant_bits_type]
+        crc_bits = redundancy_len(redundant_bits_type, frame_size * 8)
 
         # available payload bits per frame
         chunk_size = frame_size * 8 - header_bits - crc_bits
@@ -149,26 +218,27 @@ class DataFrame:
 
         sender_ip, sender_port = sender_addr
         receiver_ip, receiver_port = receiver_addr
-        frames = []
         for i in range(0, len(data2send), chunk_size):
+            started = metrics.start()
             chunk = data2send[i : i + chunk_size]
             padding = "0" * (chunk_size - len(chunk))
             isLast = "0" if i + chunk_size < len(data2send) else "1"
-            print("isLast : ", isLast)
-            print(
-                "sender_ip_len : ",
-                len(sender_ip),
-                "receiver_ip_len : ",
-                len(receiver_ip),
-                "sender_port_len : ",
-                len(sender_port),
-                "receiver_port_len : ",
-                len(receiver_port),
-                "data_len : ",
-                len(chunk),
-                "padding_len : ",
-                len(padding),
-            )
+            if verbose:
+                print("isLast : ", isLast)
+                print(
+                    "sender_ip_len : ",
+                    len(sender_ip),
+                    "receiver_ip_len : ",
+                    len(receiver_ip),
+                    "sender_port_len : ",
+                    len(sender_port),
+                    "receiver_port_len : ",
+                    len(receiver_port),
+                    "data_len : ",
+                    len(chunk),
+                    "padding_len : ",
+                    len(padding),
+                )
             # encode length in binary with DATA_LEN_LEN bits
             data_len_field = format(len(chunk), "0{}b".format(DATA_LEN_LEN))
             data = (
@@ -182,13 +252,239 @@ class DataFrame:
                 + chunk
                 + padding
             )
-            if redundant_bits_type == "checksum":
-                data += calculate_checksum(data)
-            else:
-                data += calculate_crc(data, CRC_POLY[redundant_bits_type])
-            print("length : ", len(data))  # printed length is in bits
-            frames.append(cls(data))
-        return frames
+            with metrics.timer("redundancy"):
+                if redundant_bits_type in FEC_TYPES:
+                    data += fec.encode_bits(redundant_bits_type, data)
+                elif redundant_bits_type == "checksum":
+                    data += calculate_checksum(data)
+                else:
+                    data += _frame_crc(data, CRC_POLY[redundant_bits_type])
+            if verbose:
+                print("length : ", len(data))  # printed length is in bits
+            frame = cls(data)
+            metrics.stop("frame_build", started)
+            metrics.count("frames_built")
+            yield frame
+
+
+def _frame_crc(bits, polynomial):
+    # CRC of a bit-string frame, resumed from the cached register after the
+    # address fields (the part of the header every frame of a transfer shares)
+    engine = get_engine(polynomial)
+    if len(bits) < OFF_DATA_LEN:
+        return calculate_crc(bits, polynomial)
+    crc = engine.prefix(int(bits[:OFF_DATA_LEN], 2), OFF_DATA_LEN)
+    return format(engine.update_bitstring(crc, bits[OFF_DATA_LEN:]), "0{}b".format(engine.width))
+
+
+def _addr_field(value):
+    # address fields may be given as bit-strings (like DataFrame) or ints
+    return int(value, 2) if isinstance(value, str) else int(value)
+
+
+class PackedDataFrame:
+    """
+    Compact frame with the same bit layout as DataFrame (OFF_* offsets),
+    stored packed 8 bits per byte instead of one '0'/'1' char per bit.
+    buf may be a bytes/bytearray/memoryview; it is kept as-is (no copy).
+    nbits is the frame length in bits, the last byte is zero padded on the right.
+    """
+
+    __slots__ = ("buf", "nbits")
+
+    def __init__(self, buf=b"", nbits=None):
+        self.buf = buf if isinstance(buf, (bytearray, memoryview)) else bytearray(buf)
+        self.nbits = len(self.buf) * 8 if nbits is None else nbits
+
+    # --- bit-level access ---------------------------------------------------
+    def getField(self, offset, width):
+        # read `width` bits starting at bit `offset` as an unsigned int
+        start = offset >> 3
+        end = (offset + width + 7) >> 3
+        chunk = int.from_bytes(self.buf[start:end], "big")
+        return (chunk >> ((end << 3) - offset - width)) & ((1 << width) - 1)
+
+    def getSenderAddr(self):
+        # return (sender-ip, sender-port) as ints
+        return (self.getField(OFF_SENDER_IP, SENDER_IP_LEN), self.getField(OFF_SENDER_PORT, SENDER_PORT_LEN))
+
+    def getReceiverAddr(self):
+        # return (receiver-ip, receiver-port) as ints
+        return (self.getField(OFF_RECEIVER_IP, RECEIVER_IP_LEN), self.getField(OFF_RECEIVER_PORT, RECEIVER_PORT_LEN))
+
+    def getDatawordLen(self):
+        return self.getField(OFF_DATA_LEN, DATA_LEN_LEN)
+
+    def getRedundantBitType(self):
+        return REDUNDANT_CODE_TO_TYPE.get(self.getField(OFF_RED_CODE, REDUNDANT_CODE_LEN), "unknown")
+
+    def isLast(self):
+        return self.getField(OFF_ISLAST, ISLAST_LEN) == 1
+
+    def serialize(self):
+        # packed wire form, no copy
+        return memoryview(self.buf)[: (self.nbits + 7) >> 3]
+
+    def segments(self):
+        """
+        (header, payload, redundancy) memoryviews of the wire form, for
+        scatter-gather sends. OFF_DATA is byte aligned; the payload segment
+        runs up to the byte holding the first redundancy bit. FEC parity is
+        not split off (the redundancy segment is empty).
+        """
+        view = self.serialize()
+        header = OFF_DATA >> 3
+        red_bits = REDUNDANT_BITS_CNT.get(self.getRedundantBitType(), 0)
+        split = max(header, (self.nbits - red_bits) >> 3)
+        return [view[:header], view[header:split], view[split:]]
+
+    def getData(self):
+        """
+        Payload as bytes-like. OFF_DATA is byte aligned, so a whole-byte payload
+        is returned as a memoryview slice; otherwise the unused low bits of the
+        last byte are cleared in a copy.
+        """
+        length = self.getDatawordLen()
+        start = OFF_DATA >> 3
+        end = start + ((length + 7) >> 3)
+        view = memoryview(self.buf)[start:end]
+        extra = (-length) % 8
+        if not extra:
+            return view
+        data = bytearray(view)
+        data[-1] &= (0xFF << extra) & 0xFF
+        return memoryview(data)
+
+    def getDataBits(self):
+        return self.toBitString()[OFF_DATA : OFF_DATA + self.getDatawordLen()]
+
+    def validate(self):
+        with metrics.timer("validate"):
+            valid = self._validate()
+        metrics.count("frames_valid" if valid else "frames_invalid")
+        return valid
+
+    def _validate(self):
+        redundant_bit_type = self.getRedundantBitType()
+        if redundant_bit_type == "unknown" and self.nbits >= OFF_DATA:
+            # the decoder repairs the code field along with the rest of the frame
+            redundant_bit_type = FEC_CODE_NEAREST.get(self.getField(OFF_RED_CODE, REDUNDANT_CODE_LEN), "unknown")
+        if redundant_bit_type in FEC_TYPES:
+            if self.nbits % 8:
+                return False
+            corrected, count = fec.decode(redundant_bit_type, self.serialize())
+            if corrected is None:
+                return False
+            if count:
+                # repair in place (read-only buffers are replaced by a copy)
+                if isinstance(self.buf, bytearray):
+                    self.buf[: len(corrected)] = corrected
+                else:
+                    self.buf = bytearray(corrected)
+                metrics.count("fec_corrected", count)
+            return True
+        if redundant_bit_type == "checksum":
+            return verify_checksum_bytes(self.serialize(), self.nbits)
+        if redundant_bit_type not in CRC_POLY:
+            # a corrupted code field; counted, not printed (the ARQ path validates quietly)
+            metrics.count("frames_unknown_type")
+            return False
+        return verify_crc_bytes(self.serialize(), CRC_POLY[redundant_bit_type])
+
+    # --- legacy bit-string converters ---------------------------------------
+    def toBitString(self):
+        nbytes = (self.nbits + 7) >> 3
+        if nbytes == 0:
+            return ""
+        return format(int.from_bytes(self.buf[:nbytes], "big"), "0{}b".format(nbytes * 8))[: self.nbits]
+
+    def toDataFrame(self):
+        return DataFrame(self.toBitString())
+
+    @classmethod
+    def fromBitString(cls, bits):
+        nbits = len(bits)
+        if nbits == 0:
+            return cls(b"", 0)
+        pad = (-nbits) % 8
+        return cls((int(bits, 2) << pad).to_bytes((nbits + pad) // 8, "big"), nbits)
+
+    @classmethod
+    def fromDataFrame(cls, frame):
+        return cls.fromBitString(frame.serialize())
+
+    @classmethod
+    def createFrames(
+        cls, data2send, sender_addr, receiver_addr, redundant_bits_type="crc-16", frame_size=64
+    ):
+        """
+        Packed counterpart of DataFrame.createFrames.
+        data2send is bytes; the frames are bit-identical to
+        DataFrame.createFrames(bytes_to_bits(data2send), ...).
+        """
+        return list(cls.iterFrames(data2send, sender_addr, receiver_addr, redundant_bits_type, frame_size))
+
+    @classmethod
+    def iterFrames(
+        cls, data2send, sender_addr, receiver_addr, redundant_bits_type="crc-16", frame_size=64
+    ):
+        """
+        Generator version of createFrames. data2send can be any bytes-like
+        object supporting len() and slicing (bytes, memoryview, mmap); only
+        the bytes of the current frame are read, so memory use is constant.
+        """
+        header_bits = OFF_DATA
+        crc_bits = redundancy_len(redundant_bits_type, frame_size * 8)
+        chunk_size = frame_size * 8 - header_bits - crc_bits
+        if chunk_size <= 0:
+            raise ValueError("Frame size too small for header + CRC")
+
+        sender_ip, sender_port = sender_addr
+        receiver_ip, receiver_port = receiver_addr
+        # address part of the header is the same for every frame
+        addr = _addr_field(sender_ip)
+        addr = (addr << SENDER_PORT_LEN) | _addr_field(sender_port)
+        addr = (addr << RECEIVER_IP_LEN) | _addr_field(receiver_ip)
+        addr = (addr << RECEIVER_PORT_LEN) | _addr_field(receiver_port)
+        code = int(REDUNDANT_BIT_CODE[redundant_bits_type], 2)
+        msg_bits = frame_size * 8 - crc_bits
+        engine = get_engine(CRC_POLY[redundant_bits_type]) if redundant_bits_type in CRC_POLY else None
+        if engine is not None:
+            prefix_crc = engine.prefix(addr, OFF_DATA_LEN)
+            rest_bits = msg_bits - OFF_DATA_LEN
+            rest_mask = (1 << rest_bits) - 1
+
+        total_bits = len(data2send) * 8
+        for i in range(0, total_bits, chunk_size):
+            started = metrics.start()
+            length = min(chunk_size, total_bits - i)
+            start = i >> 3
+            end = (i + length + 7) >> 3
+            chunk = int.from_bytes(data2send[start:end], "big")
+            chunk = (chunk >> ((end << 3) - i - length)) & ((1 << length) - 1)
+            isLast = 0 if i + chunk_size < total_bits else 1
+
+            header = (addr << DATA_LEN_LEN) | length
+            header = (header << ISLAST_LEN) | isLast
+            header = (header << REDUNDANT_CODE_LEN) | code
+            # payload is left aligned in the chunk field, padding is zeros
+            message = (header << chunk_size) | (chunk << (chunk_size - length))
+            with metrics.timer("redundancy"):
+                if redundant_bits_type in FEC_TYPES:
+                    parity = fec.encode(redundant_bits_type, message.to_bytes(msg_bits // 8, "big"))
+                    redundancy = int.from_bytes(parity, "big")
+                elif engine is None:
+                    redundancy = ones_complement_sum(message) ^ 0xFFFF
+                else:
+                    # resume after the address fields instead of from bit 0
+                    redundancy = engine.update_int(prefix_crc, message & rest_mask, rest_bits)
+            # FEC parity may not fill the frame exactly (see fec.message_bits)
+            red_bits = len(parity) * 8 if redundant_bits_type in FEC_TYPES else crc_bits
+            value = (message << red_bits) | redundancy
+            frame = cls(value.to_bytes((msg_bits + red_bits) >> 3, "big"), msg_bits + red_bits)
+            metrics.stop("frame_build", started)
+            metrics.count("frames_built")
+            yield frame
 
 
 def compare(data1, data2):